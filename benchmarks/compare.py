@@ -0,0 +1,210 @@
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import sqlite3
+import sys
+
+from benchmarks import db_bench, ui_bench
+
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+
+# (benchmark, operation, dataset size) pairs that fail the gate when they regress
+TRACKED = [
+    ('db', "get_tasks('all')", 100000),
+    ('ui', 'TodoScreen first paint', 10000),
+]
+
+THRESHOLD = 0.10                    # Allowed slowdown of the median before a change counts as a regression
+CONFIDENCE = 0.95
+BOOTSTRAP_ROUNDS = 2000
+DEFAULT_REPEAT = 9                  # More samples than a plain benchmark run, for tighter intervals
+
+
+# =============================================================================
+# MACHINE PROFILES
+# =============================================================================
+
+def machine_profile():
+    """Name baselines after the things that change timings: host, CPU, Python and SQLite."""
+    parts = [platform.node() or 'host', platform.machine(), f"{os.cpu_count()}cpu",
+             f"py{platform.python_version_tuple()[0]}{platform.python_version_tuple()[1]}",
+             f"sqlite{sqlite3.sqlite_version}"]
+    return re.sub(r'[^A-Za-z0-9.]+', '-', '-'.join(parts)).strip('-').lower()
+
+
+def baseline_path(profile):
+    return os.path.join(BASELINE_DIR, f"{profile}.json")
+
+
+def load_report(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error reading benchmark report {path}: {e}")
+        return None
+
+
+def save_report(report, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+# =============================================================================
+# STATISTICS
+# =============================================================================
+
+def median_interval(samples, confidence=CONFIDENCE, rounds=BOOTSTRAP_ROUNDS):
+    """Bootstrap confidence interval of the median; seeded so reruns print the same numbers."""
+    if len(samples) < 3:
+        return min(samples), max(samples)
+    rng = random.Random(0)
+    medians = sorted(statistics.median(rng.choices(samples, k=len(samples))) for _ in range(rounds))
+    tail = (1 - confidence) / 2
+    return medians[int(tail * rounds)], medians[min(rounds - 1, int((1 - tail) * rounds))]
+
+
+def compare_row(old, new, threshold=THRESHOLD):
+    """Verdict for one operation: 'regressed', 'improved' or 'same'.
+
+    A change only counts when the median moved by more than the threshold and
+    the two confidence intervals do not overlap, so one noisy run is not enough.
+    """
+    old_low, old_high = median_interval(old['samples_ms'])
+    new_low, new_high = median_interval(new['samples_ms'])
+    change = new['median_ms'] / old['median_ms'] - 1 if old['median_ms'] else 0.0
+    if change > threshold and new_low > old_high:
+        verdict = 'regressed'
+    elif change < -threshold and new_high < old_low:
+        verdict = 'improved'
+    else:
+        verdict = 'same'
+    return dict(change=change, verdict=verdict, old_interval=(old_low, old_high), new_interval=(new_low, new_high))
+
+
+def compare_reports(baseline, current, threshold=THRESHOLD, tracked=TRACKED):
+    """Rows of (key, old, new, comparison, is_tracked) for operations in both reports."""
+    def index(report):
+        # Reports from db_bench or ui_bench alone hold a single suite
+        suites = report.get('benchmarks') or {report.get('benchmark'): report}
+        return {(benchmark, row['operation'], row['size']): row
+                for benchmark, part in suites.items()
+                for row in part.get('results', [])}
+
+    old_rows = index(baseline)
+    new_rows = index(current)
+    rows = []
+    for key, new in new_rows.items():
+        old = old_rows.get(key)
+        if old is not None:
+            rows.append((key, old, new, compare_row(old, new, threshold), tracked is None or key in tracked))
+    return rows
+
+
+# =============================================================================
+# REPORTING
+# =============================================================================
+
+def print_diff(rows, out=sys.stdout):
+    """Old and new medians with confidence intervals; tracked operations are starred."""
+    print(f"  {'benchmark / operation':<44}{'tasks':>8}{'old ms':>24}{'new ms':>24}{'change':>9}  verdict",
+          file=out)
+    for (benchmark, operation, size), old, new, result, is_tracked in rows:
+        old_low, old_high = result['old_interval']
+        new_low, new_high = result['new_interval']
+        old_text = f"{old['median_ms']:.2f} [{old_low:.2f}-{old_high:.2f}]"
+        new_text = f"{new['median_ms']:.2f} [{new_low:.2f}-{new_high:.2f}]"
+        print(f"{'*' if is_tracked else ' '} {benchmark + ' / ' + operation:<44}{size:>8}{old_text:>24}"
+              f"{new_text:>24}{result['change']:>+9.1%}  {result['verdict']}", file=out)
+
+
+def run_benchmarks(sizes_db, sizes_ui, repeat, seed, cache_dir, include_ui):
+    progress = lambda message: print(message, file=sys.stderr)
+    report = {
+        'profile': machine_profile(),
+        'benchmarks': {'db': db_bench.run_db_benchmarks(sizes_db, repeat, seed, cache_dir, progress)},
+    }
+    if include_ui:
+        report['benchmarks']['ui'] = ui_bench.run_ui_benchmarks(sizes_ui, repeat, seed, cache_dir,
+                                                                progress=progress)
+    return report
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare benchmark runs with the baseline of this machine.")
+    parser.add_argument('command', choices=['check', 'record', 'diff'],
+                        help="check: run and compare; record: run and store as baseline; "
+                             "diff: compare two saved reports")
+    parser.add_argument('reports', nargs='*', help="For diff: baseline.json current.json")
+    parser.add_argument('--profile', default=None, help="Baseline name (default: derived from this machine)")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help="Allowed median slowdown, e.g. 0.1 for 10%% (default: 0.1)")
+    parser.add_argument('--all', action='store_true', help="Fail on any regressed operation, not only tracked ones")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db-sizes', default='10000,100000')
+    parser.add_argument('--ui-sizes', default='1000,10000')
+    parser.add_argument('--skip-ui', action='store_true', help="Only run the storage benchmarks")
+    parser.add_argument('--allow-missing', action='store_true',
+                        help="Pass even if a tracked operation was not measured (e.g. without Kivy)")
+    parser.add_argument('--cache-dir', help="Where generated datasets are kept between runs")
+    parser.add_argument('--output', help="Also save the new run here")
+    args = parser.parse_args(argv)
+
+    profile = args.profile or machine_profile()
+    if args.command == 'diff':
+        if len(args.reports) != 2:
+            parser.error("diff needs two report files")
+        baseline, current = (load_report(path) for path in args.reports)
+        if baseline is None or current is None:
+            return 2
+    else:
+        include_ui = not args.skip_ui
+        if include_ui and importlib.util.find_spec('kivy') is None:
+            print("Kivy is not installed; skipping the UI benchmarks", file=sys.stderr)
+            include_ui = False
+        current = run_benchmarks([int(size) for size in args.db_sizes.split(',')],
+                                 [int(size) for size in args.ui_sizes.split(',')],
+                                 args.repeat, args.seed, args.cache_dir, include_ui)
+        current['profile'] = profile
+        if args.output:
+            save_report(current, args.output)
+        if args.command == 'record':
+            save_report(current, baseline_path(profile))
+            print(f"Baseline saved: {baseline_path(profile)}")
+            return 0
+        baseline = load_report(baseline_path(profile)) if os.path.exists(baseline_path(profile)) else None
+        if baseline is None:
+            print(f"No baseline for profile '{profile}'; run 'python -m benchmarks.compare record' first")
+            return 2
+
+    rows = compare_reports(baseline, current, args.threshold, None if args.all else TRACKED)
+    print_diff(rows)
+    failed = [key for key, _, _, result, is_tracked in rows if is_tracked and result['verdict'] == 'regressed']
+    measured = {row[0] for row in rows}
+    missing = [key for key in TRACKED if key not in measured]
+    for benchmark, operation, size in missing:
+        print(f"Tracked operation not measured in both runs: {benchmark} / {operation} @ {size}")
+    if failed:
+        print(f"{len(failed)} tracked operation(s) regressed by more than {args.threshold:.0%}")
+        return 1
+    if missing and not args.allow_missing:
+        print(f"{len(missing)} tracked operation(s) were not checked; pass --allow-missing to accept that")
+        return 2
+    print("No tracked regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
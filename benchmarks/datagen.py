@@ -0,0 +1,126 @@
+import argparse
+import os
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from models.database import TodoDB, CategoryDB, DeadlineDB
+from models.storage import Storage
+
+
+VERBS = ['Write', 'Review', 'Call', 'Email', 'Buy', 'Fix', 'Plan', 'Read', 'Clean', 'Update',
+         'Prepare', 'Book', 'Pay', 'Schedule', 'Finish', 'Study', 'Organize', 'Send', 'Check', 'Cook']
+OBJECTS = ['report', 'groceries', 'dentist', 'slides', 'budget', 'bug #{n}', 'meeting notes', 'chapter {n}',
+           'garage', 'invoice {n}', 'flight', 'rent', 'workout plan', 'homework', 'birthday gift',
+           'car service', 'newsletter', 'pull request {n}', 'tax return', 'lecture {n}']
+SUFFIXES = ['', '', '', ' for Monday', ' before lunch', ' with Anna', ' (urgent)', ' this week', ' again']
+TAGS = ['urgent', 'home', 'office', 'errand', 'call', 'reading', 'finance', 'health', 'weekend', 'later',
+        'project-x', 'family', 'online', 'waiting', 'quick']
+
+# Share of tasks per default category (by insertion order) and uncategorized
+CATEGORY_WEIGHTS = [30, 25, 15, 8, 7, 5]
+NO_CATEGORY_WEIGHT = 10
+
+DONE_RATIO = 0.6
+TAGGED_RATIO = 0.35
+DEADLINE_RATIO = 0.4
+HISTORY_DAYS = 365
+
+
+# =============================================================================
+# DATASET GENERATOR
+# =============================================================================
+
+class DatasetGenerator:
+    """Seeded synthetic tasks with realistic titles, categories, tags and deadlines."""
+
+    CHUNK_SIZE = 10000
+
+    def __init__(self, seed=42, today=None):
+        self.seed = seed
+        self.today = today or date.today()
+
+    def rows(self, size, category_ids):
+        """Yield task rows: (title, done, date, category_id, tags, created_at, completed_at,
+        deadline_date, deadline_time)."""
+        rng = random.Random(self.seed)
+        choices = category_ids + [None]
+        weights = CATEGORY_WEIGHTS[:len(category_ids)] + [NO_CATEGORY_WEIGHT]
+        for _ in range(size):
+            title = (f"{rng.choice(VERBS)} {rng.choice(OBJECTS)}{rng.choice(SUFFIXES)}"
+                     .format(n=rng.randint(1, 999)))
+            age_days = int(rng.triangular(0, HISTORY_DAYS, 0))  # Recent days are busier
+            day = self.today - timedelta(days=age_days)
+            created = datetime.combine(day, datetime.min.time()) + timedelta(minutes=rng.randint(7 * 60, 22 * 60))
+            done = rng.random() < DONE_RATIO
+            completed = None
+            if done:
+                # Most tasks close within days, a few take weeks
+                completed = (created + timedelta(hours=rng.expovariate(1 / 30))).strftime('%Y-%m-%d %H:%M:%S')
+
+            tags = None
+            if rng.random() < TAGGED_RATIO:
+                tags = ','.join(rng.sample(TAGS, rng.randint(1, 3)))
+
+            deadline_date = deadline_time = None
+            if rng.random() < DEADLINE_RATIO:
+                deadline_date = (day + timedelta(days=rng.randint(-2, 30))).isoformat()
+                if rng.random() < 0.5:
+                    deadline_time = f"{rng.randint(8, 20):02d}:{rng.choice(['00', '15', '30', '45'])}"
+
+            yield (title, int(done), day.isoformat(), rng.choices(choices, weights)[0], tags,
+                   created.strftime('%Y-%m-%d %H:%M:%S'), completed, deadline_date, deadline_time)
+
+    def generate(self, db_path, size):
+        """Create a database with `size` tasks; returns the seconds it took."""
+        started = time.perf_counter()
+        for path in (db_path, db_path + '-wal', db_path + '-shm'):
+            if os.path.exists(path):
+                os.remove(path)
+        db = TodoDB(db_path)
+        CategoryDB(db_path)
+        DeadlineDB(db_path)
+        category_ids = [row[0] for row in db.conn.execute('SELECT id FROM categories ORDER BY id')]
+
+        rows = self.rows(size, category_ids)
+        with db.conn:
+            while True:
+                chunk = [row for _, row in zip(range(self.CHUNK_SIZE), rows)]
+                if not chunk:
+                    break
+                db.conn.executemany('''INSERT INTO tasks (title, done, date, category_id, tags, created_at,
+                                                          completed_at, deadline_date, deadline_time)
+                                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)''', chunk)
+        db.conn.execute('ANALYZE')
+        db.close()
+        return time.perf_counter() - started
+
+
+def ensure_dataset(work_dir, size, seed=42):
+    """Path of a generated database for (size, seed), generating it only once."""
+    os.makedirs(work_dir, exist_ok=True)
+    db_path = os.path.join(work_dir, f"tasks-{size}-{seed}.db")
+    if not os.path.exists(db_path):
+        DatasetGenerator(seed).generate(db_path, size)
+    return db_path
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic task database.")
+    parser.add_argument('output', help="Database file to create (overwritten)")
+    parser.add_argument('--size', type=int, default=10000, help="Number of tasks (default: 10000)")
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    seconds = DatasetGenerator(args.seed).generate(args.output, args.size)
+    Storage.close()
+    print(f"Generated {args.size} tasks in {seconds:.1f}s: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
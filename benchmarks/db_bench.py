@@ -0,0 +1,187 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.datagen import ensure_dataset
+from models.database import TodoDB, CategoryDB, DeadlineDB, QueryCache
+from models.storage import Storage
+
+
+DEFAULT_SIZES = [10000, 100000]     # Add 1000000 with --sizes; generating it takes about 30 s
+DEFAULT_REPEAT = 7
+
+
+# =============================================================================
+# OPERATIONS
+# =============================================================================
+
+def read_operations(db, category_db, deadline_db):
+    """Read methods by name; each call runs against an empty query cache."""
+    first_category = category_db.get_categories()[0][0]
+    return {
+        "get_tasks('all')": lambda: db.get_tasks('all'),
+        "get_tasks('pending')": lambda: db.get_tasks('pending'),
+        "get_tasks('completed')": lambda: db.get_tasks('completed'),
+        'get_task_summary': db.get_task_summary,
+        'get_stats': db.get_stats,
+        'get_categories': category_db.get_categories,
+        'get_category_stats': category_db.get_category_stats,
+        'get_tasks_by_category(None)': lambda: category_db.get_tasks_by_category(None),
+        'get_tasks_by_category(id)': lambda: category_db.get_tasks_by_category(first_category),
+        "search_tasks_by_tag('urgent')": lambda: category_db.search_tasks_by_tag('urgent'),
+        'get_all_tags': category_db.get_all_tags,
+        'get_tasks_with_deadlines': deadline_db.get_tasks_with_deadlines,
+        'get_overdue_tasks': deadline_db.get_overdue_tasks,
+        'get_upcoming_tasks': deadline_db.get_upcoming_tasks,
+    }
+
+
+def write_operations(db, category_db, deadline_db, rng):
+    """Mutators by name; each call changes a different task picked by the seeded rng."""
+    max_id = db.conn.execute('SELECT MAX(id) FROM tasks').fetchone()[0]
+    category_ids = [row[0] for row in category_db.get_categories()]
+    tomorrow = (date.today() + timedelta(days=1)).isoformat()
+    task_id = lambda: rng.randint(1, max_id)
+    counter = iter(range(10 ** 9))
+
+    def add_and_delete_category():
+        name = f"Bench {next(counter)}"
+        category_db.add_category(name)
+        new_id = category_db.conn.execute('SELECT id FROM categories WHERE name = ?', (name,)).fetchone()[0]
+        category_db.delete_category(new_id)
+
+    return {
+        'add_task': lambda: db.add_task(f"Benchmark task {next(counter)}"),
+        'mark_done': lambda: db.mark_done(task_id(), rng.randint(0, 1)),
+        'delete_task': lambda: db.delete_task(task_id()),
+        'set_task_category': lambda: category_db.set_task_category(task_id(), rng.choice(category_ids)),
+        'add_tag_to_task': lambda: category_db.add_tag_to_task(task_id(), 'bench,quick'),
+        'set_task_deadline': lambda: deadline_db.set_task_deadline(task_id(), tomorrow, '09:00'),
+        'add_category+delete_category': add_and_delete_category,
+    }
+
+
+# =============================================================================
+# RUNNER
+# =============================================================================
+
+def time_call(function, clear_cache):
+    if clear_cache:
+        QueryCache.clear()  # Measure the database, not the cache
+    started = time.perf_counter()
+    function()
+    return (time.perf_counter() - started) * 1000
+
+
+def summarize(samples):
+    return {
+        'samples_ms': [round(sample, 4) for sample in samples],
+        'median_ms': statistics.median(samples),
+        'mean_ms': statistics.fmean(samples),
+        'stdev_ms': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'min_ms': min(samples),
+        'max_ms': max(samples),
+    }
+
+
+def bench_size(dataset_path, size, repeat, seed, work_dir):
+    """Time every operation against a fresh copy of one dataset."""
+    db_path = os.path.join(work_dir, f"bench-{size}.db")
+    shutil.copyfile(dataset_path, db_path)  # Mutators must not change the cached dataset
+    db = TodoDB(db_path)
+    category_db = CategoryDB(db_path)
+    deadline_db = DeadlineDB(db_path)
+    results = []
+    try:
+        for kind, operations in (('read', read_operations(db, category_db, deadline_db)),
+                                 ('write', write_operations(db, category_db, deadline_db, random.Random(seed)))):
+            for name, function in operations.items():
+                time_call(function, kind == 'read')  # Warm-up run
+                samples = [time_call(function, kind == 'read') for _ in range(repeat)]
+                results.append(dict(size=size, operation=name, kind=kind, **summarize(samples)))
+    finally:
+        db.close()
+        os.remove(db_path)
+    return results
+
+
+def run_db_benchmarks(sizes=DEFAULT_SIZES, repeat=DEFAULT_REPEAT, seed=42, cache_dir=None, progress=None):
+    """Run the storage benchmark at each dataset size; returns the JSON-ready report."""
+    cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), 'todoapp-bench')
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for size in sizes:
+            if progress:
+                progress(f"Preparing {size} tasks...")
+            dataset_path = ensure_dataset(cache_dir, size, seed)
+            if progress:
+                progress(f"Timing {size} tasks...")
+            results.extend(bench_size(dataset_path, size, repeat, seed, work_dir))
+    return {
+        'benchmark': 'db',
+        'meta': environment_info(seed=seed, repeat=repeat, sizes=list(sizes)),
+        'results': results,
+    }
+
+
+def environment_info(**extra):
+    return dict(
+        created=time.strftime('%Y-%m-%dT%H:%M:%S'),
+        python=platform.python_version(),
+        sqlite=sqlite3.sqlite_version,
+        platform=platform.platform(),
+        machine=platform.machine(),
+        processor=platform.processor(),
+        storage_mode=Storage.mode,
+        **extra
+    )
+
+
+def print_table(report, out=sys.stderr):
+    """Median per operation, one column per dataset size."""
+    sizes = report['meta']['sizes']
+    medians = {(row['operation'], row['size']): row['median_ms'] for row in report['results']}
+    operations = list(dict.fromkeys(row['operation'] for row in report['results']))
+    print(f"{'operation (median ms)':<34}" + ''.join(f"{size:>12}" for size in sizes), file=out)
+    for operation in operations:
+        print(f"{operation:<34}" + ''.join(f"{medians.get((operation, size), float('nan')):>12.3f}"
+                                           for size in sizes), file=out)
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the storage classes on synthetic datasets (no Kivy).")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated task counts (default: 10000,100000)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Timed runs per operation")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--cache-dir', help="Where generated datasets are kept between runs")
+    parser.add_argument('--output', help="Write the JSON report here instead of standard output")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    report = run_db_benchmarks(sizes, args.repeat, args.seed, args.cache_dir,
+                               progress=lambda message: print(message, file=sys.stderr))
+    print_table(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,284 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from benchmarks.datagen import ensure_dataset
+from benchmarks.db_bench import summarize, environment_info
+from benchmarks.ui_bench import headless_app
+from models.database import QueryCache, CategoryDB, DeadlineDB
+from models.task_store import TaskStore
+
+
+DEFAULT_SIZE = 200                  # Filter switches rebuild the task list, so keep it scrollable-sized
+DEFAULT_ADDS = 300
+DEFAULT_ACTIONS = 1000              # Mixed actions after the adds
+ACTION_WEIGHTS = {                  # Share of each action in the mixed storm
+    'toggle task': 50,
+    'switch filter': 15,
+    'categorize task': 20,
+    'set deadline': 15,
+}
+TAG_CHOICES = ['', 'work', 'home, urgent', 'meeting', 'errand, later']
+TITLE_PREFIX = "Load test task"
+
+
+# =============================================================================
+# ACTIONS
+# =============================================================================
+
+class LoadTest:
+    """Drives the real screens like a fast user and remembers what the database should hold."""
+
+    def __init__(self, app, settler, seed=42):
+        self.app = app
+        self.todo = app.todo_widget
+        self.settler = settler
+        self.rng = random.Random(seed)
+        self.category_db = CategoryDB(app.db.db_path)
+        self.deadline_db = DeadlineDB(app.db.db_path)
+        self.timings = {}           # Action -> [ms]
+        self.expected = {}          # task_id -> {column: value} set through the UI
+        self.added_ids = []
+        self.failures = []
+        self.initial_count = self.count_tasks()
+
+    def count_tasks(self):
+        return self.app.db.conn.execute('SELECT COUNT(*) FROM tasks').fetchone()[0]
+
+    def timed(self, action, function, *args):
+        """Run one action until its result is laid out, and record how long it took."""
+        started = time.perf_counter()
+        result = function(*args)
+        self.settler.settle()
+        self.timings.setdefault(action, []).append((time.perf_counter() - started) * 1000)
+        return result
+
+    def random_task(self):
+        return self.rng.choice(self.app.db.conn.execute('SELECT id, title FROM tasks').fetchall())
+
+    def add_tasks(self, count):
+        """Type a title and press Add, `count` times."""
+        last_id = self.app.db.conn.execute('SELECT COALESCE(MAX(id), 0) FROM tasks').fetchone()[0]
+        for index in range(count):
+            self.todo.task_input.text = f"{TITLE_PREFIX} {index}"
+            self.timed('add task', self.todo.add_task, None)
+        self.added_ids = [row[0] for row in self.app.db.conn.execute(
+            'SELECT id FROM tasks WHERE id > ? ORDER BY id', (last_id,))]
+        for task_id in self.added_ids:
+            self.expected.setdefault(task_id, {})['done'] = 0
+
+    def visible_rows(self):
+        """(Task, row widget) pairs in the order the list shows them."""
+        tasks = TaskStore.for_db(self.todo.db).get_tasks(self.todo.get_current_filter())
+        rows = list(reversed(self.todo.tasks_container.children))  # add_widget puts the newest first
+        if tasks and len(rows) != len(tasks):
+            self.failures.append(f"filter {self.todo.filter_spinner.text!r} shows {len(rows)} rows "
+                                 f"for {len(tasks)} tasks")
+            return []
+        return list(zip(tasks, rows)) if tasks else []
+
+    def toggle_task(self):
+        """Tick or untick the checkbox of a random visible task."""
+        rows = self.visible_rows()
+        if not rows:
+            return
+        task, row = self.rng.choice(rows)
+        task_id = task.id
+        checkbox = row.children[-1]  # The first widget added to the row
+        done = not checkbox.active
+        self.timed('toggle task', setattr, checkbox, 'active', done)
+        self.expected.setdefault(task_id, {})['done'] = int(done)
+
+    def switch_filter(self):
+        spinner = self.todo.filter_spinner
+        text = self.rng.choice([value for value in spinner.values if value != spinner.text])
+        self.timed('switch filter', setattr, spinner, 'text', text)
+        self.visible_rows()  # Records a mismatch between the list and the database
+
+    def categorize_task(self):
+        """Open the categorize popup for a random task, pick a category and tags, and save."""
+        from models.category import TaskCategoryPopup
+
+        task_id, title = self.random_task()
+        tags = self.rng.choice(TAG_CHOICES)
+
+        def categorize():
+            popup = TaskCategoryPopup(task_id, title, self.category_db)
+            popup.category_spinner.text = self.rng.choice(popup.category_spinner.values)
+            popup.tags_input.text = tags
+            popup.save_categorization(None)
+            # It was never opened, so its dismiss() returned before on_dismiss released the theme binding
+            popup.dispatch('on_dismiss')
+            return popup
+
+        popup = self.timed('categorize task', categorize)
+        chosen = popup.category_spinner.text
+        expected = self.expected.setdefault(task_id, {})
+        expected['category_id'] = next((cat_id for cat_id, name, _, _ in popup.categories if name == chosen), None)
+        if tags.strip():
+            expected['tags'] = tags.strip()
+
+    def set_deadline(self):
+        """Open the deadline popup for a random task, enter a date and maybe a time, and save."""
+        from models.deadline import DeadlinePopup
+
+        task_id, title = self.random_task()
+        deadline_date = (date.today() + timedelta(days=self.rng.randint(-5, 30))).strftime('%Y-%m-%d')
+        deadline_time = self.rng.choice([None, f"{self.rng.randint(0, 23):02d}:{self.rng.choice([0, 30]):02d}"])
+
+        def set_deadline():
+            popup = DeadlinePopup(task_id, title, deadline_db=self.deadline_db)
+            popup.date_input.text = deadline_date
+            popup.time_input.text = deadline_time or ''
+            popup.save_deadline(None)
+
+        self.timed('set deadline', set_deadline)
+        expected = self.expected.setdefault(task_id, {})
+        expected['deadline_date'] = deadline_date
+        expected['deadline_time'] = deadline_time
+
+    def storm(self, count):
+        """Mixed actions in random order, weighted by ACTION_WEIGHTS."""
+        actions = {
+            'toggle task': self.toggle_task,
+            'switch filter': self.switch_filter,
+            'categorize task': self.categorize_task,
+            'set deadline': self.set_deadline,
+        }
+        names = list(ACTION_WEIGHTS)
+        for name in self.rng.choices(names, weights=[ACTION_WEIGHTS[name] for name in names], k=count):
+            actions[name]()
+
+    # -------------------------------------------------------------------------
+    # Consistency
+    # -------------------------------------------------------------------------
+
+    def check_consistency(self, adds):
+        """Compare the database with what the actions should have left; returns the failures."""
+        conn = self.app.db.conn
+        integrity = conn.execute('PRAGMA integrity_check').fetchone()[0]
+        if integrity != 'ok':
+            self.failures.append(f"integrity_check: {integrity}")
+        if conn.execute('PRAGMA foreign_key_check').fetchall():
+            self.failures.append("foreign_key_check found orphaned rows")
+
+        count = self.count_tasks()
+        if len(self.added_ids) != adds or count != self.initial_count + adds:
+            self.failures.append(f"expected {self.initial_count + adds} tasks after {adds} adds, "
+                                 f"found {count} ({len(self.added_ids)} new)")
+
+        columns = ('done', 'category_id', 'tags', 'deadline_date', 'deadline_time')
+        for task_id, expected in sorted(self.expected.items()):
+            row = conn.execute(f"SELECT {', '.join(columns)} FROM tasks WHERE id = ?", (task_id,)).fetchone()
+            if row is None:
+                self.failures.append(f"task {task_id} is missing")
+                continue
+            actual = dict(zip(columns, row))
+            for column, value in expected.items():
+                if actual[column] != value:
+                    self.failures.append(f"task {task_id}: {column} is {actual[column]!r}, expected {value!r}")
+
+        # A stale cache entry would show the user numbers the database no longer has
+        cached = self.app.db.get_task_summary()
+        QueryCache.clear()
+        fresh = self.app.db.get_task_summary()
+        if cached != fresh:
+            self.failures.append(f"cached task summary {cached} differs from the database {fresh}")
+        store = TaskStore.for_db(self.app.db)
+        if [(task.id, task.title, task.done) for task in store.get_tasks('all')] != self.app.db.get_tasks('all'):
+            self.failures.append("the task store differs from the database")
+
+        self.todo.refresh_tasks()
+        for task, row in self.visible_rows():
+            if row.children[-1].active != bool(task.done):
+                self.failures.append(f"task {task.id}: checkbox shows {row.children[-1].active}, "
+                                     f"database {task.done}")
+        return self.failures
+
+    def results(self, size):
+        rows = []
+        for action, samples in self.timings.items():
+            ordered = sorted(samples)
+            rows.append(dict(size=size, operation=action, kind='load', count=len(samples),
+                             p95_ms=percentile(ordered, 95), p99_ms=percentile(ordered, 99), **summarize(samples)))
+        return rows
+
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of sorted samples."""
+    return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+
+# =============================================================================
+# RUNNER
+# =============================================================================
+
+def run_load_test(size=DEFAULT_SIZE, adds=DEFAULT_ADDS, actions=DEFAULT_ACTIONS, seed=42, cache_dir=None,
+                  window='none', progress=None):
+    """Add tasks, run the mixed storm and check consistency; returns the JSON-ready report."""
+    cache_dir = os.path.abspath(cache_dir or os.path.join(tempfile.gettempdir(), 'todoapp-bench'))
+    dataset_path = ensure_dataset(cache_dir, size, seed)
+    with headless_app(dataset_path, window) as (app, settler):
+        test = LoadTest(app, settler, seed)
+        if progress:
+            progress(f"Adding {adds} tasks...")
+        test.add_tasks(adds)
+        if progress:
+            progress(f"Running {actions} mixed actions...")
+        test.storm(actions)
+        failures = test.check_consistency(adds)
+        results = test.results(size)
+    return {
+        'benchmark': 'load',
+        'meta': environment_info(seed=seed, size=size, adds=adds, actions=actions, window=window),
+        'results': results,
+        'failures': failures,
+    }
+
+
+def print_table(report, out=sys.stderr):
+    """Latency distribution per action."""
+    print(f"{'action':<20}{'count':>7}{'median ms':>11}{'p95':>9}{'p99':>9}{'max':>9}", file=out)
+    for row in report['results']:
+        print(f"{row['operation']:<20}{row['count']:>7}{row['median_ms']:>11.1f}{row['p95_ms']:>9.1f}"
+              f"{row['p99_ms']:>9.1f}{row['max_ms']:>9.1f}", file=out)
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Drive the screens with rapid scripted actions, report "
+                                                 "per-action latency and check the database afterwards.")
+    parser.add_argument('--size', type=int, default=DEFAULT_SIZE, help="Tasks in the generated database")
+    parser.add_argument('--adds', type=int, default=DEFAULT_ADDS, help="Tasks added through the task screen")
+    parser.add_argument('--actions', type=int, default=DEFAULT_ACTIONS,
+                        help="Mixed toggle, filter, categorize and deadline actions")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--cache-dir', help="Where generated datasets are kept between runs")
+    parser.add_argument('--window', default='none', choices=['none', 'sdl2'])
+    parser.add_argument('--output', help="Write the JSON report here")
+    args = parser.parse_args(argv)
+
+    report = run_load_test(args.size, args.adds, args.actions, args.seed, args.cache_dir, args.window,
+                           progress=lambda message: print(message, file=sys.stderr))
+    print_table(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    for failure in report['failures']:
+        print(f"INCONSISTENT: {failure}")
+    if report['failures']:
+        return 1
+    print(f"Consistent after {args.adds} adds and {args.actions} actions")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,131 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.datagen import ensure_dataset
+from benchmarks.ui_bench import headless_app
+
+
+DEFAULT_CYCLES = 2000
+DEFAULT_SIZE = 200                  # Small list, so thousands of cycles finish in minutes
+SNAPSHOT_EVERY = 100                # Cycles between leak snapshots
+WARMUP_CYCLES = 50                  # Caches, the undo journal and lazy screens fill up first
+WIDGET_TOLERANCE = 0.05             # Allowed live widget growth after warm-up
+CLOCK_EVENT_SLACK = 5               # One-shot events (e.g. nav color fixes) may be pending at a snapshot
+
+
+# =============================================================================
+# SOAK TEST
+# =============================================================================
+
+def navigation_cycle(app, settler, cycle, task_id):
+    """Visit every tab, open the category popups and toggle the theme, changing one
+    task so statistics rebuild."""
+    from models.category import CategoryPopup, TaskCategoryPopup
+    from models.task_store import TaskStore
+
+    app.db.mark_done(task_id, cycle % 2)
+    for button in (app.todo_btn, app.stats_btn, app.category_btn):
+        button.dispatch('on_press')
+        settler.settle()
+    # A popup that stays bound to the theme shows up as widgets.<Popup class> growth
+    category_db = app.screen_widgets['categories'].category_db
+    open_and_dismiss(settler, TaskCategoryPopup(task_id, TaskStore.for_db(app.db).get(task_id).title, category_db))
+    open_and_dismiss(settler, CategoryPopup(category_db))
+    for button in (app.deadline_btn, app.theme_btn):
+        button.dispatch('on_press')
+        settler.settle()
+
+
+def open_and_dismiss(settler, popup):
+    """Show a popup and close it again; without a window it cannot open, so only dismissing runs."""
+    from kivy.core.window import Window
+
+    if Window is None:
+        popup.dispatch('on_dismiss')
+        return
+    popup.open(animation=False)
+    settler.settle()
+    popup.dismiss(animation=False)
+    settler.settle()
+
+
+def check_bounded(baseline, final, flagged):
+    """Failures comparing the last snapshot with the one taken after warm-up."""
+    failures = []
+    widget_limit = baseline['widget_total'] * (1 + WIDGET_TOLERANCE)
+    if final['widget_total'] > widget_limit:
+        failures.append(f"live widgets grew from {baseline['widget_total']} to {final['widget_total']}")
+    if final['theme_listeners'] > baseline['theme_listeners']:
+        failures.append(f"theme listeners grew from {baseline['theme_listeners']} to {final['theme_listeners']}")
+    if final['clock_events'] > baseline['clock_events'] + CLOCK_EVENT_SLACK:
+        failures.append(f"Clock events grew from {baseline['clock_events']} to {final['clock_events']}")
+    for metric, (first, last) in sorted(flagged.items()):
+        if metric != 'traced_kb':  # Allocations are reported, not asserted; caches fill gradually
+            failures.append(f"{metric} grew at every snapshot: {first:g} -> {last:g}")
+    return failures
+
+
+def run_soak(cycles=DEFAULT_CYCLES, size=DEFAULT_SIZE, seed=42, cache_dir=None, window='none', trace_memory=False,
+             progress=None):
+    """Cycle through the app and return (snapshots, failures)."""
+    cache_dir = os.path.abspath(cache_dir or os.path.join(tempfile.gettempdir(), 'todoapp-bench'))
+    dataset_path = ensure_dataset(cache_dir, size, seed)
+    with headless_app(dataset_path, window) as (app, settler):
+        from models.diagnostics import LeakDetector
+
+        detector = LeakDetector(app, trace_memory=trace_memory)
+        task_id = app.db.conn.execute('SELECT MIN(id) FROM tasks').fetchone()[0]
+
+        baseline = None
+        started = time.perf_counter()
+        for cycle in range(1, cycles + 1):
+            navigation_cycle(app, settler, cycle, task_id)
+            if cycle == WARMUP_CYCLES:
+                baseline = detector.snapshot(f"cycle {cycle}")
+            elif cycle > WARMUP_CYCLES and cycle % SNAPSHOT_EVERY == 0:
+                snapshot = detector.snapshot(f"cycle {cycle}")
+                if progress:
+                    progress(f"cycle {cycle}: {snapshot['widget_total']} widgets, "
+                             f"{snapshot['theme_listeners']} theme listeners, "
+                             f"{snapshot['clock_events']} Clock events "
+                             f"({time.perf_counter() - started:.0f}s)")
+        final = detector.snapshot(f"cycle {cycles}")
+        failures = check_bounded(baseline or detector.snapshots[0], final, detector.growth())
+        if progress:
+            detector.report()
+    return detector.snapshots, failures
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cycle through every tab, the category popups and the theme "
+                                                 "toggle, then check that widgets, theme listeners and Clock "
+                                                 "events stay bounded.")
+    parser.add_argument('--cycles', type=int, default=DEFAULT_CYCLES)
+    parser.add_argument('--size', type=int, default=DEFAULT_SIZE, help="Tasks in the generated database")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--cache-dir', help="Where generated datasets are kept between runs")
+    parser.add_argument('--window', default='none', choices=['none', 'sdl2'])
+    parser.add_argument('--trace-memory', action='store_true', help="Also report tracemalloc top allocations")
+    args = parser.parse_args(argv)
+
+    if args.cycles <= WARMUP_CYCLES:
+        parser.error(f"--cycles must be more than the {WARMUP_CYCLES} warm-up cycles")
+    _, failures = run_soak(args.cycles, args.size, args.seed, args.cache_dir, args.window, args.trace_memory,
+                           progress=lambda message: print(message, file=sys.stderr))
+    for failure in failures:
+        print(f"LEAK: {failure}")
+    if failures:
+        return 1
+    print(f"Bounded after {args.cycles} cycles")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,264 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from benchmarks.datagen import ensure_dataset
+from benchmarks.db_bench import summarize, environment_info
+from models.database import QueryCache
+from models.storage import Workspaces
+
+
+DEFAULT_SIZES = [1000, 10000]       # Every task is a widget row, so 100k rows take minutes per sample
+DEFAULT_REPEAT = 5
+SETTLE_TICKS = 3                    # Clock ticks that let triggered layout and label textures finish
+
+
+# =============================================================================
+# HEADLESS KIVY
+# =============================================================================
+
+def configure_headless(window):
+    """Environment for Kivy without a display; must run before Kivy is imported.
+
+    window='none' builds widgets against the mock GL backend without a window,
+    window='sdl2' opens a real window on SDL's offscreen video driver so drawing
+    is timed too.
+    """
+    os.environ.setdefault('KIVY_NO_ARGS', '1')
+    os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+    os.environ.setdefault('KIVY_NO_FILELOG', '1')
+    os.environ.setdefault('KCFG_GRAPHICS_MAXFPS', '0')  # Clock.tick must not sleep to hold a frame rate
+    os.environ.setdefault('KCFG_KIVY_EXIT_ON_ESCAPE', '0')
+    if window == 'none':
+        os.environ.setdefault('KIVY_WINDOW', '')  # No window provider; Window stays None
+        os.environ.setdefault('KIVY_GL_BACKEND', 'mock')
+    else:
+        os.environ.setdefault('KIVY_WINDOW', window)
+        os.environ.setdefault('SDL_VIDEODRIVER', 'offscreen')
+
+
+class Settler:
+    """Runs the Clock (and drawing, when there is a window) until a change is on screen."""
+
+    def __init__(self, window):
+        from kivy.clock import Clock
+        self.clock = Clock
+        self.event_loop = None
+        self.root = None
+        if window != 'none':
+            from kivy.base import EventLoop
+            EventLoop.ensure_window()
+            self.event_loop = EventLoop
+
+    def show(self, widget):
+        """Put a widget on the window so settle() draws it; no-op without a window."""
+        if self.event_loop is None:
+            return
+        if widget is self.root:
+            return
+        window = self.event_loop.window
+        if self.root is not None:
+            window.remove_widget(self.root)
+        window.add_widget(widget)
+        self.root = widget
+
+    def settle(self):
+        for _ in range(SETTLE_TICKS):
+            if self.event_loop is not None:
+                self.event_loop.idle()
+            else:
+                self.clock.tick()
+
+
+def count_widgets(widget):
+    return sum(1 for _ in widget.walk(restrict=True))
+
+
+# =============================================================================
+# OPERATIONS
+# =============================================================================
+
+def ui_operations(app, settler):
+    """Operations by name; each runs once and returns the widget tree it produced."""
+    from models.todo_screen import TodoScreen
+    from models.category import CategoryScreen
+    from models.deadline import DeadlineScreen
+    from models.stats_screen import StatsScreen
+
+    db = app.db
+    todo = app.todo_widget
+    category = app.screen_widget('categories')
+    deadline = app.screen_widget('deadlines')
+
+    def first_paint():
+        screen = TodoScreen(db)
+        settler.show(screen)
+        settler.settle()
+        return screen
+
+    def refreshed(screen_name, screen, refresh):
+        def run():
+            settler.show(app.root)
+            app.sm.current = screen_name
+            refresh()
+            settler.settle()
+            return screen
+        return run
+
+    def build_stats():
+        screen = StatsScreen(db)
+        settler.show(screen)
+        settler.settle()
+        return screen
+
+    def toggle_theme():
+        settler.show(app.root)
+        app.toggle_theme(app.theme_btn)
+        settler.settle()
+        return app.root
+
+    return {
+        'TodoScreen first paint': first_paint,
+        'TodoScreen.refresh_tasks': refreshed('todo', todo, todo.refresh_tasks),
+        'CategoryScreen.__init__': lambda: CategoryScreen(db),
+        'CategoryScreen.refresh_view': refreshed('categories', category, category.refresh_view),
+        'DeadlineScreen.__init__': lambda: DeadlineScreen(db),
+        'DeadlineScreen.refresh_deadlines': refreshed('deadlines', deadline, deadline.refresh_deadlines),
+        'StatsScreen.__init__': build_stats,
+        'MainApp.toggle_theme': toggle_theme,
+    }
+
+
+# =============================================================================
+# RUNNER
+# =============================================================================
+
+def peak_memory(function):
+    """Peak bytes allocated while a function runs, measured apart from the timed runs."""
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        function()
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+
+@contextmanager
+def headless_app(dataset_path, window='none'):
+    """MainApp built on a copy of a dataset in a throwaway data directory; yields (app, settler)."""
+    configure_headless(window)
+    previous_cwd = os.getcwd()
+    previous_workspaces = Workspaces._instance
+    with tempfile.TemporaryDirectory() as work_dir:
+        # The theme is saved to data/theme.json relative to the working directory
+        os.makedirs(os.path.join(work_dir, 'data'))
+        Workspaces._instance = Workspaces(os.path.join(work_dir, 'data'))
+        os.chdir(work_dir)
+        try:
+            from main import MainApp
+            from kivy.uix.screenmanager import NoTransition
+
+            shutil.copyfile(dataset_path, Workspaces.instance().path())
+            settler = Settler(window)
+            app = MainApp()
+            app.root = app.build()  # App.run() would also start the event loop
+            app.sm.transition = NoTransition()
+            for job in (app.backup_manager, app.archiver, app.maintenance):
+                job.cancel()  # Measure the UI, not idle-time housekeeping
+            if app.sync_client:
+                app.sync_client.cancel()
+            settler.show(app.root)
+            settler.settle()
+            try:
+                yield app, settler
+            finally:
+                app.on_stop()
+        finally:
+            os.chdir(previous_cwd)
+            Workspaces._instance = previous_workspaces
+
+
+def bench_app(app, settler, size, repeat):
+    """Time every UI operation against a running app."""
+    results = []
+    for name, function in ui_operations(app, settler).items():
+        QueryCache.clear()
+        widget = function()  # Warm-up run
+        samples = []
+        for _ in range(repeat):
+            QueryCache.clear()  # Every sample pays for its queries, as after a data change
+            started = time.perf_counter()
+            widget = function()
+            samples.append((time.perf_counter() - started) * 1000)
+        QueryCache.clear()
+        results.append(dict(size=size, operation=name, kind='ui', widgets=count_widgets(widget),
+                            peak_memory_kb=round(peak_memory(function) / 1024, 1), **summarize(samples)))
+    return results
+
+
+def run_ui_benchmarks(sizes=DEFAULT_SIZES, repeat=DEFAULT_REPEAT, seed=42, cache_dir=None, window='none',
+                      progress=None):
+    """Run the UI benchmark at each dataset size; returns the JSON-ready report."""
+    cache_dir = os.path.abspath(cache_dir or os.path.join(tempfile.gettempdir(), 'todoapp-bench'))
+    results = []
+    for size in sizes:
+        if progress:
+            progress(f"Preparing {size} tasks...")
+        dataset_path = ensure_dataset(cache_dir, size, seed)
+        if progress:
+            progress(f"Timing {size} tasks...")
+        with headless_app(dataset_path, window) as (app, settler):
+            results.extend(bench_app(app, settler, size, repeat))
+    return {
+        'benchmark': 'ui',
+        'meta': environment_info(seed=seed, repeat=repeat, sizes=list(sizes), window=window),
+        'results': results,
+    }
+
+
+def print_table(report, out=sys.stderr):
+    """Median time, widget count and peak memory per operation and dataset size."""
+    print(f"{'operation':<34}{'tasks':>8}{'median ms':>12}{'stdev':>10}{'widgets':>10}{'peak KB':>12}", file=out)
+    for row in report['results']:
+        print(f"{row['operation']:<34}{row['size']:>8}{row['median_ms']:>12.1f}{row['stdev_ms']:>10.1f}"
+              f"{row['widgets']:>10}{row['peak_memory_kb']:>12.0f}", file=out)
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark screen builds and refreshes with a headless Kivy.")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated task counts (default: 1000,10000)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Timed runs per operation")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--cache-dir', help="Where generated datasets are kept between runs")
+    parser.add_argument('--window', default='none', choices=['none', 'sdl2'],
+                        help="'none' skips drawing; 'sdl2' draws on an offscreen window")
+    parser.add_argument('--output', help="Write the JSON report here instead of standard output")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    report = run_ui_benchmarks(sizes, args.repeat, args.seed, args.cache_dir, args.window,
+                               progress=lambda message: print(message, file=sys.stderr))
+    print_table(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -1,3 +1,4 @@
+from models.startup import StartupProfiler     # First, so the timeline starts before Kivy loads
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
@@ -7,12 +8,20 @@ from kivy.graphics import Color, Rectangle
 from kivy.clock import Clock
 
 from models.todo_screen import TodoScreen
-from models.category import CategoryScreen
-from models.deadline import DeadlineScreen
 from models.custom_ui import UIConfig, ModernButton
-from models.stats_screen import StatsScreen
-from models.database import TodoDB
+from models.database import TodoDB, DeadlineDB, DataVersion
+from models.backup import BackupManager
+from models.archive import TaskArchiver, load_archive_age
+from models.maintenance import MaintenanceScheduler
+from models.storage import Storage, Workspaces
+from models.instrumentation import QueryProfiler
+from models.diagnostics import LeakDetector, diagnostics_enabled
+from models.hooks import sampling_hook_from_env
+from models.sync import ChangeLog, SyncClient, load_sync_url
+# The category, deadline and statistics screens and the debug overlay are
+# imported when first shown, so they do not delay the first frame
 
+StartupProfiler.mark('imports')
 
 
 # =============================================================================
@@ -20,9 +29,12 @@ from models.database import TodoDB
 # =============================================================================
 
 class MainApp(App):
+    REMINDER_INTERVAL = 300         # Seconds between deadline reminder checks
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.theme_listeners = []  # List of widgets that need theme updates
+        self.screen_widgets = {}   # Lazily built category and deadline screens, by screen name
 
     def create_icon_button(self, text, icon_source, button_type='primary'):
         """Helper method to create button with icon (placed in MainApp class)"""
@@ -53,39 +65,83 @@ class MainApp(App):
         self.size = (360, 640)  # Window size
         self.title = "Todo App - Task Management"
         
-        UIConfig.load_theme()  # Load saved theme
+        with StartupProfiler.phase('theme load'):
+            UIConfig.load_theme()  # Load saved theme
         
         try:
-            self.db = TodoDB()  # Initialize database
+            with StartupProfiler.phase('DB init'):
+                self.db = TodoDB()  # Initialize database
         except Exception as e:
             print(f"Failed to initialize database: {e}")
             return Label(text="Database initialization error!")
         
+        with StartupProfiler.phase('background jobs'):
+            self.start_background_jobs()
+        
         self.sm = ScreenManager()
         
         # Create todo screen
         self.todo_screen = Screen(name='todo')
-        self.todo_widget = TodoScreen(self.db)
+        with StartupProfiler.phase('build TodoScreen'):
+            self.todo_widget = TodoScreen(self.db, on_workspace_change=self.on_workspace_change)
         self.todo_screen.add_widget(self.todo_widget)
         self.sm.add_widget(self.todo_screen)
         self.theme_listeners.append(self.todo_widget)
         
-        # Create stats screen
+        # The other screens are filled on their first visit
         self.stats_screen = Screen(name='stats')
         self.sm.add_widget(self.stats_screen)
-        
-        # Create category screen
         self.category_screen = Screen(name='categories')
-        self.category_screen.add_widget(CategoryScreen(self.db))
         self.sm.add_widget(self.category_screen)
-        self.theme_listeners.append(self.category_screen.children[0])
-
-        # Create deadline screen
         self.deadline_screen = Screen(name='deadlines')
-        self.deadline_screen.add_widget(DeadlineScreen(self.db))
         self.sm.add_widget(self.deadline_screen)
-        self.theme_listeners.append(self.deadline_screen.children[0])
         
+        with StartupProfiler.phase('build navigation'):
+            root = self.build_root()
+        StartupProfiler.watch_first_frame(self)
+        return root
+
+    def start_background_jobs(self):
+        """Timers and idle-time jobs that run for the whole session"""
+        # In memory mode, write changes back to the file every so often
+        Storage.schedule()
+        
+        # Snapshot the database in the background whenever the app is idle
+        self.backup_manager = BackupManager(self.db.db_path, Workspaces.instance().backup_dir())
+        self.backup_manager.schedule()
+        
+        # Move old completed tasks to the archive a little at a time while idle
+        self.archiver = TaskArchiver(self.db.conn, load_archive_age())
+        self.archiver.schedule()
+        
+        # Integrity checks and vacuuming in small steps while idle
+        self.maintenance = MaintenanceScheduler(self.db.conn)
+        self.maintenance.schedule()
+        
+        # Delta sync with a server, only when one is configured
+        self.sync_client = None
+        sync_url = load_sync_url()
+        if sync_url and ChangeLog.install(self.db.conn):
+            self.sync_client = SyncClient(self.db.db_path, sync_url)
+            self.sync_client.schedule(on_pulled=self.on_sync_pulled)
+        
+        # One reminder timer for the app; screens are refreshed, not rebuilt, on navigation
+        self.reminder_db = DeadlineDB(self.db.db_path)
+        self.reminder_event = Clock.schedule_interval(self.check_reminders, self.REMINDER_INTERVAL)
+        
+        # Leak snapshots for long sessions, only when asked for
+        self.leak_detector = None
+        if diagnostics_enabled():
+            self.leak_detector = LeakDetector(self, trace_memory=True)
+            self.leak_detector.schedule()
+        
+        # Aggregated storage and refresh timings written to a file, only when asked for
+        self.hook_sampler = sampling_hook_from_env()
+        if self.hook_sampler:
+            self.hook_sampler.schedule()
+
+    def build_root(self):
+        """Screen manager above the navigation bar"""
         # Main container - child widgets will be arranged vertically (top to bottom)
         root = BoxLayout(orientation='vertical')
         root.add_widget(self.sm)
@@ -108,7 +164,7 @@ class MainApp(App):
         self.stats_btn.bind(on_press=lambda _: self.switch_to_stats())
         
         self.category_btn = ModernButton(text="Category", button_type='success', color=(1, 1, 1, 1))
-        self.category_btn.bind(on_press=lambda _: setattr(self.sm, 'current', 'categories'))
+        self.category_btn.bind(on_press=lambda _: self.show_categories())
         
         self.deadline_btn = ModernButton(text="Deadline", button_type='warning', color=(1, 1, 1, 1))
         self.deadline_btn.bind(on_press=lambda _: self.switch_to_deadlines())
@@ -122,11 +178,17 @@ class MainApp(App):
         )
         self.theme_btn.bind(on_press=self.toggle_theme)
         
+        # Debug overlay with frame times, widget counts, DB time and Clock events
+        self.perf_overlay = None
+        self.perf_btn = ModernButton(text="P", button_type='secondary', size_hint_x=None, width=40)
+        self.perf_btn.bind(on_press=lambda _: self.toggle_perf_overlay())
+        
         nav_buttons.add_widget(self.todo_btn)
         nav_buttons.add_widget(self.stats_btn)
         nav_buttons.add_widget(self.category_btn)
         nav_buttons.add_widget(self.deadline_btn)
         nav_buttons.add_widget(self.theme_btn)
+        nav_buttons.add_widget(self.perf_btn)
         
         root.add_widget(nav_buttons)
         return root
@@ -149,14 +211,31 @@ class MainApp(App):
             self.category_btn.color = (1, 1, 1, 1)
             self.deadline_btn.color = (1, 1, 1, 1)
             self.theme_btn.color = (1, 1, 1, 1)
+            self.perf_btn.color = (1, 1, 1, 1)
         
         Clock.schedule_once(fix_nav_colors, 0.1)
 
+    def toggle_perf_overlay(self):
+        """Show or hide the performance overlay"""
+        if self.perf_overlay is None:
+            from models.perf_overlay import PerfOverlay
+            self.perf_overlay = PerfOverlay(self.sm)
+        self.perf_overlay.toggle()
+
     def switch_to_stats(self):
         """Switch to statistics screen with refresh"""
+        stats_widget = getattr(self, 'stats_widget', None)
+        if stats_widget is not None and stats_widget.data_version == DataVersion.value:
+            # Nothing changed since the last visit, reuse the built screen
+            self.sm.current = 'stats'
+            return
+        
         if 'stats' in [screen.name for screen in self.sm.screens]:
             self.sm.remove_widget(self.stats_screen)
+        if stats_widget in self.theme_listeners:
+            self.theme_listeners.remove(stats_widget)
         
+        from models.stats_screen import StatsScreen  # Analytics and charts load on the first visit
         self.stats_screen = Screen(name='stats')
         self.stats_widget = StatsScreen(self.db)
         self.stats_screen.add_widget(self.stats_widget)
@@ -164,32 +243,102 @@ class MainApp(App):
         self.theme_listeners.append(self.stats_widget)
         self.sm.current = 'stats'
 
+    def screen_widget(self, name):
+        """Get the widget of the categories or deadlines screen, building it on first use"""
+        widget = self.screen_widgets.get(name)
+        if widget is None:
+            with StartupProfiler.phase(f"build {name} screen"):
+                if name == 'categories':
+                    from models.category import CategoryScreen
+                    widget = CategoryScreen(self.db)
+                else:
+                    from models.deadline import DeadlineScreen
+                    widget = DeadlineScreen(self.db)
+            self.sm.get_screen(name).add_widget(widget)
+            self.theme_listeners.append(widget)
+            self.screen_widgets[name] = widget
+        return widget
+
+    def show_categories(self):
+        """Switch to categories screen as it was last shown"""
+        self.screen_widget('categories')
+        self.sm.current = 'categories'
+
     def switch_to_categories(self):
         """Switch to categories screen with refresh"""
-        if 'categories' in [screen.name for screen in self.sm.screens]:
-            self.sm.remove_widget(self.category_screen)
-        
-        self.category_screen = Screen(name='categories')
-        self.category_screen.add_widget(CategoryScreen(self.db))
-        self.sm.add_widget(self.category_screen)
-        self.theme_listeners.append(self.category_screen.children[0])
+        if 'categories' in self.screen_widgets:
+            self.screen_widgets['categories'].refresh_view()
+        else:
+            self.screen_widget('categories')  # A new screen is already fresh
         self.sm.current = 'categories'
 
     def switch_to_deadlines(self):
         """Switch to deadlines screen with refresh"""
-        if 'deadlines' in [screen.name for screen in self.sm.screens]:
-            self.sm.remove_widget(self.deadline_screen)
-        
-        self.deadline_screen = Screen(name='deadlines')
-        self.deadline_screen.add_widget(DeadlineScreen(self.db))
-        self.sm.add_widget(self.deadline_screen)
-        self.theme_listeners.append(self.deadline_screen.children[0])
+        if 'deadlines' in self.screen_widgets:
+            self.screen_widgets['deadlines'].refresh_deadlines()
+        else:
+            self.screen_widget('deadlines')
         self.sm.current = 'deadlines'
 
+    def check_reminders(self, dt):
+        """Periodic deadline reminders, whether or not the deadline screen was opened"""
+        from models.deadline import remind_due_tasks
+        remind_due_tasks(self.reminder_db)
+
+    def on_workspace_change(self, name):
+        """Re-point screens and background jobs after TodoScreen switched workspace"""
+        category_widget = self.screen_widgets.get('categories')
+        if category_widget is not None:
+            category_widget.category_db.open(self.db.db_path)
+            category_widget.refresh_view()
+        deadline_widget = self.screen_widgets.get('deadlines')
+        if deadline_widget is not None:
+            deadline_widget.deadline_db = DeadlineDB(self.db.db_path)
+            deadline_widget.refresh_deadlines()
+        self.backup_manager.db_path = self.db.db_path
+        self.backup_manager.backup_dir = Workspaces.instance().backup_dir(name)
+        self.archiver.conn = self.db.conn
+        self.maintenance.conn = self.db.conn
+        self.maintenance.create_table()
+        self.reminder_db = DeadlineDB(self.db.db_path)
+        # Sync keeps running on the workspace it was configured for
+
+    def on_sync_pulled(self):
+        """Refresh the visible task list after changes arrived from other devices"""
+        self.todo_widget.refresh_tasks()
+
+    def on_pause(self):
+        """Flush before the OS may kill a paused app"""
+        Storage.flush()
+        return True
+
     def on_stop(self):
         """Clean up when app is closed"""
+        if getattr(self, 'perf_overlay', None):
+            self.perf_overlay.hide()
+        if hasattr(self, 'reminder_event'):
+            self.reminder_event.cancel()
+        if getattr(self, 'leak_detector', None):
+            self.leak_detector.cancel()
+            self.leak_detector.snapshot('stop')
+            self.leak_detector.report()
+        if getattr(self, 'hook_sampler', None):
+            self.hook_sampler.cancel()
+            self.hook_sampler.detach()
+            self.hook_sampler.flush()
+        if hasattr(self, 'backup_manager'):
+            self.backup_manager.cancel()
+        if hasattr(self, 'archiver'):
+            self.archiver.cancel()
+        if getattr(self, 'sync_client', None):
+            self.sync_client.cancel()
+        if hasattr(self, 'maintenance'):
+            self.maintenance.on_close()
         if hasattr(self, 'db'):
             self.db.close()
+        Storage.close()  # Final flush in memory mode
+        if QueryProfiler.enabled:
+            QueryProfiler.print_report()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,264 @@
+import sqlite3
+from datetime import date, timedelta
+
+
+WEEKDAY_NAMES = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+
+# =============================================================================
+# PRODUCTIVITY ANALYTICS
+# =============================================================================
+
+class ProductivityAnalytics:
+    """Windowed productivity metrics computed in SQL over the per-day series."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def refresh_series(self):
+        """Collapse tasks and archive rollups into one row per day; the other metrics read this series."""
+        self.conn.execute('DROP TABLE IF EXISTS temp.daily_series')
+        self.conn.execute('''CREATE TEMP TABLE daily_series AS
+                             SELECT day, SUM(created) AS created, SUM(completed) AS completed
+                             FROM (SELECT date AS day, COUNT(*) AS created, SUM(done) AS completed
+                                   FROM tasks
+                                   GROUP BY date
+                                   UNION ALL
+                                   SELECT day, SUM(completed), SUM(completed)
+                                   FROM task_rollups
+                                   GROUP BY day)
+                             GROUP BY day''')
+
+    def rolling_rates(self, today=None):
+        """Get 7- and 30-day completion rates of tasks created in each window."""
+        today = today or date.today()
+        start = today - timedelta(days=29)
+        try:
+            # Build a gap-free calendar, join the per-day counts and let window
+            # functions do the rolling sums instead of looping over task rows.
+            cursor = self.conn.execute('''
+                WITH RECURSIVE days(day) AS (
+                    SELECT ?
+                    UNION ALL
+                    SELECT date(day, '+1 day') FROM days WHERE day < ?
+                ),
+                series AS (
+                    SELECT d.day,
+                           COALESCE(s.created, 0) AS created,
+                           COALESCE(s.completed, 0) AS completed
+                    FROM days d LEFT JOIN temp.daily_series s ON s.day = d.day
+                )
+                SELECT SUM(completed) OVER w7, SUM(created) OVER w7,
+                       SUM(completed) OVER w30, SUM(created) OVER w30
+                FROM series
+                WINDOW w7 AS (ORDER BY day ROWS BETWEEN 6 PRECEDING AND CURRENT ROW),
+                       w30 AS (ORDER BY day ROWS BETWEEN 29 PRECEDING AND CURRENT ROW)
+                ORDER BY day DESC
+                LIMIT 1''', (start.isoformat(), today.isoformat()))
+            done_7, created_7, done_30, created_30 = cursor.fetchone()
+            return {
+                'rate_7': done_7 / created_7 * 100 if created_7 else 0.0,
+                'rate_30': done_30 / created_30 * 100 if created_30 else 0.0,
+                'completed_7': done_7,
+                'completed_30': done_30,
+            }
+        except sqlite3.Error as e:
+            print(f"Error getting rolling rates: {e}")
+            return {'rate_7': 0.0, 'rate_30': 0.0, 'completed_7': 0, 'completed_30': 0}
+
+    def streaks(self, today=None):
+        """Get current and longest streaks of consecutive days with completions."""
+        today = today or date.today()
+        try:
+            # Gaps-and-islands: consecutive days share the same julianday - row_number
+            cursor = self.conn.execute('''
+                WITH islands AS (
+                    SELECT day, julianday(day) - ROW_NUMBER() OVER (ORDER BY day) AS grp
+                    FROM temp.daily_series
+                    WHERE completed > 0
+                ),
+                runs AS (
+                    SELECT MAX(day) AS end_day, COUNT(*) AS length
+                    FROM islands
+                    GROUP BY grp
+                )
+                SELECT COALESCE(MAX(length), 0),
+                       COALESCE((SELECT length FROM runs
+                                 WHERE end_day >= date(?, '-1 day')
+                                 ORDER BY end_day DESC LIMIT 1), 0)
+                FROM runs''', (today.isoformat(),))
+            longest, current = cursor.fetchone()
+            return {'current': current, 'longest': longest}
+        except sqlite3.Error as e:
+            print(f"Error getting streaks: {e}")
+            return {'current': 0, 'longest': 0}
+
+    def weekday_distribution(self):
+        """Get completed task counts per weekday, Monday first."""
+        try:
+            cursor = self.conn.execute('''
+                SELECT CAST(strftime('%w', day) AS INTEGER), SUM(completed)
+                FROM temp.daily_series
+                GROUP BY 1''')
+            counts = [0] * 7
+            for sqlite_weekday, count in cursor.fetchall():
+                if sqlite_weekday is not None:
+                    counts[(sqlite_weekday + 6) % 7] = count  # SQLite counts from Sunday
+            return dict(zip(WEEKDAY_NAMES, counts))
+        except sqlite3.Error as e:
+            print(f"Error getting weekday distribution: {e}")
+            return dict.fromkeys(WEEKDAY_NAMES, 0)
+
+    def category_trends(self, days=30, today=None):
+        """Get completed tasks per category in the last window vs the one before."""
+        today = today or date.today()
+        recent_start = today - timedelta(days=days - 1)
+        previous_start = recent_start - timedelta(days=days)
+        try:
+            cursor = self.conn.execute('''
+                SELECT COALESCE(c.name, 'No Category'),
+                       SUM(CASE WHEN t.day >= ? THEN t.n ELSE 0 END) AS recent,
+                       SUM(CASE WHEN t.day < ? THEN t.n ELSE 0 END) AS previous
+                FROM (SELECT date AS day, COALESCE(category_id, 0) AS category_id, 1 AS n
+                      FROM tasks
+                      WHERE done = 1 AND date BETWEEN ? AND ?
+                      UNION ALL
+                      SELECT day, category_id, completed
+                      FROM task_rollups
+                      WHERE day BETWEEN ? AND ?) t
+                LEFT JOIN categories c ON t.category_id = c.id
+                GROUP BY t.category_id
+                ORDER BY recent DESC, previous DESC''',
+                (recent_start.isoformat(), recent_start.isoformat(),
+                 previous_start.isoformat(), today.isoformat(),
+                 previous_start.isoformat(), today.isoformat()))
+            return [(name, recent, previous) for name, recent, previous in cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Error getting category trends: {e}")
+            return []
+
+    def get_summary(self, today=None):
+        """Get all productivity metrics in one dictionary."""
+        try:
+            self.refresh_series()
+        except sqlite3.Error as e:
+            print(f"Error building daily series: {e}")
+        return {
+            'rates': self.rolling_rates(today),
+            'streaks': self.streaks(today),
+            'weekdays': self.weekday_distribution(),
+            'categories': self.category_trends(today=today),
+        }
+
+
+# =============================================================================
+# LEAD TIME ANALYTICS
+# =============================================================================
+
+# Latency buckets in hours: (label, upper bound); the last bucket is open-ended
+LEAD_TIME_BUCKETS = [
+    ('< 1h', 1),
+    ('1-24h', 24),
+    ('1-3d', 72),
+    ('3-7d', 168),
+    ('7-30d', 720),
+    ('> 30d', None),
+]
+
+# Hours between creation and completion; both timestamps are stored in UTC
+LEAD_HOURS_SQL = "(julianday(completed_at) - julianday(created_at)) * 24.0"
+
+# Completed tasks, hot and archived, with the columns the latency metrics read
+COMPLETED_TASKS_SQL = '''(SELECT category_id, created_at, completed_at, deadline_date, deadline_time
+                          FROM tasks WHERE done = 1
+                          UNION ALL
+                          SELECT category_id, created_at, completed_at, deadline_date, deadline_time
+                          FROM archived_tasks)'''
+
+
+class LeadTimeAnalytics:
+    """Created-to-completed latency metrics, one aggregate query per view."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def category_percentiles(self):
+        """Get (category, count, median hours, p90 hours) using nearest-rank percentiles."""
+        try:
+            # LIMIT -1 keeps the subquery from being flattened, so the latency
+            # expression is evaluated once per row instead of once per reference
+            cursor = self.conn.execute(f'''
+                WITH ranked AS (
+                    SELECT category_id, hours,
+                           CUME_DIST() OVER (PARTITION BY category_id ORDER BY hours) AS cd
+                    FROM (SELECT category_id, {LEAD_HOURS_SQL} AS hours
+                          FROM {COMPLETED_TASKS_SQL}
+                          WHERE completed_at IS NOT NULL AND created_at IS NOT NULL
+                          LIMIT -1)
+                )
+                SELECT COALESCE(c.name, 'No Category'),
+                       COUNT(*) AS n,
+                       MIN(CASE WHEN r.cd >= 0.5 THEN r.hours END),
+                       MIN(CASE WHEN r.cd >= 0.9 THEN r.hours END)
+                FROM ranked r
+                LEFT JOIN categories c ON r.category_id = c.id
+                GROUP BY r.category_id
+                ORDER BY n DESC''')
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error getting lead time percentiles: {e}")
+            return []
+
+    def histogram(self):
+        """Get completion latency counts per bucket as a list of (label, count)."""
+        bucket_cases = ' '.join(
+            f"WHEN hours < {upper} THEN {index}"
+            for index, (_, upper) in enumerate(LEAD_TIME_BUCKETS) if upper is not None
+        )
+        try:
+            cursor = self.conn.execute(f'''
+                SELECT CASE {bucket_cases} ELSE {len(LEAD_TIME_BUCKETS) - 1} END AS bucket,
+                       COUNT(*)
+                FROM (SELECT {LEAD_HOURS_SQL} AS hours
+                      FROM {COMPLETED_TASKS_SQL}
+                      WHERE completed_at IS NOT NULL AND created_at IS NOT NULL
+                      LIMIT -1)
+                GROUP BY bucket''')
+            counts = dict(cursor.fetchall())
+            return [(label, counts.get(index, 0)) for index, (label, _) in enumerate(LEAD_TIME_BUCKETS)]
+        except sqlite3.Error as e:
+            print(f"Error getting lead time histogram: {e}")
+            return [(label, 0) for label, _ in LEAD_TIME_BUCKETS]
+
+    def deadline_performance(self):
+        """Get on-time and late completion counts against the task deadline."""
+        try:
+            # Deadlines are local 'YYYY-MM-DD HH:MM' strings, so the completion time
+            # is converted to local time and compared as text; a date-only deadline
+            # lasts until the end of the day.
+            cursor = self.conn.execute(f'''
+                SELECT COALESCE(SUM(completed <= deadline), 0),
+                       COALESCE(SUM(completed > deadline), 0)
+                FROM (SELECT datetime(completed_at, 'localtime') AS completed,
+                             deadline_date || ' ' || COALESCE(deadline_time, '23:59') || ':59' AS deadline
+                      FROM {COMPLETED_TASKS_SQL}
+                      WHERE completed_at IS NOT NULL AND deadline_date IS NOT NULL
+                      LIMIT -1)''')
+            on_time, late = cursor.fetchone()
+            total = on_time + late
+            return {
+                'on_time': on_time,
+                'late': late,
+                'on_time_rate': on_time / total * 100 if total else 0.0,
+            }
+        except sqlite3.Error as e:
+            print(f"Error getting deadline performance: {e}")
+            return {'on_time': 0, 'late': 0, 'on_time_rate': 0.0}
+
+    def get_summary(self):
+        """Get all lead time metrics in one dictionary."""
+        return {
+            'categories': self.category_percentiles(),
+            'histogram': self.histogram(),
+            'deadlines': self.deadline_performance(),
+        }
@@ -0,0 +1,160 @@
+import argparse
+import json
+import os
+import sqlite3
+import time
+from datetime import date, timedelta
+
+from models.database import ARCHIVE_COLUMNS, DataVersion, create_archive_tables
+from models.sync import suppress_change_log
+
+
+# =============================================================================
+# TASK ARCHIVER
+# =============================================================================
+
+class TaskArchiver:
+    """Moves old completed tasks into archived_tasks in batches, keeping daily rollups."""
+
+    MAX_AGE_DAYS = 30               # Completed tasks older than this are archived
+    BATCH_SIZE = 500                # Tasks moved per transaction
+    TIME_BUDGET = 0.05              # Seconds of archiving per idle check, to keep frames smooth
+    IDLE_SECONDS = 10               # Data must be unchanged this long before archiving
+    CHECK_INTERVAL = 20             # Seconds between idle checks
+
+    # Local completion day, or the task date for tasks completed before it was tracked
+    DAY_SQL = "COALESCE(date(completed_at, 'localtime'), date)"
+
+    def __init__(self, conn, max_age_days=MAX_AGE_DAYS, batch_size=BATCH_SIZE):
+        self.conn = conn
+        self.max_age_days = max_age_days
+        self.batch_size = batch_size
+        self.seen_version = DataVersion.value
+        self.seen_version_time = time.monotonic()
+        self._event = None
+        create_archive_tables(conn)
+
+    def cutoff(self, today=None):
+        """Get the day before which completed tasks are archived."""
+        return ((today or date.today()) - timedelta(days=self.max_age_days)).isoformat()
+
+    def pending_count(self, today=None):
+        """Count tasks waiting to be archived."""
+        try:
+            return self.conn.execute(f'''SELECT COUNT(*) FROM tasks
+                                         WHERE done = 1 AND {self.DAY_SQL} < ?''',
+                                     (self.cutoff(today),)).fetchone()[0]
+        except sqlite3.Error as e:
+            print(f"Error counting archivable tasks: {e}")
+            return 0
+
+    def archive_batch(self, today=None):
+        """Move one batch of old completed tasks in a single transaction; returns the count."""
+        ids = [row[0] for row in self.conn.execute(f'''SELECT id FROM tasks
+                                                       WHERE done = 1 AND {self.DAY_SQL} < ?
+                                                       ORDER BY id LIMIT ?''',
+                                                   (self.cutoff(today), self.batch_size))]
+        if not ids:
+            return 0
+
+        task_columns = {row[1] for row in self.conn.execute('PRAGMA table_info(tasks)')}
+        columns = ', '.join(column for column in ARCHIVE_COLUMNS if column in task_columns)
+        id_list = json.dumps(ids)
+        # Archiving is local housekeeping; other devices keep their own copies
+        with self.conn, suppress_change_log(self.conn):
+            self.conn.execute(f'''INSERT INTO archived_tasks ({columns})
+                                  SELECT {columns} FROM tasks
+                                  WHERE id IN (SELECT value FROM json_each(?))''', (id_list,))
+            self.conn.execute('''INSERT INTO task_rollups (day, category_id, completed)
+                                 SELECT date, COALESCE(category_id, 0), COUNT(*) FROM tasks
+                                 WHERE id IN (SELECT value FROM json_each(?))
+                                 GROUP BY date, COALESCE(category_id, 0)
+                                 ON CONFLICT (day, category_id) DO UPDATE
+                                 SET completed = completed + excluded.completed''', (id_list,))
+            self.conn.execute('DELETE FROM tasks WHERE id IN (SELECT value FROM json_each(?))', (id_list,))
+        return len(ids)
+
+    def archive(self, time_budget=None, today=None):
+        """Archive batches until none are left or the time budget is spent; returns the count."""
+        started = time.monotonic()
+        moved = 0
+        try:
+            while True:
+                count = self.archive_batch(today)
+                moved += count
+                if count < self.batch_size:
+                    break
+                if time_budget is not None and time.monotonic() - started >= time_budget:
+                    break
+        except sqlite3.Error as e:
+            print(f"Error archiving tasks: {e}")
+        if moved:
+            DataVersion.bump()
+        return moved
+
+    # -------------------------------------------------------------------------
+    # Idle-time scheduling
+    # -------------------------------------------------------------------------
+
+    def schedule(self):
+        """Check periodically for idle time and archive a little at a time."""
+        from kivy.clock import Clock
+        if self._event is None and self.max_age_days > 0:
+            self._event = Clock.schedule_interval(self.on_idle_check, self.CHECK_INTERVAL)
+
+    def cancel(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def on_idle_check(self, dt):
+        now = time.monotonic()
+        if DataVersion.value != self.seen_version:
+            self.seen_version = DataVersion.value
+            self.seen_version_time = now
+            return
+        if now - self.seen_version_time < self.IDLE_SECONDS:
+            return
+        if self.archive(self.TIME_BUDGET):
+            # Our own bump is not user activity
+            self.seen_version = DataVersion.value
+
+
+def load_archive_age(default=TaskArchiver.MAX_AGE_DAYS):
+    """Get the archive age in days from TODOAPP_ARCHIVE_DAYS; 0 turns archiving off."""
+    try:
+        return max(0, int(os.environ.get('TODOAPP_ARCHIVE_DAYS', default)))
+    except ValueError:
+        print("Ignoring invalid TODOAPP_ARCHIVE_DAYS")
+        return default
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive old completed tasks.")
+    parser.add_argument('--db', default="data/todo.db", help="Database file (default: data/todo.db)")
+    parser.add_argument('--days', type=int, default=load_archive_age(),
+                        help="Archive tasks completed more than this many days ago")
+    parser.add_argument('--dry-run', action='store_true', help="Only count the tasks that would move")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"Database not found: {args.db}")
+        return 1
+    conn = sqlite3.connect(args.db)
+    try:
+        archiver = TaskArchiver(conn, args.days)
+        if args.dry_run:
+            print(f"{archiver.pending_count()} tasks would be archived")
+        else:
+            print(f"Archived {archiver.archive()} tasks")
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
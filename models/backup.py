@@ -0,0 +1,236 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from models.database import DataVersion
+from models.storage import Storage
+
+
+# =============================================================================
+# BACKUP MANAGER
+# =============================================================================
+
+class BackupManager:
+    """Online snapshots of the task database with rotation, verification and restore."""
+
+    PAGES_PER_STEP = 64             # Pages copied per backup step before yielding
+    STEP_SLEEP = 0.005              # Seconds before retrying a step that found the database busy or locked
+    STEP_PAUSE = 0.001              # Seconds between steps so writers on other threads can get the lock
+    KEEP_RECENT = 5                 # Newest snapshots always kept
+    KEEP_DAILY = 7                  # Plus the newest snapshot of each of the last N days
+    INTERVAL = 30 * 60              # Seconds between automatic snapshots
+    IDLE_SECONDS = 10               # Data must be unchanged this long before a snapshot
+    CHECK_INTERVAL = 15             # Seconds between idle checks
+
+    def __init__(self, db_path="data/todo.db", backup_dir="data/backups",
+                 keep_recent=KEEP_RECENT, keep_daily=KEEP_DAILY):
+        self.db_path = db_path
+        self.backup_dir = backup_dir
+        self.keep_recent = keep_recent
+        self.keep_daily = keep_daily
+        self.running = False
+        self.last_backup_time = None
+        self.last_backup_version = None
+        self.seen_version = DataVersion.value
+        self.seen_version_time = time.monotonic()
+        self.last_result = None
+        self._event = None
+
+    # -------------------------------------------------------------------------
+    # Snapshots
+    # -------------------------------------------------------------------------
+
+    def list_snapshots(self):
+        """Get snapshot file paths, newest first."""
+        if not os.path.isdir(self.backup_dir):
+            return []
+        names = [name for name in os.listdir(self.backup_dir)
+                 if name.startswith('todo-') and name.endswith('.db')]
+        return [os.path.join(self.backup_dir, name) for name in sorted(names, reverse=True)]
+
+    def create_snapshot(self, progress=None, rotate=True):
+        """Copy the database page by page into a new verified snapshot; returns its path."""
+        os.makedirs(self.backup_dir, exist_ok=True)
+        name = f"todo-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.db"
+        final_path = os.path.join(self.backup_dir, name)
+        temp_path = final_path + '.part'
+
+        def step(status, remaining, total):
+            time.sleep(self.STEP_PAUSE)  # backup() itself only sleeps after a busy step
+            if progress:
+                progress(status, remaining, total)
+
+        try:
+            source = Storage.connect(self.db_path)
+            target = sqlite3.connect(temp_path)
+            try:
+                # Each step copies PAGES_PER_STEP pages and releases the source lock
+                source.backup(target, pages=self.PAGES_PER_STEP, progress=step,
+                              sleep=self.STEP_SLEEP)
+            finally:
+                target.close()
+                source.close()
+
+            if not self.verify_snapshot(temp_path):
+                os.remove(temp_path)
+                print(f"Backup failed integrity check: {name}")
+                return None
+            os.replace(temp_path, final_path)  # Only verified snapshots get a final name
+            if rotate:
+                self.rotate()
+            return final_path
+        except (sqlite3.Error, OSError) as e:
+            print(f"Error creating backup: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return None
+
+    def verify_snapshot(self, path):
+        """Run PRAGMA integrity_check on a snapshot file."""
+        try:
+            conn = sqlite3.connect(Path(path).resolve().as_uri() + '?mode=ro', uri=True)
+            try:
+                result = conn.execute('PRAGMA integrity_check').fetchall()
+            finally:
+                conn.close()
+            return result == [('ok',)]
+        except sqlite3.Error as e:
+            print(f"Error verifying backup {path}: {e}")
+            return False
+
+    def rotate(self):
+        """Delete snapshots outside the retention policy; returns the deleted paths."""
+        snapshots = self.list_snapshots()
+        keep = set(snapshots[:self.keep_recent])
+        days_kept = set()
+        for path in snapshots:
+            day = os.path.basename(path)[5:13]  # todo-YYYYMMDD-...
+            if day not in days_kept and len(days_kept) < self.keep_daily:
+                days_kept.add(day)
+                keep.add(path)
+
+        deleted = []
+        for path in snapshots:
+            if path not in keep:
+                try:
+                    os.remove(path)
+                    deleted.append(path)
+                except OSError as e:
+                    print(f"Error deleting old backup {path}: {e}")
+        return deleted
+
+    def restore_snapshot(self, path, target_conn=None):
+        """Copy a verified snapshot over the live database.
+
+        Pass the app's open connection as target_conn so other connections to
+        the same file see the restored data immediately.
+        """
+        if not self.verify_snapshot(path):
+            print(f"Refusing to restore damaged backup: {path}")
+            return False
+
+        # Keep the current state too, in case the restore was a mistake; no
+        # rotation yet, it could delete the snapshot being restored
+        if self.create_snapshot(rotate=False) is None:
+            print("Refusing to restore: the current database could not be backed up first")
+            return False
+
+        try:
+            source = sqlite3.connect(Path(path).resolve().as_uri() + '?mode=ro', uri=True)
+            target = target_conn or Storage.connect(self.db_path)
+            try:
+                source.backup(target, pages=self.PAGES_PER_STEP)
+            finally:
+                source.close()
+                if target_conn is None:
+                    target.close()
+            DataVersion.bump()
+            return True
+        except sqlite3.Error as e:
+            print(f"Error restoring backup: {e}")
+            return False
+
+    # -------------------------------------------------------------------------
+    # Idle-time scheduling
+    # -------------------------------------------------------------------------
+
+    def schedule(self):
+        """Check periodically for idle time and take snapshots in the background."""
+        from kivy.clock import Clock
+        if self._event is None:
+            self._event = Clock.schedule_interval(self.on_idle_check, self.CHECK_INTERVAL)
+
+    def cancel(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def on_idle_check(self, dt):
+        now = time.monotonic()
+        if DataVersion.value != self.seen_version:
+            self.seen_version = DataVersion.value
+            self.seen_version_time = now
+            return
+
+        due = self.last_backup_time is None or now - self.last_backup_time >= self.INTERVAL
+        idle = now - self.seen_version_time >= self.IDLE_SECONDS
+        changed = self.last_backup_version != DataVersion.value
+        if self.running or not (due and idle and changed):
+            return
+
+        # The copy runs on a worker thread with its own connection, so frames
+        # keep rendering; the backup yields the lock between page steps.
+        self.running = True
+        self.last_backup_version = DataVersion.value
+        threading.Thread(target=self._run_backup, daemon=True).start()
+
+    def _run_backup(self):
+        try:
+            self.last_result = self.create_snapshot()
+        finally:
+            self.last_backup_time = time.monotonic()
+            self.running = False
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage task database backups.")
+    parser.add_argument('--db', default="data/todo.db", help="Database file (default: data/todo.db)")
+    parser.add_argument('--dir', default="data/backups", help="Backup directory (default: data/backups)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help="List snapshots and their integrity")
+    sub.add_parser('create', help="Take a snapshot now")
+    restore = sub.add_parser('restore', help="Restore a snapshot (default: newest)")
+    restore.add_argument('snapshot', nargs='?')
+    args = parser.parse_args(argv)
+
+    manager = BackupManager(args.db, args.dir)
+    if args.command == 'list':
+        for path in manager.list_snapshots():
+            status = 'ok' if manager.verify_snapshot(path) else 'DAMAGED'
+            print(f"{path}  {os.path.getsize(path)} bytes  {status}")
+        return 0
+    if args.command == 'create':
+        path = manager.create_snapshot()
+        print(path or "Backup failed")
+        return 0 if path else 1
+
+    snapshots = manager.list_snapshots()
+    snapshot = args.snapshot or (snapshots[0] if snapshots else None)
+    if not snapshot:
+        print("No snapshots found")
+        return 1
+    ok = manager.restore_snapshot(snapshot)
+    print(f"Restored {snapshot}" if ok else "Restore failed")
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
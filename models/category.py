@@ -1,4 +1,3 @@
-import sqlite3
 import json
 import os
 from kivy.event import EventDispatcher
@@ -10,11 +9,14 @@ from kivy.uix.button import Button
 from kivy.uix.spinner import Spinner
 from kivy.uix.popup import Popup
 from kivy.uix.scrollview import ScrollView
-from kivy.uix.gridlayout import GridLayout
+from kivy.uix.checkbox import CheckBox
 from kivy.graphics import Color, Rectangle
 from kivy.uix.widget import Widget
 
 from models.database import CategoryDB
+from models.hooks import hook_methods
+from models.journal import OperationJournal
+from models.task_store import TaskStore
 
 
 class UIConfig(EventDispatcher):
@@ -128,6 +130,10 @@ class CategoryPopup(Popup):
         # Bind theme change
         UIConfig().bind(theme_changed=self.on_theme_changed)
     
+    def on_dismiss(self):
+        # The theme singleton outlives the popup; an unreleased binding keeps it alive
+        UIConfig().unbind(theme_changed=self.on_theme_changed)
+    
     def build_content(self):
         content = BoxLayout(orientation='vertical', spacing=10, padding=10)
         
@@ -239,6 +245,10 @@ class TaskCategoryPopup(Popup):
         # Bind theme change
         UIConfig().bind(theme_changed=self.on_theme_changed)
     
+    def on_dismiss(self):
+        # The theme singleton outlives the popup; an unreleased binding keeps it alive
+        UIConfig().unbind(theme_changed=self.on_theme_changed)
+    
     def build_content(self):
         content = BoxLayout(orientation='vertical', spacing=10, padding=10)
         
@@ -322,22 +332,25 @@ class TaskCategoryPopup(Popup):
                     category_id = cat_id
                     break
         
-        self.category_db.set_task_category(self.task_id, category_id)
-        
-        tags = self.tags_input.text.strip()
-        if tags:
-            self.category_db.add_tag_to_task(self.task_id, tags)
+        # Category and tags are one change as far as undo is concerned
+        with OperationJournal.instance().group("Categorize task"):
+            self.category_db.set_task_category(self.task_id, category_id)
+            
+            tags = self.tags_input.text.strip()
+            if tags:
+                self.category_db.add_tag_to_task(self.task_id, tags)
         
         if self.callback:
             self.callback()
         self.dismiss()
 
 
+@hook_methods('refresh_view', 'update_filter_options', 'update_stats', 'refresh_tasks', 'apply_theme')
 class CategoryScreen(BoxLayout):
     def __init__(self, main_db, **kwargs):
         super().__init__(**kwargs)
         self.main_db = main_db
-        self.category_db = CategoryDB()
+        self.category_db = CategoryDB(main_db.db_path)
         self.orientation = 'vertical'
         self.spacing = 5
         self.padding = 10
@@ -431,6 +444,12 @@ class CategoryScreen(BoxLayout):
         
         self.search_btn.bind(on_press=lambda x: self.search_by_tag())
         filter_section.add_widget(self.search_btn)
+
+        # Include archived tasks in tag searches
+        self.archived_check = CheckBox(size_hint_x=None, width=30)
+        filter_section.add_widget(self.archived_check)
+        self.archived_label = Label(text="Archived", size_hint_x=None, width=60)
+        filter_section.add_widget(self.archived_label)
         
         self.add_widget(filter_section)
         self.add_widget(self.create_divider())
@@ -466,6 +485,7 @@ class CategoryScreen(BoxLayout):
         self.title_label.color = UIConfig.get_color('TEXT_COLOR')
         self.filter_label.color = UIConfig.get_color('TEXT_COLOR')
         self.tag_label.color = UIConfig.get_color('TEXT_COLOR')
+        self.archived_label.color = UIConfig.get_color('TEXT_COLOR')
         
         # Apply theme to buttons
         self.apply_button_theme(self.add_category_btn, 'PRIMARY_COLOR')
@@ -624,7 +644,7 @@ class CategoryScreen(BoxLayout):
                     selected_category = cat_id
                     break
         
-        tasks = self.category_db.get_tasks_by_category(selected_category)
+        tasks = TaskStore.for_db(self.main_db).get_tasks_by_category(selected_category)
         
         if not tasks:
             no_tasks_label = Label(
@@ -640,7 +660,8 @@ class CategoryScreen(BoxLayout):
             return
 
         # Create task list
-        for task_id, title, done, category_name, category_icon in tasks:
+        for task in tasks:
+            task_id, title, done, category_name = task.id, task.title, task.done, task.category_name
             task_layout = BoxLayout(
                 size_hint_y=None,
                 height=70,
@@ -701,16 +722,12 @@ class CategoryScreen(BoxLayout):
 
     def toggle_task_status(self, task_id):
         """Toggle task completion status"""
-        try:
-            self.main_db.conn.execute(
-                'UPDATE tasks SET done = 1 - done WHERE id = ?',
-                (task_id,)
-            )
-            self.main_db.conn.commit()
-            self.refresh_view()
-        except sqlite3.Error as e:
-            print(f"Error toggling task status: {e}")
+        # Through TodoDB so the task store and the task list follow the change
+        task = TaskStore.for_db(self.main_db).get(task_id)
+        if task is None or not self.main_db.mark_done(task_id, 0 if task.done else 1):
             self.show_error("Error updating task status!")
+            return
+        self.refresh_view()
 
     def add_category(self):
         """Open popup to add new category"""
@@ -785,7 +802,8 @@ class CategoryScreen(BoxLayout):
             return
 
         self.tasks_container.clear_widgets()
-        tasks = self.category_db.search_tasks_by_tag(tag)
+        tasks = TaskStore.for_db(self.main_db).search_tasks_by_tag(tag,
+                                                                   include_archived=self.archived_check.active)
         
         if not tasks:
             no_tasks_label = Label(
@@ -797,7 +815,9 @@ class CategoryScreen(BoxLayout):
             self.tasks_container.add_widget(no_tasks_label)
             return
 
-        for task_id, title, done, category_name, category_icon, tags in tasks:
+        for task in tasks:
+            task_id, title, done, archived = task.id, task.title, task.done, task.archived
+            category_name, tags = task.category_name, task.tags
             task_layout = BoxLayout(
                 size_hint_y=None, height=50, spacing=5, padding=5
             )
@@ -810,6 +830,7 @@ class CategoryScreen(BoxLayout):
                 color=UIConfig.get_color('TEXT_COLOR')
             )
             status_btn.bind(on_press=lambda x, tid=task_id: self.toggle_task_status(tid))
+            status_btn.disabled = bool(archived)  # Archived tasks are read-only
             task_layout.add_widget(status_btn)
 
             task_info = BoxLayout(orientation='vertical', spacing=2)
@@ -821,6 +842,8 @@ class CategoryScreen(BoxLayout):
                 text_size=(self.width - 200, None)
             )
             category_text = f"[{category_name}] {tags}" if category_name else f"[No Category] {tags}"
+            if archived:
+                category_text += " (archived)"
             category_label = Label(
                 text=category_text,
                 size_hint_y=None,
@@ -841,6 +864,7 @@ class CategoryScreen(BoxLayout):
             )
             categorize_btn.bind(on_press=lambda x, tid=task_id, ttitle=title: 
                               self.open_categorize_popup(tid, ttitle))
+            categorize_btn.disabled = bool(archived)
             task_layout.add_widget(categorize_btn)
 
             self.tasks_container.add_widget(task_layout)
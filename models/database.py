@@ -1,22 +1,118 @@
-import os
+import json
 import sqlite3
 import traceback
-from datetime import datetime
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from models.hooks import hook_methods
+from models.journal import OperationJournal
+from models.storage import Storage, Workspaces
+
+
+# =============================================================================
+# DATA VERSION AND QUERY CACHE
+# =============================================================================
+
+class DataVersion:
+    """Process-wide change counter, incremented by every write path."""
+
+    value = 0
+
+    @classmethod
+    def bump(cls):
+        """Record that the data changed; cached results become stale."""
+        cls.value += 1
+        QueryCache.clear()
+        return cls.value
+
+
+class QueryCache:
+    """Query results keyed on (query, parameters, data version)."""
+
+    MAX_ENTRIES = 64
+    snapshot_version = None         # Set by Storage.snapshot() while reading one snapshot
+    _results = OrderedDict()
+
+    @classmethod
+    def get_or_compute(cls, query, params, compute):
+        """Return the cached result for the current data version or compute it."""
+        version = DataVersion.value if cls.snapshot_version is None else cls.snapshot_version
+        key = (query, params, version)
+        if key in cls._results:
+            cls._results.move_to_end(key)
+            return cls._results[key]
+
+        result = compute()  # Errors propagate so failed queries are never cached
+        cls._results[key] = result
+        if len(cls._results) > cls.MAX_ENTRIES:
+            cls._results.popitem(last=False)
+        return result
+
+    @classmethod
+    def clear(cls):
+        """Drop all cached results."""
+        cls._results.clear()
+
+
+# =============================================================================
+# ARCHIVE TABLES
+# =============================================================================
+
+# Columns copied from tasks into the archive; the original id is kept but not
+# unique there, since SQLite may hand it out again once the task has moved
+ARCHIVE_COLUMNS = ['id', 'title', 'done', 'date', 'category_id', 'tags', 'created_at', 'completed_at',
+                   'deadline_date', 'deadline_time', 'priority', 'sync_id']
+
+
+def create_archive_tables(conn):
+    """Create the cold table for archived tasks and the daily rollups of what it holds."""
+    conn.execute('''CREATE TABLE IF NOT EXISTS archived_tasks
+                    (archive_id INTEGER PRIMARY KEY,
+                     id INTEGER NOT NULL,
+                     title TEXT NOT NULL,
+                     done INTEGER DEFAULT 1,
+                     date TEXT NOT NULL,
+                     category_id INTEGER,
+                     tags TEXT,
+                     created_at TIMESTAMP,
+                     completed_at TIMESTAMP,
+                     deadline_date TEXT,
+                     deadline_time TEXT,
+                     priority TEXT,
+                     sync_id TEXT,
+                     archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_archived_tasks_sync_id ON archived_tasks (sync_id)')
+    # Completed counts per task date and category (0 = none), so stats stay
+    # intact without reading the archive
+    conn.execute('''CREATE TABLE IF NOT EXISTS task_rollups
+                    (day TEXT NOT NULL,
+                     category_id INTEGER NOT NULL DEFAULT 0,
+                     completed INTEGER NOT NULL DEFAULT 0,
+                     PRIMARY KEY (day, category_id))''')
+    conn.commit()
 
 
 # =============================================================================
 # DATABASE CLASS
 # =============================================================================
 
+@hook_methods()
 class TodoDB:
     """Database manager for Todo application."""
     
-    def __init__(self):
+    def __init__(self, db_path=None):
         """Initialize database connection and create tables."""
+        self.open(db_path or Workspaces.instance().path())
+
+    def open(self, db_path):
+        """Use another database (e.g. a workspace switch) through its shared connection."""
         try:
-            self.conn = sqlite3.connect("data/todo.db")
+            self.db_path = db_path
+            self.conn = Storage.writer(db_path)
             self.create_table()
             self.create_deadline_table()
+            create_archive_tables(self.conn)
+            self.reader = Storage.reader(db_path)  # Reports read here and never wait for writes
         except sqlite3.Error as e:
             print(f"Database error: {e}")
             raise
@@ -32,6 +128,12 @@ class TodoDB:
                                   category_id INTEGER,
                                   tags TEXT,
                                   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+            try:
+                self.conn.execute('ALTER TABLE tasks ADD COLUMN completed_at TIMESTAMP')
+            except sqlite3.OperationalError:
+                pass  # Column already exists
+            # Covers the per-day completion series used by stats and analytics
+            self.conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_date_done ON tasks (date, done)')
             self.conn.commit()
         except sqlite3.Error as e:
             print(f"Error creating table: {e}")
@@ -65,9 +167,13 @@ class TodoDB:
                 raise ValueError("Task title cannot be empty")
             
             today = datetime.today().strftime('%Y-%m-%d')  # Get current date
-            self.conn.execute("INSERT INTO tasks (title, done, date) VALUES (?, 0, ?)", 
-                            (title.strip(), today))
+            cursor = self.conn.execute("INSERT INTO tasks (title, done, date) VALUES (?, 0, ?)", 
+                                       (title.strip(), today))
+            journal = OperationJournal.instance()
+            redo = journal.insert_op(self.conn, 'tasks', cursor.lastrowid)
             self.conn.commit()
+            journal.record("Add task", [("DELETE FROM tasks WHERE id = ?", (cursor.lastrowid,))], [redo])
+            DataVersion.bump()
             return True
         except (sqlite3.Error, ValueError) as e:
             print(f"Error adding task: {e}")
@@ -90,8 +196,19 @@ class TodoDB:
     def mark_done(self, task_id, done):
         """Mark task as completed or pending."""
         try:
-            self.conn.execute("UPDATE tasks SET done = ? WHERE id = ?", (done, task_id))
+            journal = OperationJournal.instance()
+            columns = ('done', 'completed_at')
+            before = journal.capture(self.conn, 'tasks', task_id, columns)
+            # Keep the first completion time; reopening a task clears it
+            self.conn.execute("""UPDATE tasks
+                                 SET done = ?,
+                                     completed_at = CASE WHEN ? = 1 THEN COALESCE(completed_at, CURRENT_TIMESTAMP) END
+                                 WHERE id = ?""", (done, done, task_id))
+            after = journal.capture(self.conn, 'tasks', task_id, columns)
             self.conn.commit()
+            journal.record_update("Complete task" if done else "Reopen task", 'tasks', task_id,
+                                  columns, before, after)
+            DataVersion.bump()
             return True
         except sqlite3.Error as e:
             print(f"Error marking task: {e}")
@@ -100,8 +217,13 @@ class TodoDB:
     def delete_task(self, task_id):
         """Delete a task from the database."""
         try:
+            journal = OperationJournal.instance()
+            undo = journal.insert_op(self.conn, 'tasks', task_id)
             self.conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
             self.conn.commit()
+            if undo:
+                journal.record("Delete task", [undo], [("DELETE FROM tasks WHERE id = ?", (task_id,))])
+            DataVersion.bump()
             return True
         except sqlite3.Error as e:
             print(f"Error deleting task: {e}")
@@ -110,36 +232,82 @@ class TodoDB:
     def get_stats(self):
         """Get statistics of completed tasks by date."""
         try:
-            # Query database to get completion statistics by date
-            cursor = self.conn.execute("SELECT date, COUNT(*) FROM tasks WHERE done = 1 GROUP BY date ORDER BY date")
-            return dict(cursor.fetchall())
+            return QueryCache.get_or_compute('get_stats', (), self._query_stats)
         except sqlite3.Error as e:
             print(f"Error getting stats: {e}")
             return {}
 
+    def get_completed_tasks_on(self, day):
+        """Get completed tasks dated on a given day (same grouping as get_stats, not completed_at)."""
+        try:
+            # Archived tasks are in the rollups get_stats counts, so they are listed too
+            cursor = self.reader.execute("""SELECT id, title FROM tasks WHERE done = 1 AND date = ?
+                                            UNION ALL
+                                            SELECT id, title FROM archived_tasks WHERE done = 1 AND date = ?
+                                            ORDER BY id""", (day, day))
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error getting completed tasks: {e}")
+            return []
+
     def get_task_summary(self):
         """Get summary of total, completed, and pending tasks."""
         try:
-            cursor = self.conn.execute("SELECT COUNT(*) as total, SUM(done) as completed FROM tasks")
-            result = cursor.fetchone()
-            total = result[0] if result[0] else 0
-            completed = result[1] if result[1] else 0
-            pending = total - completed
-            return {'total': total, 'completed': completed, 'pending': pending}
+            return QueryCache.get_or_compute('get_task_summary', (), self._query_task_summary)
         except sqlite3.Error as e:
             print(f"Error getting summary: {e}")
             return {'total': 0, 'completed': 0, 'pending': 0}
 
+    def _query_stats(self):
+        # Query database to get completion statistics by date, archived tasks included
+        cursor = self.reader.execute('''SELECT day, SUM(n) FROM
+                                      (SELECT date AS day, COUNT(*) AS n FROM tasks WHERE done = 1 GROUP BY date
+                                       UNION ALL
+                                       SELECT day, SUM(completed) FROM task_rollups GROUP BY day)
+                                      GROUP BY day ORDER BY day''')
+        return dict(cursor.fetchall())
+
+    def _query_task_summary(self):
+        cursor = self.reader.execute('''SELECT (SELECT COUNT(*) FROM tasks) as total,
+                                             (SELECT SUM(done) FROM tasks) as completed,
+                                             (SELECT SUM(completed) FROM task_rollups) as archived''')
+        result = cursor.fetchone()
+        archived = result[2] if result[2] else 0
+        total = (result[0] if result[0] else 0) + archived
+        completed = (result[1] if result[1] else 0) + archived
+        pending = total - completed
+        return {'total': total, 'completed': completed, 'pending': pending}
+
+    def undo(self):
+        """Undo the newest journaled change; returns its label or None."""
+        label = OperationJournal.instance().undo(self.conn)
+        if label:
+            DataVersion.bump()
+        return label
+
+    def redo(self):
+        """Redo the newest undone change; returns its label or None."""
+        label = OperationJournal.instance().redo(self.conn)
+        if label:
+            DataVersion.bump()
+        return label
+
     def close(self):
         """Close database connection."""
         if self.conn:
-            self.conn.close()
+            Storage.release(self.reader)
+            Storage.release(self.conn)
 
+@hook_methods()
 class CategoryDB:
-    def __init__(self, db_path="data/todo.db"):
-        os.makedirs('data', exist_ok=True)
-        self.conn = sqlite3.connect(db_path)
+    def __init__(self, db_path=None):
+        self.open(db_path or Workspaces.instance().path())
+
+    def open(self, db_path):
+        self.db_path = db_path
+        self.conn = Storage.writer(db_path)
         self.create_category_tables()
+        self.reader = Storage.reader(db_path)
     
     def create_category_tables(self):
         try:
@@ -154,6 +322,7 @@ class CategoryDB:
                 self.conn.execute('ALTER TABLE tasks ADD COLUMN tags TEXT')
             except sqlite3.OperationalError:
                 pass
+            create_archive_tables(self.conn)
             default_categories = [
                 ('Work', 'Work', '#2196F3'),
                 ('Personal', 'Personal', '#4CAF50'), 
@@ -162,21 +331,30 @@ class CategoryDB:
                 ('Shopping', 'Shopping', '#9C27B0'),
                 ('Home', 'Home', '#795548')
             ]
+            inserted = False
             for name, icon, color in default_categories:
                 try:
                     self.conn.execute('INSERT INTO categories (name, icon, color) VALUES (?, ?, ?)',
                                     (name, icon, color))
+                    inserted = True
                 except sqlite3.IntegrityError:
                     pass
             self.conn.commit()
+            if inserted:  # Opening an existing database must not invalidate every cache
+                DataVersion.bump()
         except sqlite3.Error as e:
             print(f"Error creating category tables: {e}")
     
     def add_category(self, name, icon='Default', color='#4CAF50'):
         try:
-            self.conn.execute('INSERT INTO categories (name, icon, color) VALUES (?, ?, ?)',
-                            (name, icon, color))
+            cursor = self.conn.execute('INSERT INTO categories (name, icon, color) VALUES (?, ?, ?)',
+                                       (name, icon, color))
+            journal = OperationJournal.instance()
+            redo = journal.insert_op(self.conn, 'categories', cursor.lastrowid)
             self.conn.commit()
+            journal.record("Add category",
+                           [('DELETE FROM categories WHERE id = ?', (cursor.lastrowid,))], [redo])
+            DataVersion.bump()
             return True
         except sqlite3.Error as e:
             print(f"Error adding category: {e}")
@@ -192,10 +370,56 @@ class CategoryDB:
     
     def delete_category(self, category_id):
         try:
-            self.conn.execute('UPDATE tasks SET category_id = NULL WHERE category_id = ?', 
+            journal = OperationJournal.instance()
+            restore_category = journal.insert_op(self.conn, 'categories', category_id)
+            task_ids = [row[0] for row in self.conn.execute('SELECT id FROM tasks WHERE category_id = ?',
+                                                            (category_id,))]
+            archived_ids = [row[0] for row in self.conn.execute(
+                'SELECT archive_id FROM archived_tasks WHERE category_id = ?', (category_id,))]
+            rollups = self.conn.execute('SELECT day, completed FROM task_rollups WHERE category_id = ?',
+                                        (category_id,)).fetchall()
+            self.conn.execute('UPDATE tasks SET category_id = NULL WHERE category_id = ?',
                             (category_id,))
+            # Archived tasks and their rollups lose the category too, so stats keep counting them
+            uncategorize_archive = []
+            if archived_ids or rollups:
+                uncategorize_archive = [
+                    ('UPDATE archived_tasks SET category_id = NULL WHERE category_id = ?', (category_id,)),
+                    ('''INSERT INTO task_rollups (day, category_id, completed)
+                        SELECT day, 0, completed FROM task_rollups WHERE category_id = ?
+                        ON CONFLICT (day, category_id) DO UPDATE
+                        SET completed = completed + excluded.completed''', (category_id,)),
+                    ('DELETE FROM task_rollups WHERE category_id = ?', (category_id,)),
+                ]
+            for sql, params in uncategorize_archive:
+                self.conn.execute(sql, params)
             self.conn.execute('DELETE FROM categories WHERE id = ?', (category_id,))
             self.conn.commit()
+            if restore_category:
+                # One step: the category and all its task assignments come back together
+                undo = [('UPDATE tasks SET category_id = ? WHERE id IN (SELECT value FROM json_each(?))',
+                         (category_id, json.dumps(task_ids)))]
+                if uncategorize_archive:
+                    counts = json.dumps(rollups)  # [[day, completed], ...]
+                    undo += [('UPDATE archived_tasks SET category_id = ? '
+                              'WHERE archive_id IN (SELECT value FROM json_each(?))',
+                              (category_id, json.dumps(archived_ids))),
+                             ('DELETE FROM task_rollups WHERE category_id = 0 AND completed <= 0', ()),
+                             ('''UPDATE task_rollups
+                                 SET completed = completed - (SELECT json_extract(value, '$[1]') FROM json_each(?)
+                                                              WHERE json_extract(value, '$[0]') = task_rollups.day)
+                                 WHERE category_id = 0
+                                   AND day IN (SELECT json_extract(value, '$[0]') FROM json_each(?))''',
+                              (counts, counts)),
+                             ('''INSERT INTO task_rollups (day, category_id, completed)
+                                 SELECT json_extract(value, '$[0]'), ?, json_extract(value, '$[1]')
+                                 FROM json_each(?)''', (category_id, counts))]
+                undo.append(restore_category)  # Undo runs the ops last to first
+                redo = ([('UPDATE tasks SET category_id = NULL WHERE category_id = ?', (category_id,))]
+                        + uncategorize_archive
+                        + [('DELETE FROM categories WHERE id = ?', (category_id,))])
+                journal.record("Delete category", undo, redo)
+            DataVersion.bump()
             return True
         except sqlite3.Error as e:
             print(f"Error deleting category: {e}")
@@ -203,9 +427,14 @@ class CategoryDB:
     
     def set_task_category(self, task_id, category_id):
         try:
+            journal = OperationJournal.instance()
+            before = journal.capture(self.conn, 'tasks', task_id, ('category_id',))
             self.conn.execute('UPDATE tasks SET category_id = ? WHERE id = ?',
                             (category_id, task_id))
             self.conn.commit()
+            journal.record_update("Categorize task", 'tasks', task_id, ('category_id',),
+                                  before, (category_id,))
+            DataVersion.bump()
             return True
         except sqlite3.Error as e:
             print(f"Error setting task category: {e}")
@@ -231,24 +460,36 @@ class CategoryDB:
     
     def get_category_stats(self):
         try:
-            cursor = self.conn.execute('''SELECT c.id, c.name, c.icon, 
-                                        COUNT(t.id) as total_tasks,
-                                        SUM(CASE WHEN t.done = 1 THEN 1 ELSE 0 END) as completed_tasks
-                                        FROM categories c
-                                        LEFT JOIN tasks t ON c.id = t.category_id
-                                        GROUP BY c.id, c.name, c.icon
-                                        ORDER BY total_tasks DESC''')
-            return cursor.fetchall()
+            return QueryCache.get_or_compute('get_category_stats', (), self._query_category_stats)
         except sqlite3.Error as e:
             print(f"Error getting category stats: {e}")
             return []
     
+    def _query_category_stats(self):
+        # Archived tasks are all completed, so their rollups add to both counts
+        cursor = self.reader.execute('''SELECT c.id, c.name, c.icon, 
+                                    COUNT(t.id) + COALESCE(r.archived, 0) as total_tasks,
+                                    SUM(CASE WHEN t.done = 1 THEN 1 ELSE 0 END) + COALESCE(r.archived, 0)
+                                        as completed_tasks
+                                    FROM categories c
+                                    LEFT JOIN tasks t ON c.id = t.category_id
+                                    LEFT JOIN (SELECT category_id, SUM(completed) AS archived
+                                               FROM task_rollups GROUP BY category_id) r
+                                        ON c.id = r.category_id
+                                    GROUP BY c.id, c.name, c.icon
+                                    ORDER BY total_tasks DESC''')
+        return cursor.fetchall()
+    
     def add_tag_to_task(self, task_id, tags):
         try:
             tag_str = ','.join(tags) if isinstance(tags, list) else tags
+            journal = OperationJournal.instance()
+            before = journal.capture(self.conn, 'tasks', task_id, ('tags',))
             self.conn.execute('UPDATE tasks SET tags = ? WHERE id = ?',
                             (tag_str, task_id))
             self.conn.commit()
+            journal.record_update("Tag task", 'tasks', task_id, ('tags',), before, (tag_str,))
+            DataVersion.bump()
             return True
         except sqlite3.Error as e:
             print(f"Error adding tags: {e}")
@@ -266,14 +507,108 @@ class CategoryDB:
             print(f"Error getting tags: {e}")
             return []
     
-    def search_tasks_by_tag(self, tag):
+    def search_tasks_by_tag(self, tag, include_archived=False):
         try:
-            cursor = self.conn.execute('''SELECT t.id, t.title, t.done, c.name, c.icon, t.tags
-                                        FROM tasks t
+            source = 'SELECT id, title, done, category_id, tags, 0 AS archived FROM tasks'
+            if include_archived:
+                source += ' UNION ALL SELECT id, title, done, category_id, tags, 1 FROM archived_tasks'
+            cursor = self.reader.execute(f'''SELECT t.id, t.title, t.done, c.name, c.icon, t.tags, t.archived
+                                        FROM ({source}) t
                                         LEFT JOIN categories c ON t.category_id = c.id
                                         WHERE t.tags LIKE ?
-                                        ORDER BY t.done ASC, t.id DESC''', (f'%{tag}%',))
+                                        ORDER BY t.archived ASC, t.done ASC, t.id DESC''', (f'%{tag}%',))
             return cursor.fetchall()
         except sqlite3.Error as e:
             print(f"Error searching tasks by tag: {e}")
-            return []
\ No newline at end of file
+            return []
+
+
+@hook_methods()
+class DeadlineDB:
+    def __init__(self, db_path=None):
+        self.db_path = db_path or Workspaces.instance().path()
+        self.conn = Storage.writer(self.db_path)
+        self.create_deadline_table()
+    
+    def create_deadline_table(self):
+        try:
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS task_deadlines
+                                 (id INTEGER PRIMARY KEY,
+                                  task_id INTEGER,
+                                  deadline_date TEXT NOT NULL,
+                                  deadline_time TEXT,
+                                  reminder_sent INTEGER DEFAULT 0,
+                                  FOREIGN KEY (task_id) REFERENCES tasks (id))''')
+            
+            # Add deadline columns to existing tasks table if not exists
+            try:
+                self.conn.execute('ALTER TABLE tasks ADD COLUMN deadline_date TEXT')
+                self.conn.execute('ALTER TABLE tasks ADD COLUMN deadline_time TEXT')
+                self.conn.execute('ALTER TABLE tasks ADD COLUMN priority INTEGER DEFAULT 1')
+            except sqlite3.OperationalError:
+                pass  # Columns already exist
+            
+            self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"Error creating deadline table: {e}")
+    
+    def set_task_deadline(self, task_id, deadline_date, deadline_time=None):
+        try:
+            journal = OperationJournal.instance()
+            columns = ('deadline_date', 'deadline_time')
+            before = journal.capture(self.conn, 'tasks', task_id, columns)
+            self.conn.execute('''UPDATE tasks 
+                               SET deadline_date = ?, deadline_time = ? 
+                               WHERE id = ?''', 
+                            (deadline_date, deadline_time, task_id))
+            self.conn.commit()
+            journal.record_update("Set deadline", 'tasks', task_id, columns, before,
+                                  (deadline_date, deadline_time))
+            DataVersion.bump()
+            return True
+        except sqlite3.Error as e:
+            print(f"Error setting deadline: {e}")
+            return False
+    
+    def get_tasks_with_deadlines(self):
+        try:
+            cursor = self.conn.execute('''SELECT id, title, done, deadline_date, deadline_time, priority
+                                        FROM tasks 
+                                        WHERE deadline_date IS NOT NULL
+                                        ORDER BY deadline_date ASC, deadline_time ASC''')
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error getting tasks with deadlines: {e}")
+            return []
+    
+    def get_overdue_tasks(self):
+        try:
+            today = datetime.now().strftime('%Y-%m-%d')
+            current_time = datetime.now().strftime('%H:%M')
+            
+            cursor = self.conn.execute('''SELECT id, title, deadline_date, deadline_time
+                                        FROM tasks 
+                                        WHERE done = 0 AND deadline_date IS NOT NULL
+                                        AND (deadline_date < ? OR 
+                                             (deadline_date = ? AND deadline_time < ?))''',
+                                     (today, today, current_time))
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error getting overdue tasks: {e}")
+            return []
+    
+    def get_upcoming_tasks(self, days_ahead=3):
+        try:
+            today = datetime.now()
+            future_date = (today + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
+            today_str = today.strftime('%Y-%m-%d')
+            
+            cursor = self.conn.execute('''SELECT id, title, deadline_date, deadline_time
+                                        FROM tasks 
+                                        WHERE done = 0 AND deadline_date IS NOT NULL
+                                        AND deadline_date BETWEEN ? AND ?''',
+                                     (today_str, future_date))
+            return cursor.fetchall()
+        except sqlite3.Error as e:
+            print(f"Error getting upcoming tasks: {e}")
+            return []
@@ -1,4 +1,3 @@
-import sqlite3
 from datetime import datetime, timedelta
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
@@ -6,90 +5,11 @@ from kivy.uix.textinput import TextInput
 from kivy.uix.button import Button
 from kivy.uix.popup import Popup
 from kivy.uix.scrollview import ScrollView
-from kivy.clock import Clock
 
-
-class DeadlineDB:
-    def __init__(self, db_path="data/todo.db"):
-        self.conn = sqlite3.connect(db_path)
-        self.create_deadline_table()
-    
-    def create_deadline_table(self):
-        try:
-            self.conn.execute('''CREATE TABLE IF NOT EXISTS task_deadlines
-                                 (id INTEGER PRIMARY KEY,
-                                  task_id INTEGER,
-                                  deadline_date TEXT NOT NULL,
-                                  deadline_time TEXT,
-                                  reminder_sent INTEGER DEFAULT 0,
-                                  FOREIGN KEY (task_id) REFERENCES tasks (id))''')
-            
-            # Add deadline columns to existing tasks table if not exists
-            try:
-                self.conn.execute('ALTER TABLE tasks ADD COLUMN deadline_date TEXT')
-                self.conn.execute('ALTER TABLE tasks ADD COLUMN deadline_time TEXT')
-                self.conn.execute('ALTER TABLE tasks ADD COLUMN priority INTEGER DEFAULT 1')
-            except sqlite3.OperationalError:
-                pass  # Columns already exist
-            
-            self.conn.commit()
-        except sqlite3.Error as e:
-            print(f"Error creating deadline table: {e}")
-    
-    def set_task_deadline(self, task_id, deadline_date, deadline_time=None):
-        try:
-            self.conn.execute('''UPDATE tasks 
-                               SET deadline_date = ?, deadline_time = ? 
-                               WHERE id = ?''', 
-                            (deadline_date, deadline_time, task_id))
-            self.conn.commit()
-            return True
-        except sqlite3.Error as e:
-            print(f"Error setting deadline: {e}")
-            return False
-    
-    def get_tasks_with_deadlines(self):
-        try:
-            cursor = self.conn.execute('''SELECT id, title, done, deadline_date, deadline_time, priority
-                                        FROM tasks 
-                                        WHERE deadline_date IS NOT NULL
-                                        ORDER BY deadline_date ASC, deadline_time ASC''')
-            return cursor.fetchall()
-        except sqlite3.Error as e:
-            print(f"Error getting tasks with deadlines: {e}")
-            return []
-    
-    def get_overdue_tasks(self):
-        try:
-            today = datetime.now().strftime('%Y-%m-%d')
-            current_time = datetime.now().strftime('%H:%M')
-            
-            cursor = self.conn.execute('''SELECT id, title, deadline_date, deadline_time
-                                        FROM tasks 
-                                        WHERE done = 0 AND deadline_date IS NOT NULL
-                                        AND (deadline_date < ? OR 
-                                             (deadline_date = ? AND deadline_time < ?))''',
-                                     (today, today, current_time))
-            return cursor.fetchall()
-        except sqlite3.Error as e:
-            print(f"Error getting overdue tasks: {e}")
-            return []
-    
-    def get_upcoming_tasks(self, days_ahead=3):
-        try:
-            today = datetime.now()
-            future_date = (today + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
-            today_str = today.strftime('%Y-%m-%d')
-            
-            cursor = self.conn.execute('''SELECT id, title, deadline_date, deadline_time
-                                        FROM tasks 
-                                        WHERE done = 0 AND deadline_date IS NOT NULL
-                                        AND deadline_date BETWEEN ? AND ?''',
-                                     (today_str, future_date))
-            return cursor.fetchall()
-        except sqlite3.Error as e:
-            print(f"Error getting upcoming tasks: {e}")
-            return []
+from models.database import DeadlineDB  # Re-exported; the storage class has no Kivy dependency
+from models.hooks import hook_methods
+from models.task_store import TaskStore
+from models.notifications import NotificationQueue
 
 
 class DeadlinePopup(Popup):
@@ -167,11 +87,12 @@ class DeadlinePopup(Popup):
         error_popup.open()
 
 
+@hook_methods('refresh_deadlines')
 class DeadlineScreen(BoxLayout):
     def __init__(self, main_db, **kwargs):
         super().__init__(**kwargs)
         self.main_db = main_db
-        self.deadline_db = DeadlineDB()
+        self.deadline_db = DeadlineDB(main_db.db_path)
         self.orientation = 'vertical'
         self.spacing = 10
         self.padding = 10
@@ -196,36 +117,36 @@ class DeadlineScreen(BoxLayout):
         scroll.add_widget(self.tasks_container)
         self.add_widget(scroll)
         
-        # Start periodic reminder checking (every 5 minutes)
-        Clock.schedule_interval(self.check_reminders, 300)
-        
         self.refresh_deadlines()
     
     def refresh_deadlines(self):
         self.tasks_container.clear_widgets()
         
+        store = TaskStore.for_db(self.main_db)
+        
         # Display overdue tasks section
-        overdue = self.deadline_db.get_overdue_tasks()
+        overdue = store.get_overdue_tasks()
         if overdue:
             self.add_section_header("OVERDUE TASKS", (1, 0.3, 0.3, 1))
-            for task_id, title, deadline_date, deadline_time in overdue:
-                self.create_deadline_widget(task_id, title, deadline_date, deadline_time, True)
+            for task in overdue:
+                self.create_deadline_widget(task.id, task.title, task.deadline_date, task.deadline_time, True)
         
         # Display upcoming tasks section
-        upcoming = self.deadline_db.get_upcoming_tasks()
+        upcoming = store.get_upcoming_tasks()
         if upcoming:
             self.add_section_header("UPCOMING DEADLINES", (1, 0.8, 0.2, 1))
-            for task_id, title, deadline_date, deadline_time in upcoming:
-                if (task_id, title, deadline_date, deadline_time) not in overdue:
-                    self.create_deadline_widget(task_id, title, deadline_date, deadline_time, False)
+            for task in upcoming:
+                if task not in overdue:
+                    self.create_deadline_widget(task.id, task.title, task.deadline_date, task.deadline_time, False)
         
         # Display all tasks with deadlines
-        all_tasks = self.deadline_db.get_tasks_with_deadlines()
+        all_tasks = store.get_tasks_with_deadlines()
         if all_tasks:
             self.add_section_header("ALL TASKS WITH DEADLINES", (0.2, 0.6, 0.8, 1))
-            for task_id, title, done, deadline_date, deadline_time, priority in all_tasks:
-                if done:  # Only show completed tasks in this section
-                    self.create_completed_deadline_widget(task_id, title, deadline_date, deadline_time)
+            for task in all_tasks:
+                if task.done:  # Only show completed tasks in this section
+                    self.create_completed_deadline_widget(task.id, task.title, task.deadline_date,
+                                                          task.deadline_time)
     
     def add_section_header(self, text, color):
         header = Label(text=text, size_hint_y=None, height=40,
@@ -278,37 +199,28 @@ class DeadlineScreen(BoxLayout):
     
     def check_reminders(self, dt):
         """Check for upcoming deadlines and show reminder notifications"""
-        upcoming = self.deadline_db.get_upcoming_tasks(days_ahead=1)
-        
-        for task_id, title, deadline_date, deadline_time in upcoming:
-            # Check if deadline is within 1 hour
-            try:
-                deadline_dt = datetime.strptime(deadline_date, '%Y-%m-%d')
-                if deadline_time:
-                    time_obj = datetime.strptime(deadline_time, '%H:%M').time()
-                    deadline_dt = deadline_dt.replace(hour=time_obj.hour, 
-                                                    minute=time_obj.minute)
-                
-                now = datetime.now()
-                time_diff = deadline_dt - now
-                
-                if timedelta(minutes=0) <= time_diff <= timedelta(hours=1):
-                    self.show_reminder(title, deadline_date, deadline_time)
-                    
-            except ValueError:
-                continue
+        remind_due_tasks(self.deadline_db)
+
+
+def remind_due_tasks(deadline_db):
+    """Queue a reminder for each task due within the next hour; the app calls this on a timer"""
+    upcoming = deadline_db.get_upcoming_tasks(days_ahead=1)
     
-    def show_reminder(self, title, deadline_date, deadline_time):
-        # Format deadline string for reminder
-        deadline_str = deadline_date
-        if deadline_time:
-            deadline_str += f" {deadline_time}"
+    for task_id, title, deadline_date, deadline_time in upcoming:
+        # Check if deadline is within 1 hour
+        try:
+            deadline_dt = datetime.strptime(deadline_date, '%Y-%m-%d')
+            if deadline_time:
+                time_obj = datetime.strptime(deadline_time, '%H:%M').time()
+                deadline_dt = deadline_dt.replace(hour=time_obj.hour, 
+                                                minute=time_obj.minute)
             
-        reminder_popup = Popup(
-            title="Deadline Reminder",
-            content=Label(text=f"Task: {title}\nDeadline: {deadline_str}"),
-            size_hint=(0.8, 0.4)
-        )
-        reminder_popup.open()
-        # Auto-close reminder after 5 seconds
-        Clock.schedule_once(lambda dt: reminder_popup.dismiss(), 5)
\ No newline at end of file
+            now = datetime.now()
+            time_diff = deadline_dt - now
+            
+            if timedelta(minutes=0) <= time_diff <= timedelta(hours=1):
+                # Close-together reminders are merged into one digest
+                NotificationQueue.instance().push(title, deadline_date, deadline_time)
+                
+        except ValueError:
+            continue
@@ -0,0 +1,112 @@
+import gc
+import os
+import time
+import tracemalloc
+from collections import Counter
+
+
+# =============================================================================
+# LEAK DETECTOR
+# =============================================================================
+
+class LeakDetector:
+    """Periodic snapshots of live widgets, theme listeners, Clock events and allocations.
+
+    A metric that grew at every one of the last WINDOW snapshots is reported as
+    a suspected leak; values that go up and down again are normal churn.
+    """
+
+    WINDOW = 5                      # Consecutive growing snapshots before a metric is flagged
+    MAX_SNAPSHOTS = 100
+    TOP_ALLOCATIONS = 10
+    INTERVAL = 60                   # Seconds between snapshots when scheduled
+
+    def __init__(self, app=None, trace_memory=False):
+        self.app = app
+        self.snapshots = []
+        self._event = None
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+
+    def snapshot(self, label=''):
+        """Count what is alive right now; returns the snapshot and keeps it."""
+        from kivy.clock import Clock
+        from kivy.uix.widget import Widget
+
+        gc.collect()  # Count only what is still reachable
+        widgets = Counter(type(obj).__name__ for obj in gc.get_objects() if isinstance(obj, Widget))
+        snapshot = {
+            'label': label,
+            'time': time.time(),
+            'widgets': widgets,
+            'widget_total': sum(widgets.values()),
+            'theme_listeners': len(getattr(self.app, 'theme_listeners', [])),
+            'clock_events': len(Clock.get_events()) if hasattr(Clock, 'get_events') else 0,
+            'traced_kb': 0,
+            'top_allocations': [],
+        }
+        if tracemalloc.is_tracing():
+            snapshot['traced_kb'] = tracemalloc.get_traced_memory()[0] / 1024
+            stats = tracemalloc.take_snapshot().statistics('lineno')[:self.TOP_ALLOCATIONS]
+            snapshot['top_allocations'] = [(str(stat.traceback), stat.size / 1024, stat.count) for stat in stats]
+
+        self.snapshots.append(snapshot)
+        del self.snapshots[:-self.MAX_SNAPSHOTS]
+        return snapshot
+
+    def metrics(self, snapshot):
+        """Flat {metric: value} of a snapshot, including one metric per widget class."""
+        values = {key: snapshot[key] for key in ('widget_total', 'theme_listeners', 'clock_events', 'traced_kb')}
+        for name, count in snapshot['widgets'].items():
+            values[f"widgets.{name}"] = count
+        return values
+
+    def growth(self, window=None):
+        """Metrics that grew at every step of the last `window` snapshots: {metric: (first, last)}."""
+        window = window or self.WINDOW
+        if len(self.snapshots) < window:
+            return {}
+        series = [self.metrics(snapshot) for snapshot in self.snapshots[-window:]]
+        flagged = {}
+        for metric in series[-1]:
+            values = [values.get(metric, 0) for values in series]
+            if all(later > earlier for earlier, later in zip(values, values[1:])):
+                flagged[metric] = (values[0], values[-1])
+        return flagged
+
+    def report(self, out=None):
+        """Print the latest snapshot and any suspected leaks."""
+        if not self.snapshots:
+            return
+        latest = self.snapshots[-1]
+        print(f"Diagnostics {latest['label']}: {latest['widget_total']} widgets, "
+              f"{latest['theme_listeners']} theme listeners, {latest['clock_events']} Clock events, "
+              f"{latest['traced_kb']:.0f} KB traced", file=out)
+        for metric, (first, last) in sorted(self.growth().items()):
+            print(f"  Growing over {self.WINDOW} snapshots: {metric} {first:g} -> {last:g}", file=out)
+        for location, size_kb, count in latest['top_allocations'][:5]:
+            print(f"  {size_kb:9.1f} KB {count:7} blocks  {location}", file=out)
+
+    # -------------------------------------------------------------------------
+    # Periodic snapshots
+    # -------------------------------------------------------------------------
+
+    def schedule(self, interval=None):
+        from kivy.clock import Clock
+        if self._event is None:
+            self._event = Clock.schedule_interval(self.on_interval, interval or self.INTERVAL)
+
+    def cancel(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def on_interval(self, dt):
+        self.snapshot(time.strftime('%H:%M:%S'))
+        if self.growth():
+            self.report()
+
+
+def diagnostics_enabled():
+    """TODOAPP_DIAGNOSTICS=1 turns on periodic leak snapshots in the app."""
+    return os.environ.get('TODOAPP_DIAGNOSTICS', '').lower() in ('1', 'true', 'yes')
@@ -0,0 +1,165 @@
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+
+EXPORT_COLUMNS = ['id', 'title', 'done', 'category', 'tags', 'deadline_date', 'deadline_time',
+                  'date', 'created_at', 'completed_at']
+
+
+# =============================================================================
+# STREAMING EXPORTER
+# =============================================================================
+
+class TaskExporter:
+    """Streams tasks joined with their category and deadline fields in bounded chunks."""
+
+    CHUNK_SIZE = 1000
+
+    def __init__(self, conn, chunk_size=CHUNK_SIZE):
+        self.conn = conn
+        self.chunk_size = chunk_size
+
+    def build_query(self, status='all', category=None, date_from=None, date_to=None, include_archived=False):
+        """Build the export query and its parameters from the filters."""
+        conditions = []
+        params = []
+        if status == 'completed':
+            conditions.append('t.done = 1')
+        elif status == 'pending':
+            conditions.append('t.done = 0')
+        if category:
+            conditions.append('c.name = ? COLLATE NOCASE')
+            params.append(category)
+        if date_from:
+            conditions.append('t.date >= ?')
+            params.append(date_from)
+        if date_to:
+            conditions.append('t.date <= ?')
+            params.append(date_to)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        source = 'tasks'
+        if include_archived:
+            columns = 'id, title, done, category_id, tags, deadline_date, deadline_time, date, created_at, completed_at'
+            source = f"(SELECT {columns} FROM tasks UNION ALL SELECT {columns} FROM archived_tasks)"
+        query = f'''SELECT t.id, t.title, t.done, c.name, t.tags, t.deadline_date, t.deadline_time,
+                           t.date, t.created_at, t.completed_at
+                    FROM {source} t
+                    LEFT JOIN categories c ON t.category_id = c.id
+                    {where}
+                    ORDER BY t.id'''
+        return query, params
+
+    def iter_rows(self, **filters):
+        """Yield export rows one at a time, fetching them from the cursor in chunks."""
+        query, params = self.build_query(**filters)
+        cursor = self.conn.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(self.chunk_size)
+            if not rows:
+                break
+            yield from rows
+
+    def write_csv(self, out, **filters):
+        """Write matching tasks to a file object as CSV; returns the row count."""
+        writer = csv.writer(out)
+        writer.writerow(EXPORT_COLUMNS)
+        count = 0
+        for row in self.iter_rows(**filters):
+            writer.writerow(['' if value is None else value for value in row])
+            count += 1
+        return count
+
+    def write_jsonl(self, out, **filters):
+        """Write matching tasks to a file object as JSON Lines; returns the row count."""
+        count = 0
+        for row in self.iter_rows(**filters):
+            record = dict(zip(EXPORT_COLUMNS, row))
+            record['done'] = bool(record['done'])
+            record['tags'] = record['tags'].split(',') if record['tags'] else []
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            count += 1
+        return count
+
+    def export(self, out, file_format='csv', **filters):
+        """Write matching tasks in the given format ('csv' or 'jsonl'); returns the row count,
+        or None if the tasks could not be read."""
+        try:
+            if file_format == 'jsonl':
+                return self.write_jsonl(out, **filters)
+            return self.write_csv(out, **filters)
+        except sqlite3.Error as e:
+            print(f"Error exporting tasks: {e}", file=sys.stderr)
+            return None
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export tasks to CSV or JSON Lines without starting the app.")
+    parser.add_argument('output', help="Output file, or '-' for standard output")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="Output format (default: from extension)")
+    parser.add_argument('--db', default="data/todo.db", help="Database file (default: data/todo.db)")
+    parser.add_argument('--status', choices=['all', 'pending', 'completed'], default='all')
+    parser.add_argument('--category', help="Only tasks in this category")
+    parser.add_argument('--from', dest='date_from', help="Only tasks dated on or after YYYY-MM-DD")
+    parser.add_argument('--to', dest='date_to', help="Only tasks dated on or before YYYY-MM-DD")
+    parser.add_argument('--include-archived', action='store_true', help="Also export archived tasks")
+    args = parser.parse_args(argv)
+
+    file_format = args.format
+    if not file_format:
+        extension = os.path.splitext(args.output)[1].lower()
+        file_format = 'jsonl' if extension in ('.jsonl', '.ndjson', '.json') else 'csv'
+
+    if not os.path.exists(args.db):
+        print(f"Database not found: {args.db}", file=sys.stderr)
+        return 1
+    # Never modifies the database; as_uri() escapes '?' and '#' in the path
+    conn = sqlite3.connect(Path(os.path.abspath(args.db)).as_uri() + '?mode=ro', uri=True)
+    exporter = TaskExporter(conn)
+    filters = dict(status=args.status, category=args.category,
+                   date_from=args.date_from, date_to=args.date_to, include_archived=args.include_archived)
+    try:
+        if args.output == '-':
+            count = exporter.export(sys.stdout, file_format, **filters)
+        else:
+            count = export_file(exporter, args.output, file_format, filters)
+    finally:
+        conn.close()
+
+    if count is None:
+        print("Export failed", file=sys.stderr)
+        return 1
+    print(f"Exported {count} tasks", file=sys.stderr)
+    return 0
+
+
+def export_file(exporter, path, file_format, filters):
+    """Export to a temporary file that replaces `path` only if the export succeeded."""
+    fd, temp_path = tempfile.mkstemp(prefix='.export-', dir=os.path.dirname(os.path.abspath(path)))
+    count = None
+    try:
+        with open(fd, 'w', newline='', encoding='utf-8') as out:
+            count = exporter.export(out, file_format, **filters)
+        if count is not None:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(temp_path, 0o666 & ~umask)  # mkstemp creates owner-only files
+            os.replace(temp_path, path)
+    finally:
+        if count is None and os.path.exists(temp_path):
+            os.remove(temp_path)
+    return count
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,121 @@
+from datetime import date, timedelta
+from kivy.uix.widget import Widget
+from kivy.uix.label import Label
+from kivy.uix.popup import Popup
+from kivy.graphics import Color, Rectangle
+from kivy.graphics.texture import Texture
+
+from models.custom_ui import UIConfig
+
+
+# =============================================================================
+# YEAR HEATMAP
+# =============================================================================
+
+class YearHeatmap(Widget):
+    """GitHub-style heatmap of completed tasks per task date, drawn from one 53x7 pixel texture.
+
+    Days are the tasks' own date, like the statistics chart and the archive
+    rollups, not the day they were ticked off.
+    """
+
+    WEEKS = 53
+    DAYS = 7
+    LEVELS = 4                      # Color steps above "no completions"
+    OUTSIDE = 255                   # Level marker for cells after today
+
+    def __init__(self, db, **kwargs):
+        super().__init__(**kwargs)
+        self.db = db
+        self.size_hint_y = None
+        self.end_day = date.today()
+        # First column starts on the Monday 52 weeks before the current week
+        self.start_day = self.end_day - timedelta(days=self.end_day.weekday() + 7 * (self.WEEKS - 1))
+        self.levels = bytearray(self.WEEKS * self.DAYS)
+        self.buffer = bytearray(self.WEEKS * self.DAYS * 4)
+
+        self.texture = Texture.create(size=(self.WEEKS, self.DAYS), colorfmt='rgba')
+        self.texture.mag_filter = 'nearest'     # Keep day cells sharp when scaled up
+        self.texture.min_filter = 'nearest'
+        with self.canvas:
+            Color(1, 1, 1, 1)
+            self.rect = Rectangle(texture=self.texture, pos=self.pos, size=self.size)
+        self.bind(pos=self.update_rect, size=self.update_rect, width=self.update_height)
+
+        self.load_counts()
+        self.recolor()
+
+    def update_rect(self, *args):
+        self.rect.pos = self.pos
+        self.rect.size = self.size
+
+    def update_height(self, *args):
+        """Keep day cells square"""
+        self.height = self.width * self.DAYS / self.WEEKS
+
+    def cell_index(self, day):
+        """Pixel index of a day; texture rows start at the bottom, Monday is on top"""
+        column = (day - self.start_day).days // 7
+        row = self.DAYS - 1 - day.weekday()
+        return row * self.WEEKS + column
+
+    def load_counts(self):
+        """Turn the per-day counts of completed tasks into color levels"""
+        stats = self.db.get_stats()
+        start, end = self.start_day.isoformat(), self.end_day.isoformat()
+        counts = {day: count for day, count in stats.items() if start <= day <= end}
+        max_count = max(counts.values()) if counts else 0
+
+        for offset in range(self.WEEKS * self.DAYS):
+            day = self.start_day + timedelta(days=offset)
+            index = self.cell_index(day)
+            if day > self.end_day:
+                self.levels[index] = self.OUTSIDE
+                continue
+            count = counts.get(day.isoformat(), 0)
+            # Scale so the busiest day gets the top level and any completion gets at least 1
+            self.levels[index] = -(-count * self.LEVELS // max_count) if count else 0
+
+    def recolor(self):
+        """Fill the pixel buffer from the cached levels with the current theme colors"""
+        empty = UIConfig.get_color('SURFACE_COLOR')
+        full = UIConfig.get_color('SUCCESS_COLOR')
+        palette = []
+        for level in range(self.LEVELS + 1):
+            mix = level / self.LEVELS
+            palette.append(bytes(int(255 * (e + (f - e) * mix)) for e, f in zip(empty[:3], full[:3])) + b'\xff')
+        transparent = b'\x00\x00\x00\x00'
+
+        for index, level in enumerate(self.levels):
+            pixel = transparent if level == self.OUTSIDE else palette[level]
+            self.buffer[index * 4:index * 4 + 4] = pixel
+
+        self.texture.blit_buffer(bytes(self.buffer), colorfmt='rgba', bufferfmt='ubyte')
+        self.canvas.ask_update()
+
+    def on_touch_down(self, touch):
+        if not self.collide_point(*touch.pos) or not self.width or not self.height:
+            return super().on_touch_down(touch)
+        column = min(int((touch.x - self.x) / self.width * self.WEEKS), self.WEEKS - 1)
+        row = min(int((touch.y - self.y) / self.height * self.DAYS), self.DAYS - 1)
+        day = self.start_day + timedelta(days=column * 7 + (self.DAYS - 1 - row))
+        if day <= self.end_day:
+            self.show_day(day)
+        return True
+
+    def show_day(self, day):
+        """List the completed tasks dated on a day"""
+        tasks = self.db.get_completed_tasks_on(day.isoformat())
+        if tasks:
+            text = "\n".join(f"• {title}" for _, title in tasks[:15])
+            if len(tasks) > 15:
+                text += f"\n... and {len(tasks) - 15} more"
+        else:
+            text = "No completed tasks are dated on this day."
+
+        popup = Popup(
+            title=f"{day.strftime('%a %Y-%m-%d')}: {len(tasks)} completed tasks from this day",
+            content=Label(text=text, color=(1, 1, 1, 1)),
+            size_hint=(0.8, 0.5)
+        )
+        popup.open()
@@ -0,0 +1,223 @@
+import inspect
+import json
+import os
+import threading
+import time
+from fnmatch import fnmatchcase
+from functools import wraps
+
+
+# =============================================================================
+# HOOK REGISTRY
+# =============================================================================
+
+class HookRegistry:
+    """Before/after callbacks around storage methods and screen refreshes.
+
+    Events are named '<Class>.<method>', e.g. 'TodoDB.add_task' or
+    'TodoScreen.refresh_tasks', and hooks subscribe with a glob pattern such
+    as 'TodoDB.*'. While no hook is registered a hooked method only costs one
+    extra call and one attribute check.
+    """
+
+    active = False                  # Any hook registered
+    events = set()                  # Every hooked event name, for discovery
+    _hooks = []                     # (pattern, before, after); replaced, never mutated, so calls need no lock
+    _matched = {}                   # Event -> (befores, afters), rebuilt after every change
+    _lock = threading.Lock()
+
+    @classmethod
+    def add(cls, pattern='*', before=None, after=None):
+        """Call before(event, args, kwargs) and after(event, elapsed_ms, result, error) around
+        matching events; args start with the instance. Returns a handle for remove()."""
+        handle = (pattern, before, after)
+        with cls._lock:
+            cls._hooks = cls._hooks + [handle]
+            cls._matched = {}
+            cls.active = True
+        return handle
+
+    @classmethod
+    def remove(cls, handle):
+        with cls._lock:
+            cls._hooks = [hook for hook in cls._hooks if hook is not handle]
+            cls._matched = {}
+            cls.active = bool(cls._hooks)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._hooks = []
+            cls._matched = {}
+            cls.active = False
+
+    @classmethod
+    def matching(cls, event):
+        matched = cls._matched.get(event)
+        if matched is None:
+            registered = cls._hooks
+            hooks = [hook for hook in registered if fnmatchcase(event, hook[0])]
+            matched = ([before for _, before, _ in hooks if before],
+                       [after for _, _, after in hooks if after])
+            with cls._lock:
+                # A hook added or removed meanwhile installed a fresh cache this list must not enter
+                if cls._hooks is registered:
+                    cls._matched[event] = matched
+        return matched
+
+    @classmethod
+    def call(cls, event, method, args, kwargs):
+        """Run a hooked method between its before and after hooks."""
+        befores, afters = cls.matching(event)
+        for before in befores:
+            cls._run(event, before, event, args, kwargs)
+        started = time.perf_counter()
+        result = error = None
+        try:
+            result = method(*args, **kwargs)
+            return result
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            for after in afters:
+                cls._run(event, after, event, elapsed_ms, result, error)
+
+    @staticmethod
+    def _run(event, hook, *args):
+        # A broken profiler must never break the operation it watches
+        try:
+            hook(*args)
+        except Exception as e:
+            print(f"Error in {event} hook: {e}")
+
+
+def hooked(event):
+    """Decorator: the method fires `event` hooks."""
+    def decorate(method):
+        HookRegistry.events.add(event)
+
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            if not HookRegistry.active:
+                return method(*args, **kwargs)
+            return HookRegistry.call(event, method, args, kwargs)
+        return wrapper
+    return decorate
+
+
+def hook_methods(*names):
+    """Class decorator: the named methods, or every public method when none are
+    named, fire '<Class>.<method>' hooks."""
+    def decorate(cls):
+        for name, value in list(vars(cls).items()):
+            if inspect.isfunction(value) and (name in names if names else not name.startswith('_')):
+                setattr(cls, name, hooked(f"{cls.__name__}.{name}")(value))
+        return cls
+    return decorate
+
+
+# =============================================================================
+# SAMPLING HOOK
+# =============================================================================
+
+class SamplingHook:
+    """Aggregates hooked call timings and appends them to a JSON-lines file.
+
+    Every `interval` seconds one line with the count, total, mean and max
+    milliseconds and the error count of each event since the previous line is
+    written; intervals with no calls write nothing.
+    """
+
+    INTERVAL = 60                   # Seconds between lines when scheduled
+    FILENAME = 'hook_timings.jsonl'
+
+    def __init__(self, path=None, interval=None, pattern='*'):
+        if path is None:
+            from models.storage import Workspaces
+            path = os.path.join(Workspaces.instance().data_dir, self.FILENAME)
+        self.path = path
+        self.interval = interval or self.INTERVAL
+        self.pattern = pattern
+        self.window = {}            # Event -> [count, total_ms, max_ms, errors]
+        self.window_started = time.time()
+        self._handle = None
+        self._event = None
+        self._lock = threading.Lock()
+
+    def attach(self):
+        if self._handle is None:
+            self._handle = HookRegistry.add(self.pattern, after=self.on_after)
+
+    def detach(self):
+        if self._handle is not None:
+            HookRegistry.remove(self._handle)
+            self._handle = None
+
+    def on_after(self, event, elapsed_ms, result, error):
+        with self._lock:
+            totals = self.window.get(event)
+            if totals is None:
+                totals = self.window[event] = [0, 0.0, 0.0, 0]
+            totals[0] += 1
+            totals[1] += elapsed_ms
+            totals[2] = max(totals[2], elapsed_ms)
+            if error is not None:
+                totals[3] += 1
+
+    def flush(self):
+        """Write the current window and start a new one; returns False if writing failed."""
+        with self._lock:
+            window, self.window = self.window, {}
+            started, self.window_started = self.window_started, time.time()
+        if not window:
+            return True
+        line = {
+            'at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'seconds': round(self.window_started - started, 1),
+            'events': {event: dict(count=count, total_ms=round(total_ms, 3), mean_ms=round(total_ms / count, 3),
+                                   max_ms=round(max_ms, 3), errors=errors)
+                       for event, (count, total_ms, max_ms, errors) in sorted(window.items())},
+        }
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(line) + '\n')
+            return True
+        except OSError as e:
+            print(f"Error writing hook timings: {e}")
+            return False
+
+    # -------------------------------------------------------------------------
+    # Periodic writes
+    # -------------------------------------------------------------------------
+
+    def schedule(self):
+        from kivy.clock import Clock
+        self.attach()
+        if self._event is None:
+            self._event = Clock.schedule_interval(self.on_interval, self.interval)
+
+    def cancel(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def on_interval(self, dt):
+        self.flush()
+
+
+def sampling_hook_from_env():
+    """SamplingHook configured by TODOAPP_HOOK_SAMPLES (1 or a file path) and
+    TODOAPP_HOOK_INTERVAL (seconds), or None when sampling is off."""
+    setting = os.environ.get('TODOAPP_HOOK_SAMPLES', '')
+    if setting.lower() in ('', '0', 'false', 'no'):
+        return None
+    path = None if setting.lower() in ('1', 'true', 'yes') else setting
+    try:
+        interval = float(os.environ.get('TODOAPP_HOOK_INTERVAL') or SamplingHook.INTERVAL)
+    except ValueError:
+        print("Error: TODOAPP_HOOK_INTERVAL must be a number of seconds")
+        interval = SamplingHook.INTERVAL
+    return SamplingHook(path, interval)
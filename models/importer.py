@@ -0,0 +1,261 @@
+import argparse
+import csv
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+from models.database import TodoDB, CategoryDB, DataVersion
+
+
+# Accepted source column names for each task field (compared case-insensitively)
+COLUMN_ALIASES = {
+    'title': ('title', 'name', 'task', 'content', 'summary'),
+    'done': ('done', 'completed', 'is_done', 'checked', 'status'),
+    'category': ('category', 'project', 'list', 'folder'),
+    'tags': ('tags', 'labels', 'tag'),
+    'deadline': ('deadline', 'deadline_date', 'due', 'due_date'),
+    'deadline_time': ('deadline_time', 'due_time'),
+    'created': ('created', 'created_at', 'date'),
+    'completed_at': ('completed_at', 'completed_on', 'done_at'),
+}
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'x', 'done', 'completed', 'finished'}
+
+
+# =============================================================================
+# STREAMING READERS
+# =============================================================================
+
+def detect_format(path):
+    """Guess the input format from the file extension."""
+    return 'jsonl' if os.path.splitext(path)[1].lower() in ('.jsonl', '.ndjson', '.json') else 'csv'
+
+
+def iter_records(path, file_format=None):
+    """Yield one raw record (dict) at a time from a CSV, JSON Lines or JSON array file."""
+    file_format = file_format or detect_format(path)
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        if file_format == 'csv':
+            yield from csv.DictReader(f)
+        else:
+            first = f.read(1)
+            while first.isspace():
+                first = f.read(1)
+            if first == '[':
+                # A plain JSON array can't be streamed line by line; it is read whole
+                records = json.loads(first + f.read())
+                yield from (record for record in records if isinstance(record, dict))
+                return
+            f.seek(0)
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    print(f"Skipping line {line_number}: {e}")
+                    continue
+                if isinstance(record, dict):
+                    yield record
+
+
+# =============================================================================
+# FIELD MAPPING
+# =============================================================================
+
+def build_column_map(keys):
+    """Map task fields to the source keys present in a record."""
+    lowered = {key.strip().lower(): key for key in keys if key}
+    column_map = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in lowered:
+                column_map[field] = lowered[alias]
+                break
+    return column_map
+
+
+def parse_datetime(value):
+    """Parse 'YYYY-MM-DD', 'YYYY-MM-DD HH:MM[:SS]' or ISO 8601 into a datetime."""
+    value = str(value).strip().replace('T', ' ').rstrip('Z')
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value[:19], fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_done(value):
+    if isinstance(value, bool):
+        return int(value)
+    return int(str(value).strip().lower() in TRUE_VALUES)
+
+
+def parse_tags(value):
+    if isinstance(value, (list, tuple)):
+        tags = value
+    else:
+        tags = str(value).replace(';', ',').replace('|', ',').split(',')
+    return ','.join(tag.strip() for tag in tags if str(tag).strip()) or None
+
+
+# =============================================================================
+# IMPORTER
+# =============================================================================
+
+class TaskImporter:
+    """Streams records into the tasks table in large executemany batches."""
+
+    BATCH_SIZE = 5000
+    MAX_COLUMN_MAPS = 1000          # Distinct JSON key sets remembered before starting over
+
+    INSERT_SQL = '''INSERT INTO tasks (title, done, date, category_id, tags,
+                                       deadline_date, deadline_time, created_at, completed_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), ?)'''
+
+    def __init__(self, conn, batch_size=BATCH_SIZE, progress=None):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.progress = progress            # Called as progress(imported, skipped)
+        self.category_cache = {}            # Lower-cased name -> category id
+        self.fixed_columns = False          # CSV: every record has the header's keys
+        self.column_map = None              # Map of the fixed columns
+        self.column_maps = {}               # frozenset of a JSON record's keys -> its map
+
+    def category_id(self, name):
+        """Resolve a category name to its id, creating the category if needed."""
+        if not name:
+            return None
+        key = name.lower()
+        if key not in self.category_cache:
+            row = self.conn.execute('SELECT id FROM categories WHERE name = ? COLLATE NOCASE',
+                                    (name,)).fetchone()
+            if row is None:
+                cursor = self.conn.execute('INSERT INTO categories (name, icon) VALUES (?, ?)',
+                                           (name, name))
+                row = (cursor.lastrowid,)
+            self.category_cache[key] = row[0]
+        return self.category_cache[key]
+
+    def to_row(self, record):
+        """Convert a raw record to an INSERT parameter tuple, or None to skip it."""
+        column_map = self.columns_of(record)
+        get = lambda field: record.get(column_map[field]) if field in column_map else None
+
+        title = get('title')
+        if title is None or not str(title).strip():
+            return None
+        done = parse_done(get('done')) if get('done') not in (None, '') else 0
+
+        created = parse_datetime(get('created')) if get('created') else None
+        task_date = (created or datetime.today()).strftime('%Y-%m-%d')
+        created_at = created.strftime('%Y-%m-%d %H:%M:%S') if created else None
+
+        completed = parse_datetime(get('completed_at')) if done and get('completed_at') else None
+        completed_at = completed.strftime('%Y-%m-%d %H:%M:%S') if completed else None
+
+        deadline_date = deadline_time = None
+        deadline = parse_datetime(get('deadline')) if get('deadline') else None
+        if deadline:
+            deadline_date = deadline.strftime('%Y-%m-%d')
+            raw_deadline = str(get('deadline'))
+            if len(raw_deadline.strip()) > 10:
+                deadline_time = deadline.strftime('%H:%M')
+        if get('deadline_time'):
+            deadline_time = str(get('deadline_time')).strip()[:5] or deadline_time
+
+        category = str(get('category')).strip() if get('category') else None
+        tags = parse_tags(get('tags')) if get('tags') else None
+
+        return (str(title).strip(), done, task_date, self.category_id(category), tags,
+                deadline_date, deadline_time, created_at, completed_at)
+
+    def columns_of(self, record):
+        """Column map of a record; JSON records may each use different keys."""
+        if self.fixed_columns:
+            if self.column_map is None:
+                self.column_map = build_column_map(record.keys())
+            return self.column_map
+        keys = frozenset(record)
+        column_map = self.column_maps.get(keys)
+        if column_map is None:
+            if len(self.column_maps) >= self.MAX_COLUMN_MAPS:
+                self.column_maps.clear()
+            column_map = self.column_maps[keys] = build_column_map(keys)
+        return column_map
+
+    def import_records(self, records):
+        """Import an iterable of raw records in one transaction; returns the counts."""
+        imported = skipped = 0
+        batch = []
+        try:
+            with self.conn:  # Commits at the end, rolls everything back on error
+                for record in records:
+                    row = self.to_row(record)
+                    if row is None:
+                        skipped += 1
+                        continue
+                    batch.append(row)
+                    if len(batch) >= self.batch_size:
+                        imported += self.flush(batch)
+                        if self.progress:
+                            self.progress(imported, skipped)
+                if batch:
+                    imported += self.flush(batch)
+            DataVersion.bump()
+        except (sqlite3.Error, csv.Error, OSError, ValueError) as e:
+            # ValueError covers undecodable text and a malformed JSON array
+            print(f"Error importing tasks: {e}")
+            return {'imported': 0, 'skipped': skipped, 'error': str(e)}
+
+        if self.progress:
+            self.progress(imported, skipped)
+        return {'imported': imported, 'skipped': skipped, 'error': None}
+
+    def flush(self, batch):
+        self.conn.executemany(self.INSERT_SQL, batch)
+        count = len(batch)
+        batch.clear()
+        return count
+
+    def import_file(self, path, file_format=None):
+        """Stream a CSV, JSON Lines or JSON array file into the database."""
+        file_format = file_format or detect_format(path)
+        self.fixed_columns = file_format == 'csv'
+        self.column_map = None
+        self.column_maps = {}
+        return self.import_records(iter_records(path, file_format))
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import tasks from a CSV, JSON Lines or JSON array file.")
+    parser.add_argument('path', help="CSV, JSON Lines or JSON array file to import")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="Input format (default: from extension)")
+    parser.add_argument('--db', default="data/todo.db", help="Database file (default: data/todo.db)")
+    parser.add_argument('--batch-size', type=int, default=TaskImporter.BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    os.makedirs(os.path.dirname(args.db) or '.', exist_ok=True)
+    db = TodoDB(args.db)
+    CategoryDB(args.db)  # Make sure the categories table exists; shares db's connection
+
+    progress = lambda imported, skipped: print(f"\rImported {imported} tasks ({skipped} skipped)", end='')
+    importer = TaskImporter(db.conn, batch_size=args.batch_size, progress=progress)
+    result = importer.import_file(args.path, args.format)
+    print()
+    db.close()
+    if result['error']:
+        print(f"Import failed: {result['error']}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,319 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections import Counter, deque
+
+
+# =============================================================================
+# QUERY STATISTICS
+# =============================================================================
+
+class QueryStats:
+    """Counts, latencies and rows of one SQL statement."""
+
+    SAMPLES = 500                   # Latest latencies kept for percentiles
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.rows = 0
+        self.samples = deque(maxlen=self.SAMPLES)
+
+    def add(self, elapsed_ms, rows):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.rows += rows
+        self.samples.append(elapsed_ms)
+
+    def percentile(self, p):
+        """Nearest-rank percentile of the kept samples, in ms."""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))]
+
+    def as_dict(self):
+        return dict(sql=self.sql, count=self.count, total_ms=self.total_ms, max_ms=self.max_ms,
+                    mean_ms=self.total_ms / self.count if self.count else 0.0,
+                    p50_ms=self.percentile(50), p95_ms=self.percentile(95), p99_ms=self.percentile(99),
+                    rows=self.rows)
+
+
+# =============================================================================
+# QUERY PROFILER
+# =============================================================================
+
+class QueryProfiler:
+    """Per-query timings and a slow-query log for connections opened through Storage.
+
+    Off unless TODOAPP_PROFILE_SQL is set, or enable() is called; while off a
+    profiled connection only adds one attribute check per execute().
+    """
+
+    enabled = os.environ.get('TODOAPP_PROFILE_SQL', '').lower() in ('1', 'true', 'yes')
+    SLOW_MS = float(os.environ.get('TODOAPP_SLOW_QUERY_MS') or 50)   # Queries at least this slow are logged
+    SLOW_LOG_SIZE = 50              # Slow queries kept, newest last
+
+    stats = {}                      # Normalized SQL -> QueryStats
+    statements = Counter()          # Every statement SQLite ran, by kind, from the trace callback
+    slow_log = deque(maxlen=SLOW_LOG_SIZE)
+    plans = {}                      # Normalized SQL -> EXPLAIN QUERY PLAN lines
+    total_ms = 0.0                  # Time in profiled queries since the last reset
+    _connections = weakref.WeakSet()
+    _lock = threading.Lock()
+
+    @classmethod
+    def enable(cls):
+        cls.enabled = True
+        for conn in list(cls._connections):
+            cls.trace(conn, True)
+
+    @classmethod
+    def disable(cls):
+        cls.enabled = False
+        for conn in list(cls._connections):
+            cls.trace(conn, False)
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls.stats.clear()
+            cls.statements.clear()
+            cls.slow_log.clear()
+            cls.plans.clear()
+            cls.total_ms = 0.0
+
+    @classmethod
+    def register(cls, conn):
+        """Track a new connection so enable() and disable() reach it."""
+        cls._connections.add(conn)
+        if cls.enabled:
+            cls.trace(conn, True)
+
+    @classmethod
+    def trace(cls, conn, on):
+        try:
+            conn.set_trace_callback(cls.on_statement if on else None)
+        except sqlite3.ProgrammingError:
+            pass  # Closed, or owned by another thread
+
+    @classmethod
+    def on_statement(cls, sql):
+        """Trace callback: also sees COMMITs, trigger bodies and executescript() statements."""
+        if sql.startswith('--'):
+            kind = sql.strip()  # "-- TRIGGER name"
+        else:
+            kind = sql.split(None, 1)[0].upper() if sql.strip() else ''
+        cls.statements[kind] += 1
+
+    @staticmethod
+    def normalize(sql):
+        return ' '.join(sql.split())
+
+    @classmethod
+    def record(cls, conn, sql, parameters, elapsed_ms, rows):
+        """Add one finished execution; slow ones go to the log with their query plan."""
+        key = cls.normalize(sql)
+        with cls._lock:
+            query = cls.stats.get(key)
+            if query is None:
+                query = cls.stats[key] = QueryStats(key)
+            query.add(elapsed_ms, rows)
+            cls.total_ms += elapsed_ms
+        if elapsed_ms >= cls.SLOW_MS:
+            cls.slow_log.append(dict(at=time.strftime('%Y-%m-%d %H:%M:%S'), sql=key, parameters=repr(parameters),
+                                     ms=elapsed_ms, rows=rows, plan=cls.explain(conn, key, parameters)))
+
+    @classmethod
+    def explain(cls, conn, sql, parameters):
+        """EXPLAIN QUERY PLAN of a statement, computed once per statement."""
+        if sql in cls.plans:
+            return cls.plans[sql]
+        plan = []
+        if sql.split(None, 1)[0].upper() in ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE'):
+            try:
+                if parameters is None:
+                    raise ValueError("parameters not logged")
+                # Bypass the profiled execute() so the plan query is not recorded itself
+                rows = sqlite3.Connection.execute(conn, 'EXPLAIN QUERY PLAN ' + sql, parameters).fetchall()
+                plan = [row[-1] for row in rows]
+            except (sqlite3.Error, ValueError) as e:
+                plan = [f"(no plan: {e})"]
+        cls.plans[sql] = plan
+        return plan
+
+    @classmethod
+    def report(cls, sort='total_ms', limit=20):
+        """Query statistics as dicts, most expensive first."""
+        with cls._lock:
+            rows = [query.as_dict() for query in cls.stats.values()]
+        return sorted(rows, key=lambda row: row[sort], reverse=True)[:limit]
+
+    @classmethod
+    def print_report(cls, limit=20):
+        print(f"{'count':>7}{'total ms':>11}{'p50':>9}{'p95':>9}{'p99':>9}{'rows':>9}  query")
+        for row in cls.report(limit=limit):
+            print(f"{row['count']:>7}{row['total_ms']:>11.1f}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+                  f"{row['p99_ms']:>9.2f}{row['rows']:>9}  {row['sql'][:100]}")
+        if cls.statements:
+            print("Statements run by SQLite: " + ', '.join(f"{kind} {count}"
+                                                          for kind, count in cls.statements.most_common(10)))
+        for entry in cls.slow_log:
+            print(f"SLOW {entry['ms']:.1f} ms ({entry['rows']} rows) at {entry['at']}: {entry['sql'][:200]}")
+            for line in entry['plan']:
+                print(f"    {line}")
+
+
+# =============================================================================
+# PROFILED CONNECTIONS
+# =============================================================================
+
+class ProfiledCursor(sqlite3.Cursor):
+    """Times execute() plus the fetches that follow it, and counts the rows returned."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pending = None        # [sql, parameters, elapsed_ms, rows] of the running query
+
+    def _finish(self):
+        pending, self._pending = self._pending, None
+        if pending is not None:
+            QueryProfiler.record(self.connection, *pending)
+
+    def _timed_execute(self, method, sql, parameters, logged_parameters):
+        self._finish()
+        started = time.perf_counter()
+        method(sql, parameters)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if self.description is None:  # No result rows to fetch; the statement is done
+            QueryProfiler.record(self.connection, sql, logged_parameters, elapsed_ms, max(self.rowcount, 0))
+        else:
+            self._pending = [sql, logged_parameters, elapsed_ms, 0]
+        return self
+
+    def execute(self, sql, parameters=()):
+        return self._timed_execute(super().execute, sql, parameters, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        # Only the statement is logged; the parameter rows may be a consumed generator
+        return self._timed_execute(super().executemany, sql, seq_of_parameters, None)
+
+    def _timed_fetch(self, fetch, *args):
+        started = time.perf_counter()
+        result = fetch(*args)
+        if self._pending is not None:
+            self._pending[2] += (time.perf_counter() - started) * 1000
+        return result
+
+    def fetchone(self):
+        row = self._timed_fetch(super().fetchone)
+        if row is None:
+            self._finish()
+        elif self._pending is not None:
+            self._pending[3] += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed_fetch(super().fetchmany, self.arraysize if size is None else size)
+        if not rows:
+            self._finish()
+        elif self._pending is not None:
+            self._pending[3] += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed_fetch(super().fetchall)
+        if self._pending is not None:
+            self._pending[3] += len(rows)
+        self._finish()
+        return rows
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        self._finish()
+
+
+class ProfiledConnection(sqlite3.Connection):
+    """Connection whose queries are timed while QueryProfiler is enabled."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        QueryProfiler.register(self)
+
+    def cursor(self, factory=None):
+        if factory is None:
+            factory = ProfiledCursor if QueryProfiler.enabled else sqlite3.Cursor
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        if not QueryProfiler.enabled:
+            return super().execute(sql, parameters)
+        return self.cursor(ProfiledCursor).execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        if not QueryProfiler.enabled:
+            return super().executemany(sql, seq_of_parameters)
+        return self.cursor(ProfiledCursor).executemany(sql, seq_of_parameters)
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def main(argv=None):
+    """Profile the storage methods the screens call against a database file."""
+    from models.database import TodoDB, CategoryDB, DeadlineDB, QueryCache
+    from models.storage import Storage
+    from models.instrumentation import QueryProfiler  # The class Storage uses, also under python -m
+
+    parser = argparse.ArgumentParser(description="Show per-query statistics for the app's main queries.")
+    parser.add_argument('--db', default="data/todo.db", help="Database file (default: data/todo.db)")
+    parser.add_argument('--slow-ms', type=float, default=QueryProfiler.SLOW_MS,
+                        help="Log queries at least this slow (default: %(default)s)")
+    parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"Database not found: {args.db}")
+        return 1
+    QueryProfiler.SLOW_MS = args.slow_ms
+    QueryProfiler.enable()
+    db = TodoDB(args.db)
+    category_db = CategoryDB(args.db)
+    deadline_db = DeadlineDB(args.db)
+    for task_filter in ('all', 'pending', 'completed'):
+        db.get_tasks(task_filter)
+    db.get_task_summary()
+    db.get_stats()
+    category_db.get_category_stats()
+    category_db.get_tasks_by_category(None)
+    category_db.get_all_tags()
+    deadline_db.get_tasks_with_deadlines()
+    deadline_db.get_overdue_tasks()
+    deadline_db.get_upcoming_tasks()
+    QueryCache.clear()
+    QueryProfiler.print_report(args.limit)
+    Storage.close()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,161 @@
+import sqlite3
+from collections import deque
+from contextlib import contextmanager
+
+
+# =============================================================================
+# OPERATION JOURNAL
+# =============================================================================
+
+class OperationJournal:
+    """Records the inverse of each mutation as SQL for multi-step undo and redo.
+
+    An entry is (label, undo_ops, redo_ops) where each op is a (sql, params)
+    tuple; undo ops run in reverse order, redo ops in recorded order.
+    """
+
+    MAX_ENTRIES = 100               # Undo steps kept
+    MAX_OPS = 2000                  # SQL statements kept across all steps
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        """Return the journal shared by all storage classes."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self.undo_stack = deque()
+        self.redo_stack = []
+        self.op_count = 0
+        self._group = None
+        self._group_depth = 0
+
+    # -------------------------------------------------------------------------
+    # Recording
+    # -------------------------------------------------------------------------
+
+    def record(self, label, undo_ops, redo_ops):
+        """Record one mutation; inside group() it joins the group's single step."""
+        if self._group is not None:
+            self._group[1].extend(undo_ops)
+            self._group[2].extend(redo_ops)
+            return
+        self._push((label, tuple(undo_ops), tuple(redo_ops)))
+        self._drop_redo()
+
+    @contextmanager
+    def group(self, label):
+        """Record every mutation made inside the block as one undo step."""
+        if self._group_depth == 0:
+            self._group = (label, [], [])
+        self._group_depth += 1
+        try:
+            yield
+        finally:
+            self._group_depth -= 1
+            if self._group_depth == 0:
+                label, undo_ops, redo_ops = self._group
+                self._group = None
+                if undo_ops:
+                    self._push((label, tuple(undo_ops), tuple(redo_ops)))
+                    self._drop_redo()
+
+    def _push(self, entry):
+        self.undo_stack.append(entry)
+        self.op_count += len(entry[1]) + len(entry[2])
+        # Oldest steps go first; the newest step is always kept
+        while len(self.undo_stack) > 1 and (len(self.undo_stack) > self.MAX_ENTRIES
+                                            or self.op_count > self.MAX_OPS):
+            _, undo_ops, redo_ops = self.undo_stack.popleft()
+            self.op_count -= len(undo_ops) + len(redo_ops)
+
+    def _drop_redo(self):
+        for _, undo_ops, redo_ops in self.redo_stack:
+            self.op_count -= len(undo_ops) + len(redo_ops)
+        self.redo_stack.clear()
+
+    # -------------------------------------------------------------------------
+    # Helpers for building inverse operations
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def capture(conn, table, row_id, columns):
+        """Read the current values of some columns of a row."""
+        row = conn.execute(f"SELECT {', '.join(columns)} FROM {table} WHERE id = ?", (row_id,)).fetchone()
+        return tuple(row) if row else None
+
+    @staticmethod
+    def update_op(table, row_id, columns, values):
+        """UPDATE op that sets columns of a row back to the given values."""
+        assignments = ', '.join(f"{column} = ?" for column in columns)
+        return (f"UPDATE {table} SET {assignments} WHERE id = ?", tuple(values) + (row_id,))
+
+    @staticmethod
+    def insert_op(conn, table, row_id):
+        """INSERT op that recreates a row exactly as it is now, including its id."""
+        cursor = conn.execute(f"SELECT * FROM {table} WHERE id = ?", (row_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        columns = [description[0] for description in cursor.description]
+        return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                tuple(row))
+
+    def record_update(self, label, table, row_id, columns, before, after):
+        """Record a column update given the values before and after it."""
+        if before is None or before == after:
+            return
+        self.record(label,
+                    [self.update_op(table, row_id, columns, before)],
+                    [self.update_op(table, row_id, columns, after)])
+
+    # -------------------------------------------------------------------------
+    # Undo / redo
+    # -------------------------------------------------------------------------
+
+    def clear(self):
+        """Forget all steps, e.g. when switching to another database."""
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.op_count = 0
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def undo(self, conn):
+        """Undo the newest step; returns its label, or None if nothing was undone."""
+        if not self.undo_stack:
+            return None
+        entry = self.undo_stack.pop()
+        if not self._execute(conn, reversed(entry[1])):
+            self.op_count -= len(entry[1]) + len(entry[2])  # Data moved on; drop the step
+            return None
+        self.redo_stack.append(entry)
+        return entry[0]
+
+    def redo(self, conn):
+        """Redo the newest undone step; returns its label, or None."""
+        if not self.redo_stack:
+            return None
+        entry = self.redo_stack.pop()
+        if not self._execute(conn, entry[2]):
+            self.op_count -= len(entry[1]) + len(entry[2])
+            return None
+        self.undo_stack.append(entry)
+        return entry[0]
+
+    def _execute(self, conn, ops):
+        try:
+            with conn:  # All ops of a step apply together or not at all
+                for sql, params in ops:
+                    conn.execute(sql, params)
+            return True
+        except sqlite3.Error as e:
+            print(f"Error applying journal step: {e}")
+            return False
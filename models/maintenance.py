@@ -0,0 +1,221 @@
+import argparse
+import os
+import sqlite3
+import time
+
+from models.database import DataVersion
+
+
+# =============================================================================
+# MAINTENANCE SCHEDULER
+# =============================================================================
+
+class MaintenanceScheduler:
+    """Runs SQLite housekeeping in small steps while idle and logs each job's last run."""
+
+    VACUUM_PAGES = 64               # Pages freed per incremental vacuum step
+    TIME_BUDGET = 0.02              # Seconds of vacuuming per idle check
+    QUICK_CHECK_INTERVAL = 24 * 60 * 60
+    IDLE_SECONDS = 10               # Data must be unchanged this long before any job runs
+    CHECK_INTERVAL = 5              # Seconds between idle checks
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.seen_version = DataVersion.value
+        self.seen_version_time = time.monotonic()
+        self._event = None
+        self.vacuum_off_reported = False
+        self.create_table()
+
+    def create_table(self):
+        try:
+            self.conn.execute('''CREATE TABLE IF NOT EXISTS maintenance_log
+                                 (job TEXT PRIMARY KEY,
+                                  last_run TIMESTAMP,
+                                  duration_ms REAL,
+                                  result TEXT)''')
+            self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"Error creating maintenance log: {e}")
+
+    def record(self, job, started, result):
+        """Store when a job last ran, how long it took and what it reported."""
+        duration_ms = (time.perf_counter() - started) * 1000
+        try:
+            with self.conn:
+                self.conn.execute('''INSERT INTO maintenance_log (job, last_run, duration_ms, result)
+                                     VALUES (?, CURRENT_TIMESTAMP, ?, ?)
+                                     ON CONFLICT (job) DO UPDATE
+                                     SET last_run = excluded.last_run, duration_ms = excluded.duration_ms,
+                                         result = excluded.result''',
+                                  (job, duration_ms, str(result)))
+        except sqlite3.Error as e:
+            print(f"Error recording maintenance job {job}: {e}")
+
+    def last_runs(self):
+        """Get {job: (last_run, duration_ms, result)}."""
+        try:
+            cursor = self.conn.execute('SELECT job, last_run, duration_ms, result FROM maintenance_log ORDER BY job')
+            return {job: (last_run, duration_ms, result) for job, last_run, duration_ms, result in cursor}
+        except sqlite3.Error as e:
+            print(f"Error reading maintenance log: {e}")
+            return {}
+
+    def seconds_since(self, job):
+        """Seconds since a job last ran, or None if it never ran."""
+        row = self.conn.execute("SELECT strftime('%s', 'now') - strftime('%s', last_run) FROM maintenance_log "
+                                "WHERE job = ?", (job,)).fetchone()
+        return row[0] if row else None
+
+    # -------------------------------------------------------------------------
+    # Jobs
+    # -------------------------------------------------------------------------
+
+    def optimize(self):
+        """PRAGMA optimize: refresh planner statistics (ANALYZE) where they are stale."""
+        started = time.perf_counter()
+        try:
+            self.conn.execute('PRAGMA optimize').fetchall()
+            self.record('optimize', started, 'ok')
+            return True
+        except sqlite3.Error as e:
+            print(f"Error optimizing database: {e}")
+            return False
+
+    def quick_check(self):
+        """PRAGMA quick_check; returns True when the database is consistent."""
+        started = time.perf_counter()
+        try:
+            rows = self.conn.execute('PRAGMA quick_check').fetchall()
+        except sqlite3.Error as e:
+            print(f"Error checking database: {e}")
+            return False
+        ok = rows == [('ok',)]
+        self.record('quick_check', started, 'ok' if ok else '; '.join(row[0] for row in rows[:5]))
+        if not ok:
+            print(f"Database quick_check found problems: {rows[:5]}")
+        return ok
+
+    def incremental_vacuum_enabled(self):
+        return self.conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2
+
+    def enable_incremental_vacuum(self):
+        """Switch the file to auto_vacuum=INCREMENTAL; needs one full VACUUM to take effect,
+        so it only runs from the command line, never in an idle frame."""
+        started = time.perf_counter()
+        try:
+            self.conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            self.conn.execute('VACUUM')
+            self.record('vacuum', started, 'converted to incremental')
+            return True
+        except sqlite3.Error as e:
+            print(f"Error enabling incremental vacuum: {e}")
+            return False
+
+    def vacuum_step(self, pages=VACUUM_PAGES):
+        """Return up to `pages` free pages to the file system; returns the pages freed."""
+        free_before = self.conn.execute('PRAGMA freelist_count').fetchone()[0]
+        if not free_before:
+            return 0
+        # Each result row is one freed page; the pragma only finishes when drained
+        self.conn.execute(f'PRAGMA incremental_vacuum({int(pages)})').fetchall()
+        return free_before - self.conn.execute('PRAGMA freelist_count').fetchone()[0]
+
+    def incremental_vacuum(self, time_budget=None):
+        """Vacuum step by step until nothing is free or the time budget is spent."""
+        started = time.perf_counter()
+        freed = 0
+        try:
+            if not self.incremental_vacuum_enabled():
+                if not self.vacuum_off_reported:
+                    self.vacuum_off_reported = True
+                    print("Incremental vacuum is off for this database, which was created before it "
+                          "was enabled; run `python -m models.maintenance vacuum` once to convert it")
+                return 0
+            while True:
+                step = self.vacuum_step()
+                freed += step
+                if step == 0:
+                    break
+                if time_budget is not None and time.perf_counter() - started >= time_budget:
+                    break
+        except sqlite3.Error as e:
+            print(f"Error during incremental vacuum: {e}")
+        if freed:
+            self.record('incremental_vacuum', started, f"{freed} pages freed")
+        return freed
+
+    # -------------------------------------------------------------------------
+    # Idle-time scheduling
+    # -------------------------------------------------------------------------
+
+    def schedule(self):
+        """Check periodically for idle time and run at most one short job per check."""
+        from kivy.clock import Clock
+        if self._event is None:
+            self._event = Clock.schedule_interval(self.on_idle_check, self.CHECK_INTERVAL)
+
+    def cancel(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def on_idle_check(self, dt):
+        now = time.monotonic()
+        if DataVersion.value != self.seen_version:
+            self.seen_version = DataVersion.value
+            self.seen_version_time = now
+            return
+        if now - self.seen_version_time < self.IDLE_SECONDS:
+            return
+
+        try:
+            since_check = self.seconds_since('quick_check')
+            if since_check is None or since_check >= self.QUICK_CHECK_INTERVAL:
+                self.quick_check()
+            else:
+                self.incremental_vacuum(self.TIME_BUDGET)
+        except sqlite3.Error as e:
+            print(f"Error running maintenance: {e}")
+
+    def on_close(self):
+        """Run before closing the connection, as SQLite recommends for PRAGMA optimize."""
+        self.cancel()
+        self.optimize()
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run database maintenance jobs.")
+    parser.add_argument('--db', default="data/todo.db", help="Database file (default: data/todo.db)")
+    parser.add_argument('job', nargs='?', default='status',
+                        choices=['status', 'optimize', 'quick_check', 'vacuum', 'incremental_vacuum'])
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"Database not found: {args.db}")
+        return 1
+    conn = sqlite3.connect(args.db)
+    try:
+        scheduler = MaintenanceScheduler(conn)
+        ok = True
+        if args.job == 'optimize':
+            ok = scheduler.optimize()
+        elif args.job == 'quick_check':
+            ok = scheduler.quick_check()
+        elif args.job == 'vacuum':
+            ok = scheduler.enable_incremental_vacuum()
+        elif args.job == 'incremental_vacuum':
+            print(f"{scheduler.incremental_vacuum()} pages freed")
+        for job, (last_run, duration_ms, result) in scheduler.last_runs().items():
+            print(f"{job:<20} {last_run}  {duration_ms:8.1f} ms  {result}")
+    finally:
+        conn.close()
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
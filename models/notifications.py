@@ -0,0 +1,96 @@
+import time
+from collections import deque
+from kivy.uix.label import Label
+from kivy.uix.popup import Popup
+from kivy.clock import Clock
+
+
+# =============================================================================
+# NOTIFICATION QUEUE
+# =============================================================================
+
+class NotificationQueue:
+    """Collects reminders and shows them as rate-limited digest notifications."""
+
+    BATCH_WINDOW = 2                # Seconds to wait for more reminders before showing
+    MAX_PER_MINUTE = 2              # Maximum digests shown in any 60 second window
+    DISPLAY_TIME = 5                # Seconds before the notification auto-closes
+    MAX_LISTED = 8                  # Tasks listed in a digest before "... and N more"
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        """Return the queue shared by all screens."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self.pending = []                   # (deadline_str, title) waiting to be shown
+        self.shown_times = deque()          # Monotonic times of recently shown digests
+        self.popup = None                   # Single notification widget, reused
+        self.message_label = None
+        self._flush_event = None
+        self._dismiss_trigger = Clock.create_trigger(self._dismiss, self.DISPLAY_TIME)
+
+    def push(self, title, deadline_date, deadline_time=None):
+        """Queue a reminder; reminders arriving close together share one digest."""
+        deadline_str = deadline_date
+        if deadline_time:
+            deadline_str += f" {deadline_time}"
+
+        item = (deadline_str, title)
+        if item not in self.pending:
+            self.pending.append(item)
+        self._schedule_flush(self.BATCH_WINDOW)
+
+    def _schedule_flush(self, delay):
+        """Schedule a single flush; later pushes join the already scheduled one."""
+        if self._flush_event is None:
+            self._flush_event = Clock.schedule_once(self.flush, delay)
+
+    def flush(self, dt=None):
+        """Show all pending reminders as one digest, respecting the rate limit."""
+        self._flush_event = None
+        if not self.pending:
+            return
+
+        now = time.monotonic()
+        while self.shown_times and now - self.shown_times[0] >= 60:
+            self.shown_times.popleft()
+
+        if len(self.shown_times) >= self.MAX_PER_MINUTE:
+            # Keep collecting until the oldest digest leaves the one minute window
+            self._schedule_flush(60 - (now - self.shown_times[0]))
+            return
+
+        items = sorted(self.pending)
+        self.pending = []
+        self.shown_times.append(now)
+        self.show_digest(items)
+
+    def show_digest(self, items):
+        """Display a digest of (deadline_str, title) items in the shared popup."""
+        count = len(items)
+        lines = [f"• {title}  ({deadline_str})" for deadline_str, title in items[:self.MAX_LISTED]]
+        if count > self.MAX_LISTED:
+            lines.append(f"... and {count - self.MAX_LISTED} more")
+
+        if self.popup is None:
+            self.message_label = Label(halign='left', valign='top')
+            self.message_label.bind(size=lambda w, size: setattr(w, 'text_size', size))
+            self.popup = Popup(content=self.message_label, size_hint=(0.8, 0.5))
+
+        self.popup.title = "Deadline Reminder" if count == 1 else f"{count} Deadline Reminders"
+        self.message_label.text = "\n".join(lines)
+        if self.popup.parent is None:
+            self.popup.open()
+
+        # Restart the auto-close countdown on the same Clock event
+        self._dismiss_trigger.cancel()
+        self._dismiss_trigger()
+
+    def _dismiss(self, dt):
+        if self.popup is not None:
+            self.popup.dismiss()
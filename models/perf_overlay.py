@@ -0,0 +1,150 @@
+from collections import deque
+from kivy.clock import Clock
+from kivy.core.window import Window
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.label import Label
+from kivy.uix.widget import Widget
+from kivy.graphics import Color, Line, Rectangle
+
+from models.instrumentation import QueryProfiler
+
+
+# =============================================================================
+# PERFORMANCE OVERLAY
+# =============================================================================
+
+class FrameGraph(Widget):
+    """Rolling line graph of frame times with a 60 fps budget line."""
+
+    SAMPLES = 120                   # Frames shown, newest on the right
+    MAX_MS = 50.0                   # Frame time at the top of the graph
+    BUDGET_MS = 1000 / 60
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.frame_times = deque(maxlen=self.SAMPLES)
+        with self.canvas:
+            Color(1, 0.3, 0.3, 0.8)
+            self.budget_line = Line(width=1)
+            Color(0.3, 1, 0.4, 1)
+            self.line = Line(width=1.2)
+        self.bind(pos=self.redraw, size=self.redraw)
+
+    def add(self, frame_ms):
+        self.frame_times.append(frame_ms)
+        self.redraw()
+
+    def y_for(self, frame_ms):
+        return self.y + min(frame_ms, self.MAX_MS) / self.MAX_MS * self.height
+
+    def redraw(self, *args):
+        budget_y = self.y_for(self.BUDGET_MS)
+        self.budget_line.points = [self.x, budget_y, self.right, budget_y]
+        step = self.width / (self.SAMPLES - 1)
+        start = self.SAMPLES - len(self.frame_times)
+        points = []
+        for index, frame_ms in enumerate(self.frame_times):
+            points += [self.x + (start + index) * step, self.y_for(frame_ms)]
+        self.line.points = points
+
+
+class PerfOverlay(BoxLayout):
+    """Debug panel over the app: frame times, live widgets per screen, DB time and Clock events."""
+
+    TEXT_INTERVAL = 0.5             # Seconds between text refreshes; walking every widget is not free
+
+    def __init__(self, screen_manager, **kwargs):
+        super().__init__(**kwargs)
+        self.screen_manager = screen_manager
+        self.orientation = 'vertical'
+        self.size_hint = (None, None)
+        self.size = (260, 190)
+        self.padding = 6
+        self.spacing = 4
+        self.visible = False
+        self.db_mark = 0.0          # QueryProfiler.total_ms when the last interaction began
+        self.db_last_ms = 0.0
+        self._events = []
+        self._started_profiler = False
+
+        with self.canvas.before:
+            Color(0, 0, 0, 0.7)
+            self.bg = Rectangle(pos=self.pos, size=self.size)
+        self.bind(pos=self.update_bg, size=self.update_bg)
+
+        self.graph = FrameGraph(size_hint_y=None, height=60)
+        self.add_widget(self.graph)
+        self.info_label = Label(text="", font_size=11, halign='left', valign='top', color=(1, 1, 1, 1))
+        self.info_label.bind(size=lambda label, size: setattr(label, 'text_size', size))
+        self.add_widget(self.info_label)
+
+    def update_bg(self, *args):
+        self.bg.pos = self.pos
+        self.bg.size = self.size
+
+    def place(self, *args):
+        """Keep the panel in the top-left corner of the window"""
+        self.pos = (0, Window.height - self.height)
+
+    def toggle(self):
+        if self.visible:
+            self.hide()
+        else:
+            self.show()
+
+    def show(self):
+        if self.visible:
+            return
+        self.visible = True
+        # DB time comes from the query profiler; run it only while the overlay needs it
+        if not QueryProfiler.enabled:
+            QueryProfiler.enable()
+            self._started_profiler = True
+        self.db_mark = QueryProfiler.total_ms
+        Window.add_widget(self)
+        Window.bind(size=self.place, on_touch_down=self.on_interaction)
+        self.place()
+        self._events = [Clock.schedule_interval(self.on_frame, 0),
+                        Clock.schedule_interval(self.update_text, self.TEXT_INTERVAL)]
+
+    def hide(self):
+        if not self.visible:
+            return
+        self.visible = False
+        for event in self._events:
+            event.cancel()
+        self._events = []
+        Window.unbind(size=self.place, on_touch_down=self.on_interaction)
+        Window.remove_widget(self)
+        if self._started_profiler:
+            QueryProfiler.disable()
+            self._started_profiler = False
+
+    def on_frame(self, dt):
+        self.graph.add(dt * 1000)
+
+    def on_interaction(self, window, touch):
+        """A new touch starts a new interaction; runs before the app's widgets handle it"""
+        self.db_last_ms = QueryProfiler.total_ms - self.db_mark
+        self.db_mark = QueryProfiler.total_ms
+        return False
+
+    def update_text(self, dt):
+        frames = list(self.graph.frame_times)
+        lines = []
+        if frames:
+            janky = sum(1 for frame_ms in frames if frame_ms > FrameGraph.BUDGET_MS * 1.5)
+            lines.append(f"frame {frames[-1]:.1f} ms  avg {sum(frames) / len(frames):.1f}  "
+                         f"max {max(frames):.1f}  janky {janky}/{len(frames)}")
+        db_ms = QueryProfiler.total_ms - self.db_mark
+        lines.append(f"DB: {db_ms:.1f} ms this interaction, {self.db_last_ms:.1f} ms previous")
+        events = Clock.get_events() if hasattr(Clock, 'get_events') else []
+        lines.append(f"Clock events: {len(events)}")
+        total = 0
+        for screen in self.screen_manager.screens:
+            count = sum(1 for _ in screen.walk(restrict=True))
+            total += count
+            current = ' *' if screen.name == self.screen_manager.current else ''
+            lines.append(f"  {screen.name}: {count} widgets{current}")
+        lines.append(f"  total: {total} widgets")
+        self.info_label.text = '\n'.join(lines)
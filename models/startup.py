@@ -0,0 +1,168 @@
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+
+STARTED = time.perf_counter()       # main.py imports this module first
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TIMELINE_PREFIX = 'startup:'        # Lines the CLI reads back from app runs
+
+
+# =============================================================================
+# STARTUP PROFILER
+# =============================================================================
+
+class StartupProfiler:
+    """Timeline of the app's startup phases, from the first import to the first frame.
+
+    Off unless TODOAPP_PROFILE_STARTUP is set; with the value 'exit' the app
+    prints the timeline and closes right after its first frame, so cold starts
+    can be timed from a script.
+    """
+
+    setting = os.environ.get('TODOAPP_PROFILE_STARTUP', '').lower()
+    enabled = setting in ('1', 'true', 'yes', 'exit')
+    exit_after_first_frame = setting == 'exit'
+
+    phases = []                     # (name, start_ms, duration_ms, depth) relative to STARTED
+    _last_end = STARTED
+    _depth = 0
+
+    @classmethod
+    def mark(cls, name):
+        """Record a phase that ran from the end of the previous one until now."""
+        if not cls.enabled:
+            return
+        now = time.perf_counter()
+        cls.phases.append((name, (cls._last_end - STARTED) * 1000, (now - cls._last_end) * 1000, cls._depth))
+        cls._last_end = now
+
+    @classmethod
+    @contextmanager
+    def phase(cls, name):
+        """Record the time spent in the block; phases may nest."""
+        if not cls.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        index = len(cls.phases)
+        cls._depth += 1
+        try:
+            yield
+        finally:
+            cls._depth -= 1
+            now = time.perf_counter()
+            # Inserted before its nested phases so the timeline reads top-down
+            cls.phases.insert(index, (name, (started - STARTED) * 1000, (now - started) * 1000, cls._depth))
+            cls._last_end = now
+
+    @classmethod
+    def watch_first_frame(cls, app):
+        """Record the first frame on screen, then report (and stop the app when asked to)."""
+        if not cls.enabled:
+            return
+        from kivy.core.window import Window
+
+        def on_first_flip(*args):
+            Window.unbind(on_flip=on_first_flip)
+            cls.mark('first frame')
+            cls.report()
+            if cls.exit_after_first_frame:
+                app.stop()
+
+        Window.bind(on_flip=on_first_flip)
+
+    @classmethod
+    def report(cls, out=None):
+        print(f"{TIMELINE_PREFIX} {'start ms':>9} {'took ms':>9}  phase", file=out)
+        for name, start_ms, duration_ms, depth in cls.phases:
+            print(f"{TIMELINE_PREFIX} {start_ms:9.1f} {duration_ms:9.1f}  {'  ' * depth}{name}", file=out)
+        print(f"{TIMELINE_PREFIX} {(cls._last_end - STARTED) * 1000:9.1f} {'':>9}  total", file=out)
+
+
+# =============================================================================
+# IMPORT TREE
+# =============================================================================
+
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def parse_importtime(stderr):
+    """(module, self_us, cumulative_us, depth) rows from `python -X importtime` output, in import order."""
+    rows = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def import_tree(module='main', min_ms=1.0):
+    """Import a module in a fresh interpreter; returns the rows costing at least min_ms."""
+    env = dict(os.environ, KIVY_NO_ARGS='1', KIVY_NO_CONSOLELOG='1')
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                            cwd=REPO_DIR, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"Error importing {module}: {result.stderr.strip().splitlines()[-1:]}")
+        return []
+    return [row for row in parse_importtime(result.stderr) if row[2] >= min_ms * 1000]
+
+
+def print_import_tree(rows):
+    """Print the tree top-down: -X importtime lists a package after its own imports."""
+    print(f"{'self ms':>9} {'total ms':>9}  module")
+    for module, self_us, cumulative_us, depth in reversed(rows):
+        print(f"{self_us / 1000:9.1f} {cumulative_us / 1000:9.1f}  {'  ' * depth}{module}")
+
+
+def time_cold_starts(runs):
+    """Start the app `runs` times until its first frame; returns {phase: [ms, ...]}."""
+    env = dict(os.environ, TODOAPP_PROFILE_STARTUP='exit', KIVY_NO_ARGS='1')
+    durations = {}
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, 'main.py'], cwd=REPO_DIR, env=env,
+                                capture_output=True, text=True, timeout=120)
+        for line in result.stdout.splitlines():
+            fields = line[len(TIMELINE_PREFIX):].split(None, 2) if line.startswith(TIMELINE_PREFIX) else []
+            if len(fields) == 3 and fields[1].replace('.', '', 1).isdigit():
+                durations.setdefault(fields[2].strip(), []).append(float(fields[1]))
+            elif len(fields) == 2 and fields[1] == 'total':
+                durations.setdefault('total', []).append(float(fields[0]))
+    return durations
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profile app startup: import tree and phase timeline.")
+    parser.add_argument('--module', default='main', help="Module whose import tree is shown (default: main)")
+    parser.add_argument('--min-ms', type=float, default=1.0, help="Hide imports cheaper than this")
+    parser.add_argument('--runs', type=int, default=0,
+                        help="Also start the app this many times and show median phase times "
+                             "(needs a display)")
+    args = parser.parse_args(argv)
+
+    rows = import_tree(args.module, args.min_ms)
+    if rows:
+        print_import_tree(rows)
+    if args.runs:
+        durations = time_cold_starts(args.runs)
+        if not durations:
+            print("The app printed no startup timeline; is a display available?")
+            return 1
+        print(f"\nMedian of {args.runs} cold starts:")
+        for name, values in durations.items():
+            print(f"{statistics.median(values):9.1f} ms  {name}")
+    return 0 if rows or args.runs else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
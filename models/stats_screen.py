@@ -5,12 +5,20 @@ from kivy.graphics import Color, Rectangle
 from kivy.uix.progressbar import ProgressBar
 
 from models.custom_ui import UIConfig
+from models.analytics import ProductivityAnalytics, LeadTimeAnalytics
+from models.heatmap import YearHeatmap
+from models.database import DataVersion, QueryCache
+from models.hooks import hook_methods
+from models.storage import Storage
+from datetime import date
 
 
+@hook_methods('build_sections', 'update_theme')
 class StatsScreen(BoxLayout):
     def __init__(self, db, **kwargs):
         super().__init__(**kwargs)
         self.db = db
+        self.data_version = DataVersion.value  # Data this screen was built from
         self.orientation = 'vertical'
         self.padding = UIConfig.PADDING
         self.spacing = UIConfig.SPACING
@@ -20,6 +28,11 @@ class StatsScreen(BoxLayout):
             self.bg = Rectangle(pos=self.pos, size=self.size)
         self.bind(pos=self.update_bg, size=self.update_bg)
         
+        # Every section reads the same snapshot, even if a write lands meanwhile
+        with Storage.snapshot(self.db.reader):
+            self.build_sections()
+
+    def build_sections(self):
         # Get overall statistics
         summary = self.db.get_task_summary()
         summary_text = f"""
@@ -40,6 +53,10 @@ Overall Statistics:
         )
         self.add_widget(self.summary_label)
         
+        self.create_analytics()
+        self.heatmap = YearHeatmap(self.db)
+        self.add_widget(self.heatmap)
+        self.create_lead_time()
         self.create_chart()
 
     def update_bg(self, *args):
@@ -50,6 +67,80 @@ Overall Statistics:
             Color(*UIConfig.get_color('BACKGROUND_COLOR'))
             self.bg = Rectangle(pos=self.pos, size=self.size)
 
+    def create_analytics(self):
+        """Show rolling rates, streaks, weekday distribution and category trends"""
+        today = date.today()
+        analytics = QueryCache.get_or_compute(
+            'analytics_summary', (today,),
+            lambda: ProductivityAnalytics(self.db.reader).get_summary(today)
+        )
+        rates = analytics['rates']
+        streaks = analytics['streaks']
+        weekdays = analytics['weekdays']
+        
+        busiest_day = max(weekdays, key=weekdays.get)
+        trend_parts = []
+        for name, recent, previous in analytics['categories'][:3]:
+            arrow = "+" if recent > previous else "-" if recent < previous else "="
+            trend_parts.append(f"{name} {recent} ({arrow}{abs(recent - previous)})")
+        
+        analytics_text = f"""
+Insights:
+• Completion rate: 7 days {rates['rate_7']:.1f}% | 30 days {rates['rate_30']:.1f}%
+• Streak: current {streaks['current']} day{'s' if streaks['current'] != 1 else ''} | longest {streaks['longest']}
+• Busiest weekday: {busiest_day if weekdays[busiest_day] else 'n/a'}
+• Last 30 days: {', '.join(trend_parts) if trend_parts else 'no completed tasks'}
+        """.strip()
+        
+        self.analytics_label = Label(
+            text=analytics_text,
+            size_hint_y=None,
+            height=100,
+            text_size=(None, None),
+            halign='left',
+            color=UIConfig.get_color('TEXT_COLOR')
+        )
+        self.add_widget(self.analytics_label)
+
+    def create_lead_time(self):
+        """Show time-to-complete percentiles, latency histogram and deadline performance"""
+        lead_time = QueryCache.get_or_compute(
+            'lead_time_summary', (),
+            lambda: LeadTimeAnalytics(self.db.reader).get_summary()
+        )
+        deadlines = lead_time['deadlines']
+        
+        lines = ["Time to Complete:"]
+        for name, count, median, p90 in lead_time['categories'][:4]:
+            lines.append(f"• {name}: median {self.format_hours(median)} | p90 {self.format_hours(p90)} ({count})")
+        if len(lines) == 1:
+            lines.append("• No completion times recorded yet")
+        lines.append("• Latency: " + " | ".join(f"{label} {count}" for label, count in lead_time['histogram']))
+        if deadlines['on_time'] or deadlines['late']:
+            lines.append(f"• Deadlines: {deadlines['on_time']} on time, {deadlines['late']} late "
+                         f"({deadlines['on_time_rate']:.0f}% on time)")
+        
+        self.lead_time_label = Label(
+            text="\n".join(lines),
+            size_hint_y=None,
+            height=20 * len(lines),
+            text_size=(None, None),
+            halign='left',
+            color=UIConfig.get_color('TEXT_COLOR')
+        )
+        self.add_widget(self.lead_time_label)
+
+    @staticmethod
+    def format_hours(hours):
+        """Format a duration in hours as minutes, hours or days"""
+        if hours is None:
+            return "-"
+        if hours < 1:
+            return f"{hours * 60:.0f}m"
+        if hours < 48:
+            return f"{hours:.1f}h"
+        return f"{hours / 24:.1f}d"
+
     def create_chart(self):
         # Get statistics data from database
         stats = self.db.get_stats()
@@ -87,13 +178,13 @@ Overall Statistics:
         max_value = max(stats.values()) if stats else 1
         
         # Get date and count from database
-        for date, count in sorted_stats:
+        for day, count in sorted_stats:
             # Create row for each date
             row = BoxLayout(orientation='horizontal', size_hint_y=None, height=15, spacing=10)
             
             # Date label
             date_label = Label(
-                text=date, 
+                text=day, 
                 size_hint_x=None, 
                 width=100, 
                 halign='right',
@@ -163,4 +254,10 @@ Overall Statistics:
         self.summary_label.color = UIConfig.get_color('TEXT_COLOR')
         self.clear_widgets()
         self.add_widget(self.summary_label)
+        self.analytics_label.color = UIConfig.get_color('TEXT_COLOR')
+        self.add_widget(self.analytics_label)
+        self.heatmap.recolor()  # Only the pixel colors change with the theme
+        self.add_widget(self.heatmap)
+        self.lead_time_label.color = UIConfig.get_color('TEXT_COLOR')
+        self.add_widget(self.lead_time_label)
         self.create_chart()
\ No newline at end of file
@@ -0,0 +1,469 @@
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from models.instrumentation import ProfiledConnection
+
+
+MODE_FILE = 'file'
+MODE_MEMORY = 'memory'
+
+# Statements a reader may only run against its temp schema
+WRITE_ACTIONS = {
+    sqlite3.SQLITE_INSERT, sqlite3.SQLITE_UPDATE, sqlite3.SQLITE_DELETE,
+    sqlite3.SQLITE_CREATE_TABLE, sqlite3.SQLITE_CREATE_INDEX, sqlite3.SQLITE_CREATE_TRIGGER,
+    sqlite3.SQLITE_CREATE_VIEW, sqlite3.SQLITE_DROP_TABLE, sqlite3.SQLITE_DROP_INDEX,
+    sqlite3.SQLITE_DROP_TRIGGER, sqlite3.SQLITE_DROP_VIEW, sqlite3.SQLITE_ALTER_TABLE,
+}
+
+
+def deny_writes(action, arg1, arg2, db_name, trigger):
+    """Authorizer that keeps a connection read-only except for temp tables."""
+    if action in WRITE_ACTIONS and db_name != 'temp':
+        return sqlite3.SQLITE_DENY
+    return sqlite3.SQLITE_OK
+
+
+def default_data_dir():
+    """Get the directory for databases and settings on this platform.
+
+    TODOAPP_DATA_DIR wins; on Android the app's private storage is used (the
+    working directory is not reliably writable there); elsewhere data/ next
+    to main.py, independent of the working directory.
+    """
+    if os.environ.get('TODOAPP_DATA_DIR'):
+        return os.environ['TODOAPP_DATA_DIR']
+    if os.environ.get('ANDROID_PRIVATE'):  # Set by python-for-android
+        return os.path.join(os.environ['ANDROID_PRIVATE'], 'data')
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+
+# =============================================================================
+# STORAGE
+# =============================================================================
+
+class Storage:
+    """Opens database connections for every storage class, from the file or from RAM.
+
+    In memory mode the file is copied into a shared-cache in-memory database on
+    first use; all connections (including worker threads) then read and write
+    RAM, and flush() writes the database back to the file.
+
+    Main-thread code uses two shared connections per database: writer() for
+    changes and reader() for reports and searches. In file mode the database
+    runs in WAL mode, so the read-only reader sees a consistent snapshot and
+    never blocks the writer, or the other way round.
+    """
+
+    FLUSH_INTERVAL = 30             # Seconds between flushes of a changed in-memory database
+
+    mode = os.environ.get('TODOAPP_STORAGE', MODE_FILE)
+    timings = {}                    # Load and flush durations in ms
+    _keepers = {}                   # db path -> connection that keeps the memory database alive
+    _pool = {}                      # db path -> writer connection shared by the storage classes
+    _readers = {}                   # db path -> read-only connection for reports and searches
+    _flushed_versions = {}
+    _event = None
+
+    @classmethod
+    def set_mode(cls, mode):
+        """Choose file or memory mode; only affects databases opened afterwards."""
+        if mode not in (MODE_FILE, MODE_MEMORY):
+            raise ValueError(f"Unknown storage mode: {mode}")
+        cls.mode = mode
+
+    @classmethod
+    def memory_uri(cls, db_path):
+        name = ''.join(ch if ch.isalnum() else '_' for ch in os.path.abspath(db_path))
+        return f"file:todoapp_{name}?mode=memory&cache=shared"
+
+    @classmethod
+    def connect(cls, db_path, **kwargs):
+        """Open a new connection to a database in the current mode."""
+        kwargs.setdefault('factory', ProfiledConnection)
+        if cls.mode != MODE_MEMORY:
+            return sqlite3.connect(db_path, **kwargs)
+        if db_path not in cls._keepers:
+            cls.load(db_path)
+        return sqlite3.connect(cls.memory_uri(db_path), uri=True, **kwargs)
+
+    @classmethod
+    def writer(cls, db_path):
+        """Get the shared main-thread connection for changes, opening it once."""
+        conn = cls._pool.get(db_path)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            conn = cls.connect(db_path)
+            # Only takes effect on a database without tables, and must come before WAL;
+            # existing files are converted with `python -m models.maintenance vacuum`
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            if cls.mode != MODE_MEMORY:
+                conn.execute('PRAGMA journal_mode = WAL')  # Persistent; readers stop blocking writers
+            cls._pool[db_path] = conn
+        return conn
+
+    @classmethod
+    def reader(cls, db_path):
+        """Get the shared main-thread read-only connection for reports and searches.
+
+        The writer must have been opened first, so the file and its tables exist.
+        """
+        conn = cls._readers.get(db_path)
+        if conn is None:
+            if cls.mode == MODE_MEMORY:
+                # Shared-cache connections lock tables instead of using WAL;
+                # uncommitted reads take no locks, so reports never block writes.
+                # query_only would also refuse the temp tables analytics uses.
+                conn = cls.connect(db_path)
+                conn.execute('PRAGMA read_uncommitted = 1')
+                conn.set_authorizer(deny_writes)
+            else:
+                conn = sqlite3.connect(Path(os.path.abspath(db_path)).as_uri() + '?mode=ro', uri=True,
+                                       factory=ProfiledConnection)
+            conn.isolation_level = None  # No implicit transactions; snapshot() opens them explicitly
+            cls._readers[db_path] = conn
+        return conn
+
+    @staticmethod
+    @contextmanager
+    def snapshot(conn):
+        """Run several reads against one consistent snapshot of the database."""
+        from models.database import DataVersion, QueryCache
+        if conn.in_transaction:
+            yield conn  # Already inside a snapshot
+            return
+        # Results read from the snapshot are cached under the version it started at;
+        # a write committed meanwhile makes them stale instead of mislabelled
+        QueryCache.snapshot_version = DataVersion.value
+        conn.execute('BEGIN')
+        try:
+            conn.execute('SELECT 1 FROM sqlite_master LIMIT 1').fetchall()  # Start the snapshot now
+            yield conn
+        finally:
+            QueryCache.snapshot_version = None
+            conn.rollback()  # Nothing to keep; ends the read transaction
+
+    @classmethod
+    def release(cls, conn):
+        """Close a shared connection and drop it from the pool."""
+        for pool in (cls._pool, cls._readers):
+            for db_path, pooled in list(pool.items()):
+                if pooled is conn:
+                    del pool[db_path]
+        conn.close()
+
+    @classmethod
+    def attach_target(cls, db_path):
+        """Filename to ATTACH a database by, so RAM copies are searched in memory mode."""
+        return cls.memory_uri(db_path) if db_path in cls._keepers else db_path
+
+    @classmethod
+    def load(cls, db_path):
+        """Copy the database file into RAM with the backup API."""
+        from models.database import DataVersion
+        started = time.perf_counter()
+        keeper = sqlite3.connect(cls.memory_uri(db_path), uri=True, check_same_thread=False)
+        if os.path.exists(db_path):
+            source = sqlite3.connect(db_path)
+            try:
+                source.backup(keeper)
+            finally:
+                source.close()
+        cls._keepers[db_path] = keeper
+        cls._flushed_versions[db_path] = DataVersion.value
+        cls.timings['load_ms'] = (time.perf_counter() - started) * 1000
+
+    # -------------------------------------------------------------------------
+    # Flushing
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def flush(cls, force=False):
+        """Write changed in-memory databases back to their files; returns True if all succeeded."""
+        from models.database import DataVersion
+        ok = True
+        for db_path, keeper in cls._keepers.items():
+            if not force and cls._flushed_versions.get(db_path) == DataVersion.value:
+                continue
+            version = DataVersion.value
+            if cls.flush_to_file(keeper, db_path):
+                cls._flushed_versions[db_path] = version
+            else:
+                ok = False
+        return ok
+
+    @classmethod
+    def flush_to_file(cls, conn, db_path):
+        """Crash-safe write: copy to a temp file, verify, fsync, then atomically replace.
+
+        A crash at any point leaves either the old file or the new one, never a mix.
+        """
+        started = time.perf_counter()
+        temp_path = db_path + '.flush'
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            target = sqlite3.connect(temp_path)
+            try:
+                conn.backup(target)
+                ok = target.execute('PRAGMA quick_check').fetchall() == [('ok',)]
+            finally:
+                target.close()
+            if not ok:
+                raise sqlite3.DatabaseError("flushed copy failed quick_check")
+
+            with open(temp_path, 'rb') as f:
+                os.fsync(f.fileno())
+            # A journal left next to the old file would be replayed onto the new one
+            for suffix in ('-journal', '-wal', '-shm'):
+                if os.path.exists(db_path + suffix):
+                    os.remove(db_path + suffix)
+            os.replace(temp_path, db_path)
+            cls.fsync_directory(os.path.dirname(os.path.abspath(db_path)))
+            cls.timings['flush_ms'] = (time.perf_counter() - started) * 1000
+            return True
+        except (sqlite3.Error, OSError) as e:
+            print(f"Error flushing database to {db_path}: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+
+    @staticmethod
+    def fsync_directory(path):
+        """Make the rename durable; not possible (or needed) on every platform."""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    @classmethod
+    def schedule(cls):
+        """Flush changed in-memory databases periodically."""
+        from kivy.clock import Clock
+        if cls.mode == MODE_MEMORY and cls._event is None:
+            cls._event = Clock.schedule_interval(lambda dt: cls.flush(), cls.FLUSH_INTERVAL)
+
+    @classmethod
+    def close(cls):
+        """Close shared connections, then flush and release the in-memory databases."""
+        if cls._event is not None:
+            cls._event.cancel()
+            cls._event = None
+        for conn in list(cls._readers.values()) + list(cls._pool.values()):
+            conn.close()
+        cls._readers.clear()
+        cls._pool.clear()
+        ok = cls.flush()
+        for keeper in cls._keepers.values():
+            keeper.close()
+        cls._keepers.clear()
+        cls._flushed_versions.clear()
+        return ok
+
+
+# =============================================================================
+# WORKSPACES
+# =============================================================================
+
+class Workspaces:
+    """Named task databases (e.g. Personal, Work) in the data directory."""
+
+    CONFIG_NAME = 'workspaces.json'
+    DEFAULT_NAME = 'Personal'
+    DEFAULT_FILE = 'todo.db'        # The database from before workspaces existed
+
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        """Return the workspace list for the platform data directory."""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, data_dir=None):
+        self.data_dir = data_dir or default_data_dir()
+        self.config_path = os.path.join(self.data_dir, self.CONFIG_NAME)
+        self.current = self.DEFAULT_NAME
+        self.files = {self.DEFAULT_NAME: self.DEFAULT_FILE}
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.config_path) as f:
+                config = json.load(f)
+            self.files = config.get('workspaces') or self.files
+            if config.get('current') in self.files:
+                self.current = config['current']
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Error loading workspaces: {e}")
+
+    def save(self):
+        try:
+            os.makedirs(self.data_dir, exist_ok=True)
+            with open(self.config_path, 'w') as f:
+                json.dump({'current': self.current, 'workspaces': self.files}, f, indent=2)
+        except OSError as e:
+            print(f"Error saving workspaces: {e}")
+
+    def names(self):
+        return sorted(self.files)
+
+    def path(self, name=None):
+        """Database path of a workspace (default: the current one)."""
+        return os.path.join(self.data_dir, self.files[name or self.current])
+
+    def backup_dir(self, name=None):
+        name = name or self.current
+        if self.files[name] == self.DEFAULT_FILE:
+            return os.path.join(self.data_dir, 'backups')
+        return os.path.join(self.data_dir, 'backups', os.path.splitext(self.files[name])[0])
+
+    def add(self, name):
+        """Create a workspace; returns False if the name is empty or taken."""
+        name = name.strip()
+        if not name or name in self.files:
+            return False
+        slug = ''.join(ch.lower() if ch.isalnum() else '-' for ch in name).strip('-') or 'workspace'
+        filename = f"todo-{slug}.db"
+        taken = set(self.files.values())
+        suffix = 2
+        while filename in taken:
+            filename = f"todo-{slug}-{suffix}.db"
+            suffix += 1
+        self.files[name] = filename
+        self.save()
+        return True
+
+    def switch(self, name):
+        """Make a workspace current; returns its database path."""
+        if name not in self.files:
+            raise KeyError(name)
+        self.current = name
+        self.save()
+        return self.path()
+
+    def search(self, conn, text, limit=200):
+        """Search task titles and tags in every workspace from one connection via ATTACH.
+
+        Returns (workspace, task id, title, done) rows. Call it outside
+        Storage.snapshot(): SQLite cannot DETACH inside a transaction.
+        """
+        pattern = f"%{text}%"
+        current_path = os.path.abspath(self.path())
+        parts, params, attached = [], [], []
+        try:
+            for index, name in enumerate(self.names()):
+                path = self.path(name)
+                if os.path.abspath(path) == current_path:
+                    schema = 'main'
+                elif os.path.exists(path) or path in Storage._keepers:
+                    schema = f"workspace{index}"
+                    conn.execute(f"ATTACH DATABASE ? AS {schema}", (Storage.attach_target(path),))
+                    attached.append(schema)
+                else:
+                    continue  # Never opened, nothing to search
+                parts.append(f"SELECT ?, id, title, done FROM {schema}.tasks WHERE title LIKE ? OR tags LIKE ?")
+                params.extend([name, pattern, pattern])
+            if not parts:
+                return []
+            query = ' UNION ALL '.join(parts) + ' ORDER BY 4, 1, 2 DESC LIMIT ?'
+            return conn.execute(query, params + [limit]).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error searching workspaces: {e}")
+            return []
+        finally:
+            for schema in attached:
+                try:
+                    conn.execute(f"DETACH DATABASE {schema}")
+                except sqlite3.Error as e:
+                    print(f"Error detaching {schema}: {e}")
+
+
+# =============================================================================
+# MODE COMPARISON
+# =============================================================================
+
+def time_mode(db_path, mode, repeat):
+    """Time opening the storage classes and the main read queries in one mode."""
+    from models.database import TodoDB, CategoryDB, QueryCache
+    # The storage classes use models.storage.Storage, which is not this module's
+    # class when run with python -m
+    from models.storage import Storage
+    import statistics  # Only the command line needs it; the app imports this module at startup
+
+    Storage.set_mode(mode)
+    started = time.perf_counter()
+    db = TodoDB(db_path)
+    category_db = CategoryDB(db_path)
+    first_query_started = time.perf_counter()
+    db.get_tasks()
+    startup = {
+        'open_ms': (first_query_started - started) * 1000,
+        'first_query_ms': (time.perf_counter() - first_query_started) * 1000,
+        'load_ms': Storage.timings.get('load_ms', 0.0) if mode == MODE_MEMORY else 0.0,  # Part of open_ms
+    }
+
+    queries = {
+        'get_tasks': lambda: db.get_tasks(),
+        'get_task_summary': lambda: db.get_task_summary(),
+        'get_stats': lambda: db.get_stats(),
+        'get_category_stats': lambda: category_db.get_category_stats(),
+        'search_tasks_by_tag': lambda: category_db.search_tasks_by_tag('a'),
+    }
+    per_query = {}
+    for name, query in queries.items():
+        samples = []
+        for _ in range(repeat):
+            QueryCache.clear()  # Measure the database, not the cache
+            query_started = time.perf_counter()
+            query()
+            samples.append((time.perf_counter() - query_started) * 1000)
+        per_query[name] = statistics.median(samples)
+
+    db.close()  # Also closes category_db's connection: both use the shared one
+    for keeper in Storage._keepers.values():
+        keeper.close()  # Discard without flushing; the comparison never writes back
+    Storage._keepers.clear()
+    return startup, per_query
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare file-backed and in-memory storage timings.")
+    parser.add_argument('--db', default="data/todo.db", help="Database file (default: data/todo.db)")
+    parser.add_argument('--repeat', type=int, default=20, help="Runs per query (median reported)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"Database not found: {args.db}")
+        return 1
+    # Work on a copy so neither mode can change the real database
+    with tempfile.TemporaryDirectory() as work_dir:
+        db_path = os.path.join(work_dir, 'todo.db')
+        shutil.copyfile(args.db, db_path)
+        results = {mode: time_mode(db_path, mode, args.repeat) for mode in (MODE_FILE, MODE_MEMORY)}
+
+    print(f"{'':<22}{'file':>10}{'memory':>10}   (ms)")
+    for key in ('load_ms', 'open_ms', 'first_query_ms'):
+        print(f"{key:<22}{results[MODE_FILE][0][key]:>10.2f}{results[MODE_MEMORY][0][key]:>10.2f}")
+    for name in results[MODE_FILE][1]:
+        print(f"{name:<22}{results[MODE_FILE][1][name]:>10.2f}{results[MODE_MEMORY][1][name]:>10.2f}")
+    print("File timings depend on the OS page cache; run right after a reboot for cold-start numbers.")
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
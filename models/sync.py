@@ -0,0 +1,319 @@
+import json
+import os
+import sqlite3
+import threading
+import uuid
+import zlib
+from contextlib import contextmanager
+from urllib import request, parse
+
+from models.database import DataVersion
+from models.storage import Storage
+
+
+# Task columns carried in change payloads; the category travels by name
+TASK_FIELDS = ['title', 'done', 'date', 'tags', 'deadline_date', 'deadline_time',
+               'priority', 'created_at', 'completed_at']
+
+NOT_APPLYING = "(SELECT applying FROM sync_state WHERE id = 1) = 0"
+
+
+def task_payload_sql(row):
+    """json_object(...) expression for a task row alias (NEW or OLD) inside a trigger."""
+    fields = ', '.join(f"'{field}', {row}.{field}" for field in TASK_FIELDS)
+    return (f"json_object({fields}, "
+            f"'category', (SELECT name FROM categories WHERE id = {row}.category_id))")
+
+
+# =============================================================================
+# CHANGE LOG
+# =============================================================================
+
+class ChangeLog:
+    """Append-only log of row changes, filled by triggers, with a monotonic sequence."""
+
+    @staticmethod
+    def install(conn):
+        """Create the change log, sync state and triggers; safe to call on every start."""
+        try:
+            conn.execute('''CREATE TABLE IF NOT EXISTS sync_state
+                            (id INTEGER PRIMARY KEY CHECK (id = 1),
+                             device_id TEXT NOT NULL,
+                             applying INTEGER DEFAULT 0,
+                             last_pushed_seq INTEGER DEFAULT 0,
+                             last_pulled_seq INTEGER DEFAULT 0)''')
+            conn.execute('''CREATE TABLE IF NOT EXISTS change_log
+                            (seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                             entity TEXT NOT NULL,
+                             key TEXT NOT NULL,
+                             op TEXT NOT NULL,
+                             payload TEXT,
+                             changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+            try:
+                conn.execute('ALTER TABLE tasks ADD COLUMN sync_id TEXT')
+            except sqlite3.OperationalError:
+                pass  # Column already exists
+            conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_sync_id ON tasks (sync_id)')
+
+            first_install = conn.execute('SELECT COUNT(*) FROM sync_state').fetchone()[0] == 0
+            if first_install:
+                device_id = uuid.uuid4().hex[:12]
+                conn.execute('INSERT INTO sync_state (id, device_id) VALUES (1, ?)', (device_id,))
+
+            ChangeLog.create_triggers(conn)
+
+            if first_install:
+                # Seed the log with the existing rows so the first push carries them
+                conn.execute('''UPDATE tasks SET sync_id = (SELECT device_id FROM sync_state) || ':' || id
+                                WHERE sync_id IS NULL''')
+                conn.execute('''INSERT INTO change_log (entity, key, op, payload)
+                                SELECT 'category', name, 'upsert', json_object('icon', icon, 'color', color)
+                                FROM categories''')
+                conn.execute(f'''INSERT INTO change_log (entity, key, op, payload)
+                                 SELECT 'task', t.sync_id, 'upsert', {task_payload_sql('t')}
+                                 FROM tasks t''')
+            conn.commit()
+            return True
+        except sqlite3.Error as e:
+            print(f"Error installing change log: {e}")
+            return False
+
+    @staticmethod
+    def create_triggers(conn):
+        task_columns = 'title, done, date, category_id, tags, priority, completed_at'
+        conn.executescript(f'''
+            CREATE TRIGGER IF NOT EXISTS tasks_log_insert AFTER INSERT ON tasks
+            WHEN {NOT_APPLYING}
+            BEGIN
+                UPDATE tasks SET sync_id = (SELECT device_id FROM sync_state) || ':' || NEW.id
+                WHERE id = NEW.id AND sync_id IS NULL;
+                INSERT INTO change_log (entity, key, op, payload)
+                VALUES ('task', (SELECT sync_id FROM tasks WHERE id = NEW.id), 'upsert', {task_payload_sql('NEW')});
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS tasks_log_update AFTER UPDATE OF {task_columns} ON tasks
+            WHEN {NOT_APPLYING}
+            BEGIN
+                INSERT INTO change_log (entity, key, op, payload)
+                VALUES ('task', NEW.sync_id, 'upsert', {task_payload_sql('NEW')});
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS tasks_log_deadline AFTER UPDATE OF deadline_date, deadline_time ON tasks
+            WHEN {NOT_APPLYING}
+            BEGIN
+                INSERT INTO change_log (entity, key, op, payload)
+                VALUES ('task', NEW.sync_id, 'upsert', {task_payload_sql('NEW')});
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS tasks_log_delete AFTER DELETE ON tasks
+            WHEN {NOT_APPLYING}
+            BEGIN
+                INSERT INTO change_log (entity, key, op) VALUES ('task', OLD.sync_id, 'delete');
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS categories_log_insert AFTER INSERT ON categories
+            WHEN {NOT_APPLYING}
+            BEGIN
+                INSERT INTO change_log (entity, key, op, payload)
+                VALUES ('category', NEW.name, 'upsert', json_object('icon', NEW.icon, 'color', NEW.color));
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS categories_log_update AFTER UPDATE ON categories
+            WHEN {NOT_APPLYING}
+            BEGIN
+                INSERT INTO change_log (entity, key, op, payload)
+                VALUES ('category', NEW.name, 'upsert', json_object('icon', NEW.icon, 'color', NEW.color));
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS categories_log_delete AFTER DELETE ON categories
+            WHEN {NOT_APPLYING}
+            BEGIN
+                INSERT INTO change_log (entity, key, op) VALUES ('category', OLD.name, 'delete');
+            END;
+        ''')
+
+    @staticmethod
+    def is_installed(conn):
+        row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sync_state'").fetchone()
+        return row is not None
+
+
+@contextmanager
+def suppress_change_log(conn):
+    """Run local-only maintenance writes without recording them for sync.
+
+    The flag is set and cleared inside the caller's transaction, so other
+    connections never see it; commit after leaving the block.
+    """
+    installed = ChangeLog.is_installed(conn)
+    if installed:
+        conn.execute('UPDATE sync_state SET applying = 1 WHERE id = 1')
+    try:
+        yield
+    finally:
+        if installed:
+            conn.execute('UPDATE sync_state SET applying = 0 WHERE id = 1')
+
+
+# =============================================================================
+# SYNC CLIENT
+# =============================================================================
+
+class SyncClient:
+    """Pushes and pulls change log deltas after the last acknowledged sequence."""
+
+    BATCH_SIZE = 500
+    TIMEOUT = 15
+    INTERVAL = 60                   # Seconds between background syncs
+
+    def __init__(self, db_path, server_url):
+        self.db_path = db_path
+        self.server_url = server_url.rstrip('/')
+        self.running = False
+        self.on_pulled = None
+        self._event = None
+
+    def schedule(self, on_pulled=None):
+        """Sync periodically on a worker thread; on_pulled runs on the UI thread."""
+        from kivy.clock import Clock
+        self.on_pulled = on_pulled
+        if self._event is None:
+            self._event = Clock.schedule_interval(self.start_sync, self.INTERVAL)
+
+    def cancel(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def start_sync(self, dt=None):
+        if not self.running:
+            self.running = True
+            threading.Thread(target=self._run_sync, daemon=True).start()
+
+    def _run_sync(self):
+        from kivy.clock import Clock
+        try:
+            pushed, pulled = self.sync()
+            if pulled and self.on_pulled:
+                Clock.schedule_once(lambda dt: self.on_pulled())
+        except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+            print(f"Sync failed: {e}")  # Offline or server unavailable; retried next interval
+        finally:
+            self.running = False
+
+    def sync(self):
+        """Push local changes, then pull remote ones; returns (pushed, pulled)."""
+        conn = Storage.connect(self.db_path, timeout=10)
+        try:
+            if not ChangeLog.is_installed(conn):
+                ChangeLog.install(conn)
+            pushed = self.push(conn)
+            pulled = self.pull(conn)
+        finally:
+            conn.close()
+        if pulled:
+            DataVersion.bump()
+        return pushed, pulled
+
+    def post(self, path, payload):
+        body = zlib.compress(json.dumps(payload).encode('utf-8'))
+        req = request.Request(self.server_url + path, data=body, method='POST',
+                              headers={'Content-Type': 'application/json',
+                                       'Content-Encoding': 'deflate'})
+        with request.urlopen(req, timeout=self.TIMEOUT) as response:
+            return json.loads(zlib.decompress(response.read()).decode('utf-8'))
+
+    def get(self, path, params):
+        url = f"{self.server_url}{path}?{parse.urlencode(params)}"
+        with request.urlopen(url, timeout=self.TIMEOUT) as response:
+            return json.loads(zlib.decompress(response.read()).decode('utf-8'))
+
+    def push(self, conn):
+        """Send unacknowledged local changes in compressed batches."""
+        device_id, last_pushed = conn.execute(
+            'SELECT device_id, last_pushed_seq FROM sync_state WHERE id = 1').fetchone()
+        pushed = 0
+        while True:
+            rows = conn.execute('''SELECT seq, entity, key, op, payload FROM change_log
+                                   WHERE seq > ? ORDER BY seq LIMIT ?''',
+                                (last_pushed, self.BATCH_SIZE)).fetchall()
+            if not rows:
+                break
+            changes = [{'seq': seq, 'entity': entity, 'key': key, 'op': op,
+                        'payload': json.loads(payload) if payload else None}
+                       for seq, entity, key, op, payload in rows]
+            ack = self.post('/push', {'device': device_id, 'changes': changes})['ack']
+            with conn:
+                conn.execute('UPDATE sync_state SET last_pushed_seq = ? WHERE id = 1', (ack,))
+                conn.execute('DELETE FROM change_log WHERE seq <= ?', (ack,))  # Acknowledged
+            pushed += len(rows)
+            last_pushed = ack
+        return pushed
+
+    def pull(self, conn):
+        """Fetch and apply other devices' changes in compressed batches."""
+        device_id, last_pulled = conn.execute(
+            'SELECT device_id, last_pulled_seq FROM sync_state WHERE id = 1').fetchone()
+        pulled = 0
+        while True:
+            response = self.get('/pull', {'device': device_id, 'since': last_pulled,
+                                          'limit': self.BATCH_SIZE})
+            changes = response['changes']
+            if not changes:
+                break
+            with conn:
+                with suppress_change_log(conn):
+                    for change in changes:
+                        self.apply_change(conn, change)
+                last_pulled = changes[-1]['seq']
+                conn.execute('UPDATE sync_state SET last_pulled_seq = ? WHERE id = 1', (last_pulled,))
+            pulled += len(changes)
+            if not response.get('more'):
+                break
+        return pulled
+
+    def apply_change(self, conn, change):
+        """Apply one remote change; later changes win."""
+        entity, key, op, payload = change['entity'], change['key'], change['op'], change['payload']
+        if entity == 'category':
+            if op == 'delete':
+                row = conn.execute('SELECT id FROM categories WHERE name = ?', (key,)).fetchone()
+                if row:
+                    conn.execute('UPDATE tasks SET category_id = NULL WHERE category_id = ?', row)
+                    conn.execute('DELETE FROM categories WHERE id = ?', row)
+            else:
+                conn.execute('''INSERT INTO categories (name, icon, color) VALUES (?, ?, ?)
+                                ON CONFLICT(name) DO UPDATE SET icon = excluded.icon, color = excluded.color''',
+                             (key, payload.get('icon'), payload.get('color')))
+            return
+
+        if op == 'delete':
+            conn.execute('DELETE FROM tasks WHERE sync_id = ?', (key,))
+            return
+        if conn.execute('SELECT 1 FROM archived_tasks WHERE sync_id = ?', (key,)).fetchone():
+            return  # Archived here already; edits to old tasks must not bring them back
+
+        category_id = None
+        if payload.get('category'):
+            conn.execute('INSERT OR IGNORE INTO categories (name) VALUES (?)', (payload['category'],))
+            category_id = conn.execute('SELECT id FROM categories WHERE name = ?',
+                                       (payload['category'],)).fetchone()[0]
+        values = [payload.get(field) for field in TASK_FIELDS]
+        columns = ', '.join(TASK_FIELDS)
+        updates = ', '.join(f"{field} = excluded.{field}" for field in TASK_FIELDS)
+        conn.execute(f'''INSERT INTO tasks (sync_id, category_id, {columns})
+                         VALUES (?, ?, {', '.join('?' * len(TASK_FIELDS))})
+                         ON CONFLICT(sync_id) DO UPDATE SET category_id = excluded.category_id, {updates}''',
+                     [key, category_id] + values)
+
+
+def load_sync_url(config_path="data/sync.json"):
+    """Get the sync server URL from TODOAPP_SYNC_URL or data/sync.json, if configured."""
+    url = os.environ.get('TODOAPP_SYNC_URL')
+    if url:
+        return url
+    try:
+        with open(config_path) as f:
+            return json.load(f).get('server_url')
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,127 @@
+import argparse
+import json
+import sqlite3
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+# =============================================================================
+# REFERENCE SYNC SERVER
+# =============================================================================
+
+class SyncStore:
+    """Server-side change store: one global sequence across all devices."""
+
+    MAX_BATCH = 1000
+
+    def __init__(self, db_path="data/sync_server.db"):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS changes
+                             (seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                              device TEXT NOT NULL,
+                              entity TEXT NOT NULL,
+                              key TEXT NOT NULL,
+                              op TEXT NOT NULL,
+                              payload TEXT,
+                              received_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_changes_device ON changes (device, seq)')
+        self.conn.commit()
+
+    def push(self, device, changes):
+        """Append a device's changes; returns the highest client sequence acknowledged."""
+        rows = [(device, c['entity'], c['key'], c['op'],
+                 json.dumps(c['payload']) if c.get('payload') is not None else None)
+                for c in changes]
+        with self.lock, self.conn:
+            self.conn.executemany('INSERT INTO changes (device, entity, key, op, payload) VALUES (?, ?, ?, ?, ?)',
+                                  rows)
+        return max((c['seq'] for c in changes), default=0)
+
+    def pull(self, device, since, limit):
+        """Get other devices' changes after a server sequence."""
+        limit = max(1, min(limit, self.MAX_BATCH))
+        with self.lock:
+            rows = self.conn.execute('''SELECT seq, entity, key, op, payload FROM changes
+                                        WHERE seq > ? AND device != ?
+                                        ORDER BY seq LIMIT ?''', (since, device, limit + 1)).fetchall()
+        changes = [{'seq': seq, 'entity': entity, 'key': key, 'op': op,
+                    'payload': json.loads(payload) if payload else None}
+                   for seq, entity, key, op, payload in rows[:limit]]
+        return {'changes': changes, 'more': len(rows) > limit}
+
+
+class SyncRequestHandler(BaseHTTPRequestHandler):
+    """POST /push and GET /pull with deflate-compressed JSON bodies."""
+
+    store = None
+
+    def send_json(self, payload, status=200):
+        body = zlib.compress(json.dumps(payload).encode('utf-8'))
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Encoding', 'deflate')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/push':
+            self.send_json({'error': 'not found'}, 404)
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            data = json.loads(zlib.decompress(self.rfile.read(length)).decode('utf-8'))
+            ack = self.store.push(data['device'], data['changes'])
+        except (ValueError, KeyError, zlib.error) as e:
+            self.send_json({'error': str(e)}, 400)
+            return
+        self.send_json({'ack': ack})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != '/pull':
+            self.send_json({'error': 'not found'}, 404)
+            return
+        query = parse_qs(url.query)
+        try:
+            device = query['device'][0]
+            since = int(query.get('since', ['0'])[0])
+            limit = int(query.get('limit', ['500'])[0])
+        except (KeyError, ValueError) as e:
+            self.send_json({'error': str(e)}, 400)
+            return
+        self.send_json(self.store.pull(device, since, limit))
+
+    def log_message(self, format, *args):
+        pass  # Keep the console quiet; errors are returned to the client
+
+
+def create_server(host='127.0.0.1', port=8765, db_path="data/sync_server.db"):
+    """Create (but do not start) a sync server bound to host:port."""
+    handler = type('BoundSyncRequestHandler', (SyncRequestHandler,), {'store': SyncStore(db_path)})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the local reference sync server.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--db', default="data/sync_server.db", help="Server change store")
+    args = parser.parse_args(argv)
+
+    server = create_server(args.host, args.port, args.db)
+    print(f"Sync server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,306 @@
+import sqlite3
+import threading
+import weakref
+from datetime import datetime, timedelta
+
+from models.database import DataVersion
+from models.hooks import HookRegistry
+from models.storage import Storage
+
+
+# =============================================================================
+# TASK RECORD
+# =============================================================================
+
+class Task:
+    """One task row; __slots__ keeps it about the size of a tuple of the same fields."""
+
+    __slots__ = ('id', 'title', 'done', 'date', 'category_id', 'category_name', 'category_icon', 'tags',
+                 'deadline_date', 'deadline_time', 'priority', 'completed_at', 'archived')
+
+    def __init__(self, id, title, done=0, date=None, category_id=None, category_name=None, category_icon=None,
+                 tags=None, deadline_date=None, deadline_time=None, priority=None, completed_at=None, archived=False):
+        self.id = id
+        self.title = title
+        self.done = done
+        self.date = date
+        self.category_id = category_id
+        self.category_name = category_name
+        self.category_icon = category_icon
+        self.tags = tags
+        self.deadline_date = deadline_date
+        self.deadline_time = deadline_time
+        self.priority = priority
+        self.completed_at = completed_at
+        self.archived = archived
+
+    def fields(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"Task({self.id}, {self.title!r}, done={self.done})"
+
+
+# =============================================================================
+# TASK STORE
+# =============================================================================
+
+class TaskStore:
+    """In-memory tasks of the current workspace, indexed by id and shared by the screens.
+
+    Writes through TodoDB, CategoryDB and DeadlineDB are seen through their
+    hooks and reload only the rows they touched; any other write (undo, import,
+    archiving, sync) shows up as a DataVersion the store has not seen, and the
+    next read reloads everything. Listeners get (event, task, fields) with event
+    'added', 'changed' or 'removed', or ('reset', None, ()) after a full reload.
+    """
+
+    SELECT = '''SELECT t.id, t.title, t.done, t.date, t.category_id, c.name, c.icon, t.tags,
+                       t.deadline_date, t.deadline_time, t.priority, t.completed_at
+                FROM tasks t LEFT JOIN categories c ON t.category_id = c.id'''
+    TASK_WRITES = ('TodoDB.mark_done', 'TodoDB.delete_task', 'CategoryDB.set_task_category',
+                   'CategoryDB.add_tag_to_task', 'DeadlineDB.set_task_deadline')
+    OTHER_WRITES = ('TodoDB.add_task', 'CategoryDB.delete_category')
+
+    _instance = None
+
+    @classmethod
+    def for_db(cls, db):
+        """The store of a database's workspace, replacing the store of the previous workspace."""
+        if cls._instance is None or cls._instance.db_path != db.db_path:
+            if cls._instance is not None:
+                cls._instance.detach()
+            cls._instance = cls(db.db_path)
+        return cls._instance
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = Storage.writer(db_path)
+        self.tasks = {}             # id -> Task
+        self.newest_id = 0          # New rows are found above it after an add
+        self.version = None         # DataVersion the tasks reflect; None until loaded
+        self.listeners = []         # Callables returning the callback, or None once its screen is gone
+        self._views = {}            # Sorted lists by view, dropped on every change
+        self._strings = {}          # One copy of each repeated value (dates, categories, tags)
+        self._thread = threading.current_thread()  # The writer connection belongs to this thread
+        self._pending = threading.local()
+        self._lock = threading.RLock()
+        self._handles = [HookRegistry.add(event, before=self.before_write, after=self.after_write)
+                         for event in self.TASK_WRITES + self.OTHER_WRITES]
+
+    def detach(self):
+        for handle in self._handles:
+            HookRegistry.remove(handle)
+        self._handles = []
+
+    def add_listener(self, callback):
+        """Call callback(event, task, fields) on changes. A bound method is held weakly,
+        so a screen that is dropped stops listening without removing itself."""
+        if hasattr(callback, '__self__'):
+            self.listeners.append(weakref.WeakMethod(callback))
+        else:
+            self.listeners.append(lambda: callback)
+
+    def remove_listener(self, callback):
+        self.listeners = [ref for ref in self.listeners if ref() not in (None, callback)]
+
+    def notify(self, event, task=None, fields=()):
+        dead = False
+        for ref in list(self.listeners):
+            callback = ref()
+            if callback is None:
+                dead = True
+                continue
+            try:
+                callback(event, task, fields)
+            except Exception as e:
+                print(f"Error in task store listener: {e}")
+        if dead:
+            self.listeners = [ref for ref in self.listeners if ref() is not None]
+
+    # -------------------------------------------------------------------------
+    # Loading
+    # -------------------------------------------------------------------------
+
+    def make_task(self, row, archived=False):
+        # Titles and completion times are mostly unique; sharing them would only cost memory
+        share = self._strings.setdefault
+        return Task(row[0], row[1], row[2], *[share(value, value) if isinstance(value, str) else value
+                                              for value in row[3:11]], completed_at=row[11], archived=archived)
+
+    def reload(self):
+        """Read every task again; listeners get a 'reset'."""
+        with self._lock:
+            version = DataVersion.value
+            try:
+                rows = self.conn.execute(self.SELECT).fetchall()
+            except sqlite3.Error as e:
+                print(f"Error loading tasks: {e}")
+                return False
+            self._strings = {}
+            self.tasks = {row[0]: self.make_task(row) for row in rows}
+            self.newest_id = max(self.tasks, default=0)
+            self._views = {}
+            self.version = version
+        self.notify('reset')
+        return True
+
+    def ensure_current(self):
+        """Reload when a write happened that the store did not follow."""
+        if self.version != DataVersion.value:
+            self.reload()
+
+    def reload_tasks(self, task_ids):
+        """Read some rows again and report what changed."""
+        changes = []
+        with self._lock:
+            for task_id in task_ids:
+                row = self.conn.execute(self.SELECT + ' WHERE t.id = ?', (task_id,)).fetchone()
+                old = self.tasks.get(task_id)
+                if row is None:
+                    if old is not None:
+                        del self.tasks[task_id]
+                        changes.append(('removed', old, ()))
+                    continue
+                task = self.make_task(row)
+                if old is None:
+                    self.tasks[task_id] = task
+                    self.newest_id = max(self.newest_id, task_id)
+                    changes.append(('added', task, ()))
+                    continue
+                fields = tuple(name for name, before, after in zip(Task.__slots__, old.fields(), task.fields())
+                               if before != after)
+                if fields:
+                    for name in fields:
+                        setattr(old, name, getattr(task, name))  # Keep the object screens may hold
+                    changes.append(('changed', old, fields))
+            if changes:
+                self._views = {}
+        for event, task, fields in changes:
+            self.notify(event, task, fields)
+
+    # -------------------------------------------------------------------------
+    # Following writes
+    # -------------------------------------------------------------------------
+
+    def before_write(self, event, args, kwargs):
+        stack = getattr(self._pending, 'stack', None)
+        if stack is None:
+            stack = self._pending.stack = []
+        stack.append((DataVersion.value, args, kwargs))
+
+    def after_write(self, event, elapsed_ms, result, error):
+        stack = getattr(self._pending, 'stack', None)
+        if not stack:
+            return  # The store was created while this write ran
+        version_before, args, kwargs = stack.pop()
+        instance, arguments = args[0], args[1:] + tuple(kwargs.values())
+        if (error is not None or not result or self.version is None
+                or getattr(instance, 'db_path', None) != self.db_path
+                or threading.current_thread() is not self._thread):
+            return  # Nothing to follow, or not followable; a DataVersion change forces a reload
+        try:
+            if event in self.TASK_WRITES:
+                self.reload_tasks([arguments[0]])
+            elif event == 'TodoDB.add_task':
+                self.reload_tasks([row[0] for row in self.conn.execute('SELECT id FROM tasks WHERE id > ?',
+                                                                        (self.newest_id,))])
+            elif event == 'CategoryDB.delete_category':
+                self.reload_tasks([task.id for task in list(self.tasks.values())
+                                   if task.category_id == arguments[0]])
+        except sqlite3.Error as e:
+            print(f"Error following {event}: {e}")
+            return
+        # Only this write happened since the store was last current, so it still is
+        if self.version == version_before and DataVersion.value == version_before + 1:
+            self.version = DataVersion.value
+
+    # -------------------------------------------------------------------------
+    # Views, in the order of the queries they replace
+    # -------------------------------------------------------------------------
+
+    def view(self, key, build):
+        self.ensure_current()
+        with self._lock:
+            tasks = self._views.get(key)
+            if tasks is None:
+                tasks = self._views[key] = build(self.tasks.values())
+            return tasks
+
+    def get(self, task_id):
+        self.ensure_current()
+        return self.tasks.get(task_id)
+
+    @staticmethod
+    def order(filter_status='all'):
+        """Sort key of the tasks TodoDB.get_tasks returns for a filter."""
+        if filter_status in ('completed', 'pending'):
+            return lambda task: -task.id
+        return lambda task: (bool(task.done), -task.id)
+
+    def get_tasks(self, filter_status='all'):
+        """Like TodoDB.get_tasks; the returned list is shared and must not be changed."""
+        key = self.order(filter_status)
+        if filter_status == 'completed':
+            build = lambda tasks: sorted((task for task in tasks if task.done), key=key)
+        elif filter_status == 'pending':
+            build = lambda tasks: sorted((task for task in tasks if not task.done), key=key)
+        else:
+            filter_status = 'all'
+            build = lambda tasks: sorted(tasks, key=key)
+        return self.view(('tasks', filter_status), build)
+
+    def get_tasks_by_category(self, category_id=None):
+        """Like CategoryDB.get_tasks_by_category."""
+        if category_id:
+            build = lambda tasks: sorted((task for task in tasks if task.category_id == category_id),
+                                         key=lambda task: (bool(task.done), -task.id))
+        else:
+            # SQLite sorts the tasks without a category first
+            build = lambda tasks: sorted(tasks, key=lambda task: (task.category_name is not None,
+                                                                  task.category_name or '',
+                                                                  bool(task.done), -task.id))
+        return self.view(('category', category_id), build)
+
+    def get_tasks_with_deadlines(self):
+        """Like DeadlineDB.get_tasks_with_deadlines."""
+        build = lambda tasks: sorted((task for task in tasks if task.deadline_date is not None),
+                                     key=lambda task: (task.deadline_date, task.deadline_time is not None,
+                                                       task.deadline_time or ''))
+        return self.view(('deadlines',), build)
+
+    def get_overdue_tasks(self):
+        """Like DeadlineDB.get_overdue_tasks."""
+        now = datetime.now()
+        today, current_time = now.strftime('%Y-%m-%d'), now.strftime('%H:%M')
+        return [task for task in self.get_tasks_with_deadlines()
+                if not task.done and (task.deadline_date < today or
+                                      (task.deadline_date == today and task.deadline_time is not None
+                                       and task.deadline_time < current_time))]
+
+    def get_upcoming_tasks(self, days_ahead=3):
+        """Like DeadlineDB.get_upcoming_tasks."""
+        today = datetime.now()
+        today_str = today.strftime('%Y-%m-%d')
+        future_date = (today + timedelta(days=days_ahead)).strftime('%Y-%m-%d')
+        return [task for task in self.get_tasks_with_deadlines()
+                if not task.done and today_str <= task.deadline_date <= future_date]
+
+    def search_tasks_by_tag(self, tag, include_archived=False):
+        """Like CategoryDB.search_tasks_by_tag; archived tasks are read from the database."""
+        tag = tag.lower()  # LIKE is case-insensitive too
+        tasks = [task for task in self.get_tasks('all') if task.tags and tag in task.tags.lower()]
+        if include_archived:
+            try:
+                reader = Storage.reader(self.db_path)  # Off the writer, like the other searches
+                rows = reader.execute('''SELECT a.id, a.title, a.done, a.date, a.category_id, c.name, c.icon,
+                                                a.tags, a.deadline_date, a.deadline_time, a.priority,
+                                                a.completed_at
+                                         FROM archived_tasks a LEFT JOIN categories c ON a.category_id = c.id
+                                         WHERE a.tags LIKE ?
+                                         ORDER BY a.done ASC, a.id DESC''', (f'%{tag}%',)).fetchall()
+            except sqlite3.Error as e:
+                print(f"Error searching archived tasks: {e}")
+                rows = []
+            tasks += [self.make_task(row, archived=True) for row in rows]
+        return tasks
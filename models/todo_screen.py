@@ -9,23 +9,132 @@ from kivy.uix.scrollview import ScrollView                      # Scrollable wid
 from kivy.graphics import Color, Rectangle                      # Graphics for drawing shapes and colors
 from kivy.clock import Clock                                    # Task scheduling
 
-from models.category import CategoryScreen
-from models.deadline import DeadlineScreen, DeadlinePopup, DeadlineDB
 from models.custom_ui import UIConfig, ModernButton, ModernTextInput, ConfirmDialog
-from models.stats_screen import StatsScreen
-from models.database import TodoDB
+from models.database import DataVersion, DeadlineDB
+from models.hooks import hook_methods
+from models.journal import OperationJournal
+from models.storage import Storage, Workspaces
+from models.task_store import TaskStore
 
-from datetime import datetime
-from collections import defaultdict
 import sqlite3
-import json
+import threading
 import os
 
 
+class ImportPopup(Popup):
+    """Popup that streams a CSV/JSON Lines file into the database in the background"""
+    
+    def __init__(self, db_path, callback=None, **kwargs):
+        super().__init__(**kwargs)
+        self.db_path = db_path
+        self.callback = callback
+        self.title = "Import Tasks"
+        self.size_hint = (0.8, 0.5)
+        
+        content = BoxLayout(orientation='vertical', spacing=10, padding=10)
+        content.add_widget(Label(text="CSV, JSON or JSON Lines file path:", size_hint_y=None, height=30))
+        self.path_input = TextInput(hint_text="/path/to/tasks.csv", size_hint_y=None, height=40, multiline=False)
+        content.add_widget(self.path_input)
+        
+        self.progress_label = Label(text="", size_hint_y=None, height=30)
+        content.add_widget(self.progress_label)
+        
+        buttons = BoxLayout(spacing=10, size_hint_y=None, height=50)
+        self.import_btn = Button(text="Import")
+        self.import_btn.bind(on_press=self.start_import)
+        close_btn = Button(text="Close")
+        close_btn.bind(on_press=self.dismiss)
+        buttons.add_widget(self.import_btn)
+        buttons.add_widget(close_btn)
+        content.add_widget(buttons)
+        
+        self.content = content
+    
+    def start_import(self, instance):
+        """Run the import on a worker thread with its own connection"""
+        path = self.path_input.text.strip()
+        if not os.path.isfile(path):
+            self.progress_label.text = "File not found!"
+            return
+        self.import_btn.disabled = True
+        self.progress_label.text = "Importing..."
+        threading.Thread(target=self.run_import, args=(path,), daemon=True).start()
+    
+    def run_import(self, path):
+        from models.importer import TaskImporter  # Loaded on first import, not at startup
+        result = {'imported': 0, 'skipped': 0, 'error': "Import stopped unexpectedly"}
+        try:
+            conn = Storage.connect(self.db_path)
+            try:
+                importer = TaskImporter(conn, progress=lambda imported, skipped: Clock.schedule_once(
+                    lambda dt: self.show_progress(imported, skipped)))
+                result = importer.import_file(path)
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as e:
+            result = {'imported': 0, 'skipped': 0, 'error': str(e)}
+        finally:
+            # Always re-enable the Import button, whatever happened on this thread
+            Clock.schedule_once(lambda dt: self.finish_import(result))
+    
+    def show_progress(self, imported, skipped):
+        self.progress_label.text = f"Imported {imported} tasks ({skipped} skipped)"
+    
+    def finish_import(self, result):
+        self.import_btn.disabled = False
+        if result['error']:
+            self.progress_label.text = f"Import failed: {result['error']}"
+            return
+        self.show_progress(result['imported'], result['skipped'])
+        if self.callback:
+            self.callback()
+
+
+class WorkspacePopup(Popup):
+    """Popup asking for the name of a new workspace"""
+    
+    def __init__(self, callback, **kwargs):
+        super().__init__(**kwargs)
+        self.callback = callback
+        self.title = "New Workspace"
+        self.size_hint = (0.8, 0.4)
+        
+        content = BoxLayout(orientation='vertical', spacing=10, padding=10)
+        self.name_input = TextInput(hint_text="e.g. Work", size_hint_y=None, height=40, multiline=False)
+        self.name_input.bind(on_text_validate=self.create)
+        content.add_widget(self.name_input)
+        
+        self.error_label = Label(text="", size_hint_y=None, height=30)
+        content.add_widget(self.error_label)
+        
+        buttons = BoxLayout(spacing=10, size_hint_y=None, height=50)
+        create_btn = Button(text="Create")
+        create_btn.bind(on_press=self.create)
+        cancel_btn = Button(text="Cancel")
+        cancel_btn.bind(on_press=self.dismiss)
+        buttons.add_widget(create_btn)
+        buttons.add_widget(cancel_btn)
+        content.add_widget(buttons)
+        
+        self.content = content
+    
+    def create(self, instance):
+        name = self.name_input.text.strip()
+        if not Workspaces.instance().add(name):
+            self.error_label.text = "Name is empty or already used!"
+            return
+        self.dismiss()
+        self.callback(name)
+
+
+@hook_methods('refresh_tasks', 'on_task_event', 'update_theme')
 class TodoScreen(BoxLayout):
-    def __init__(self, db, **kwargs):
+    NEW_WORKSPACE = "+ New..."
+    
+    def __init__(self, db, on_workspace_change=None, **kwargs):
         super().__init__(**kwargs)
         self.db = db  # Store reference to database
+        self.on_workspace_change = on_workspace_change  # Called with the new workspace name
         self.orientation = 'vertical'
         self.spacing = UIConfig.SPACING
         self.padding = UIConfig.PADDING
@@ -36,6 +145,24 @@ class TodoScreen(BoxLayout):
             self.bg = Rectangle(pos=self.pos, size=self.size)
         self.bind(pos=self.update_bg, size=self.update_bg)  # Update on size change
         
+        # Workspace section: switch workspaces and search all of them
+        workspace_section = BoxLayout(orientation='horizontal', size_hint_y=None, height=40, spacing=UIConfig.SPACING)
+        self.workspace_spinner = Spinner(
+            text=Workspaces.instance().current,
+            size_hint_x=None,
+            width=150,
+            background_color=UIConfig.get_color('SURFACE_COLOR'),
+            color=UIConfig.get_color('WHITE_COLOR')
+        )
+        self.update_workspace_options()
+        self.workspace_spinner.bind(text=self.on_workspace_select)
+        workspace_section.add_widget(self.workspace_spinner)
+        
+        self.search_input = ModernTextInput(hint_text="Search all workspaces", multiline=False)
+        self.search_input.bind(on_text_validate=self.search_workspaces)
+        workspace_section.add_widget(self.search_input)
+        self.add_widget(workspace_section)
+        
         # Input section
         input_section = BoxLayout(orientation='horizontal', size_hint_y=None, height=UIConfig.INPUT_HEIGHT, spacing=UIConfig.SPACING)
         
@@ -45,8 +172,15 @@ class TodoScreen(BoxLayout):
         add_btn = ModernButton(text="Add", button_type='primary', size_hint_x=None, width=80)
         add_btn.bind(on_press=self.add_task)
         
+        self.undo_btn = ModernButton(text="Undo", button_type='secondary', size_hint_x=None, width=70)
+        self.undo_btn.bind(on_press=self.undo)
+        self.redo_btn = ModernButton(text="Redo", button_type='secondary', size_hint_x=None, width=70)
+        self.redo_btn.bind(on_press=self.redo)
+        
         input_section.add_widget(self.task_input)
         input_section.add_widget(add_btn)
+        input_section.add_widget(self.undo_btn)
+        input_section.add_widget(self.redo_btn)
         self.add_widget(input_section)
         
         # Filter section
@@ -78,6 +212,10 @@ class TodoScreen(BoxLayout):
         )
         filter_section.add_widget(self.summary_label)
         
+        import_btn = ModernButton(text="Import", button_type='secondary', size_hint_x=None, width=80)
+        import_btn.bind(on_press=lambda _: ImportPopup(self.db.db_path, callback=self.refresh_tasks).open())
+        filter_section.add_widget(import_btn)
+        
         self.add_widget(filter_section)
         
         # Tasks container with scroll
@@ -87,6 +225,11 @@ class TodoScreen(BoxLayout):
         scroll.add_widget(self.tasks_container)
         self.add_widget(scroll)
         
+        self.rows = {}  # task_id -> row of each shown task
+        self.empty_label = None
+        self.store = None  # Task store whose changes update the rows
+        self._refreshing = False
+        self._refresh_trigger = Clock.create_trigger(lambda dt: self.refresh_tasks())
         self.refresh_tasks()
 
     def update_bg(self, *args):
@@ -112,8 +255,7 @@ class TodoScreen(BoxLayout):
             
         success = self.db.add_task(title)
         if success:
-            self.task_input.text = ''
-            self.refresh_tasks()
+            self.task_input.text = ''  # The task store adds the row
         else:
             popup = Popup(
                 title="Error",
@@ -137,27 +279,77 @@ class TodoScreen(BoxLayout):
 
     def refresh_tasks(self):
         """Refresh the task list display"""
+        self.watch_store()
         self.tasks_container.clear_widgets()
-        summary = self.db.get_task_summary()
-        self.summary_label.text = f"Total: {summary['total']} | Completed: {summary['completed']} | Remaining: {summary['pending']}"
-        current_filter = self.get_current_filter()
-        tasks = self.db.get_tasks(current_filter)
+        self.rows = {}
+        self.empty_label = None
+        self.update_summary()
+        self._refreshing = True  # The store may reload while we read it
+        try:
+            tasks = self.store.get_tasks(self.get_current_filter())
+        finally:
+            self._refreshing = False
         
         if not tasks:
-            self.tasks_container.add_widget(
-                Label(
-                    text="No tasks available!",
-                    size_hint_y=None,
-                    height=40,
-                    color=UIConfig.get_color('TEXT_COLOR')
-                )
-            )
+            self.show_empty()
             return
         
-        for task_id, title, done in tasks:
-            self.create_task_widget(task_id, title, bool(done))
+        for task in tasks:
+            self.create_task_widget(task.id, task.title, bool(task.done))
+
+    def watch_store(self):
+        """Listen to the task store of the current workspace"""
+        store = TaskStore.for_db(self.db)
+        if store is not self.store:
+            if self.store is not None:
+                self.store.remove_listener(self.on_task_event)
+            store.add_listener(self.on_task_event)
+            self.store = store
+
+    def on_task_event(self, event, task, fields):
+        """Update only the row of a task the store saw change"""
+        if event == 'reset':
+            if not self._refreshing:
+                self._refresh_trigger()  # Written behind the store's back; rebuild on the next frame
+            return
+        self.update_summary()
+        if event == 'changed' and 'title' not in fields and 'done' not in fields:
+            return  # The row shows only these
+        row = self.rows.pop(task.id, None)
+        if row is not None:
+            self.tasks_container.remove_widget(row)
+        current_filter = self.get_current_filter()
+        if event != 'removed' and (current_filter == 'all' or bool(task.done) == (current_filter == 'completed')):
+            if self.empty_label is not None:
+                self.tasks_container.remove_widget(self.empty_label)
+                self.empty_label = None
+            # Same place as a refresh would put it; children run bottom to top
+            key = TaskStore.order(current_filter)
+            shown = [self.store.tasks.get(task_id) for task_id in self.rows]
+            above = sum(1 for other in shown if other is not None and key(other) < key(task))
+            self.create_task_widget(task.id, task.title, bool(task.done), index=len(self.rows) - above)
+        elif not self.rows and self.empty_label is None:
+            self.show_empty()
+
+    def update_summary(self):
+        """Update the task counts and the undo/redo buttons"""
+        journal = OperationJournal.instance()
+        self.undo_btn.disabled = not journal.can_undo()
+        self.redo_btn.disabled = not journal.can_redo()
+        summary = self.db.get_task_summary()
+        self.summary_label.text = f"Total: {summary['total']} | Completed: {summary['completed']} | Remaining: {summary['pending']}"
+
+    def show_empty(self):
+        """Show the placeholder of an empty list"""
+        self.empty_label = Label(
+            text="No tasks available!",
+            size_hint_y=None,
+            height=40,
+            color=UIConfig.get_color('TEXT_COLOR')
+        )
+        self.tasks_container.add_widget(self.empty_label)
 
-    def create_task_widget(self, task_id, title, done):
+    def create_task_widget(self, task_id, title, done, index=0):
         """Create a widget for displaying a single task"""
         box = BoxLayout(size_hint_y=None, height=UIConfig.TASK_HEIGHT, spacing=UIConfig.SPACING, padding=(5, 0))
         
@@ -207,14 +399,12 @@ class TodoScreen(BoxLayout):
         box.add_widget(deadline_btn)
         box.add_widget(delete_btn)
         
-        self.tasks_container.add_widget(box)
+        self.tasks_container.add_widget(box, index=index)
+        self.rows[task_id] = box
 
     def toggle_task(self, task_id, done):
         """Toggle task completion status"""
-        success = self.db.mark_done(task_id, int(done))
-        if success:
-            self.refresh_tasks()
-        else:
+        if not self.db.mark_done(task_id, int(done)):
             self.show_message("Error updating task!")
 
     def confirm_delete(self, task_id, title):
@@ -227,23 +417,79 @@ class TodoScreen(BoxLayout):
 
     def open_deadline_popup(self, task_id, task_title):
         """Open deadline setting popup"""
-        deadline_db = DeadlineDB()
+        from models.deadline import DeadlinePopup  # The deadline module loads with its screen
+        deadline_db = DeadlineDB(self.db.db_path)
         popup = DeadlinePopup(
             task_id, 
             task_title, 
-            deadline_db=deadline_db,  
-            callback=self.refresh_tasks
-        )
+            deadline_db=deadline_db
+        )  # A deadline does not change the row
         popup.open()
 
     def delete_task(self, task_id):
         """Delete a task from the database"""
-        success = self.db.delete_task(task_id)
-        if success:
-            self.refresh_tasks()
-        else:
+        if not self.db.delete_task(task_id):
             self.show_message("Error deleting task!")
 
+    def update_workspace_options(self):
+        """Fill the workspace dropdown"""
+        self.workspace_spinner.values = Workspaces.instance().names() + [self.NEW_WORKSPACE]
+
+    def on_workspace_select(self, spinner, text):
+        """Switch workspace, or ask for a new one"""
+        workspaces = Workspaces.instance()
+        if text == self.NEW_WORKSPACE:
+            spinner.text = workspaces.current
+            WorkspacePopup(callback=self.switch_workspace).open()
+        elif text != workspaces.current:
+            self.switch_workspace(text)
+
+    def switch_workspace(self, name):
+        """Point the app at another workspace database without reloading"""
+        self.db.open(Workspaces.instance().switch(name))
+        OperationJournal.instance().clear()  # Steps belong to the previous database
+        DataVersion.bump()
+        if self.on_workspace_change:
+            self.on_workspace_change(name)
+        self.update_workspace_options()
+        self.workspace_spinner.text = name
+        self.refresh_tasks()
+
+    def search_workspaces(self, _):
+        """Show tasks matching the search text in every workspace"""
+        text = self.search_input.text.strip()
+        if not text:
+            return
+        results = Workspaces.instance().search(self.db.reader, text)
+        
+        container = BoxLayout(orientation='vertical', size_hint_y=None, spacing=5)
+        container.bind(minimum_height=container.setter('height'))
+        if not results:
+            container.add_widget(Label(text=f"No tasks found for '{text}'!", size_hint_y=None, height=40))
+        for workspace, _, title, done in results:
+            container.add_widget(Label(
+                text=f"[{workspace}] {title}" + (" (done)" if done else ""),
+                size_hint_y=None,
+                height=30,
+                halign='left',
+                text_size=(300, None)
+            ))
+        scroll = ScrollView()
+        scroll.add_widget(container)
+        Popup(title=f"Search: {text}", content=scroll, size_hint=(0.9, 0.7)).open()
+
+    def undo(self, _):
+        """Undo the most recent change"""
+        if not self.db.undo():
+            self.show_message("Nothing could be undone!")
+        self.refresh_tasks()
+
+    def redo(self, _):
+        """Redo the most recently undone change"""
+        if not self.db.redo():
+            self.show_message("Nothing could be redone!")
+        self.refresh_tasks()
+
     def show_message(self, message):
         """Show a popup message"""
         popup = Popup(
@@ -0,0 +1,41 @@
+import json
+import os
+import tempfile
+import unittest
+
+from models.database import TodoDB, CategoryDB
+from models.importer import TaskImporter
+
+
+class JsonLinesImportTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, 'todo.db')
+        self.db = TodoDB(self.db_path)
+        CategoryDB(self.db_path)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def import_lines(self, records):
+        path = os.path.join(self.tmp.name, 'tasks.jsonl')
+        with open(path, 'w') as f:
+            f.write(''.join(json.dumps(record) + '\n' for record in records))
+        return TaskImporter(self.db.conn).import_file(path)
+
+    def test_records_with_different_keys(self):
+        result = self.import_lines([
+            {'title': 'A'},
+            {'title': 'B', 'category': 'Work', 'done': True, 'tags': ['x']},
+            {'name': 'C'},
+        ])
+        self.assertEqual(result, {'imported': 3, 'skipped': 0, 'error': None})
+        rows = self.db.conn.execute('''SELECT t.title, t.done, c.name, t.tags
+                                       FROM tasks t LEFT JOIN categories c ON t.category_id = c.id
+                                       ORDER BY t.id''').fetchall()
+        self.assertEqual(rows, [('A', 0, None, None), ('B', 1, 'Work', 'x'), ('C', 0, None, None)])
+
+
+if __name__ == '__main__':
+    unittest.main()